@@ -16,6 +16,48 @@ JIRA_USERNAME = None
 JIRA_API_TOKEN = None
 JIRA_AUTOMATION_LABELS = None
 
+LLM_CACHE_MODE = None
+LLM_CACHE_MODES = ("read_write", "record", "replay")
+LLM_CACHE_DIR = None
+LLM_CACHE_MAX_MB = 256
+
+LLM_FALLBACK_MODELS = []
+LLM_HEDGE_PERCENTILE = 0.95
+LLM_REQUEST_TIMEOUT = None
+
+BROWSER_SHARED_MODE = False
+BROWSER_MAX_CONTEXTS_PER_PROCESS = 8
+BROWSER_MAX_PROCESSES = None
+BROWSER_RESOURCE_PROFILE = None
+RESOURCE_PROFILE_NAMES = ("text-only", "no-media", "security-audit-full")
+
+HTTP_CACHE_DIR = None
+HTTP_CACHE_MAX_MB = 512
+HTTP_CACHE_HOSTS = None
+
+WS_CLIENT_QUEUE_SIZE = 256
+WS_SLOW_CLIENT_SECONDS = 10.0
+WS_REPLAY_BUFFER_SIZE = 500
+
+AUTH_PRINCIPAL_CACHE_SECONDS = 30.0
+AUTH_PRINCIPAL_CACHE_SIZE = 10000
+BCRYPT_MAX_CONCURRENCY = None
+
+PDF_RENDER_WORKERS = 2
+PDF_CACHE_MAX_MB = 64
+PDF_BATCH_MAX_REPORTS = 200
+
+SECURITY_SUITE_MAX_CONCURRENCY = 4
+SECURITY_SUITE_MAX_STEPS = 30
+SECURITY_PROBE_TIMEOUT = 10.0
+SECURITY_PROBE_MAX_CONNECTIONS = 50
+
+JIRA_MAX_CONCURRENT_RUNS = 2
+JIRA_MAX_CONNECTIONS = 10
+JIRA_REQUEST_TIMEOUT = 30.0
+JIRA_COMMENT_UPDATE_SECONDS = 15.0
+JIRA_JOB_MAX_ATTEMPTS = 3
+
 X_SERVER_AVAILABLE = bool(os.environ.get('DISPLAY', ''))
 
 USERS_FILE = "matrix_users.json"
@@ -41,6 +83,17 @@ screenshot_tasks = {}
 def load_environment_variables():
     global ANTHROPIC_API_KEY, OPENAI_API_KEY, DEEPSEEK_API_KEY, API_KEY
     global JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_AUTOMATION_LABELS
+    global LLM_CACHE_MODE, LLM_CACHE_DIR, LLM_CACHE_MAX_MB
+    global LLM_FALLBACK_MODELS, LLM_HEDGE_PERCENTILE, LLM_REQUEST_TIMEOUT
+    global BROWSER_SHARED_MODE, BROWSER_MAX_CONTEXTS_PER_PROCESS, BROWSER_MAX_PROCESSES, BROWSER_RESOURCE_PROFILE
+    global HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB, HTTP_CACHE_HOSTS
+    global WS_CLIENT_QUEUE_SIZE, WS_SLOW_CLIENT_SECONDS, WS_REPLAY_BUFFER_SIZE
+    global AUTH_PRINCIPAL_CACHE_SECONDS, AUTH_PRINCIPAL_CACHE_SIZE, BCRYPT_MAX_CONCURRENCY
+    global PDF_RENDER_WORKERS, PDF_CACHE_MAX_MB, PDF_BATCH_MAX_REPORTS
+    global SECURITY_SUITE_MAX_CONCURRENCY, SECURITY_SUITE_MAX_STEPS
+    global SECURITY_PROBE_TIMEOUT, SECURITY_PROBE_MAX_CONNECTIONS
+    global JIRA_MAX_CONCURRENT_RUNS, JIRA_MAX_CONNECTIONS, JIRA_REQUEST_TIMEOUT, JIRA_COMMENT_UPDATE_SECONDS
+    global JIRA_JOB_MAX_ATTEMPTS
 
     load_dotenv()
 
@@ -53,6 +106,66 @@ def load_environment_variables():
     JIRA_USERNAME = os.getenv("JIRA_USERNAME", "")
     JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN", "")
 
+    LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "").strip().lower() or None
+    if LLM_CACHE_MODE and LLM_CACHE_MODE not in LLM_CACHE_MODES:
+        logger.warning(
+            f"Ignoring unknown LLM_CACHE_MODE={LLM_CACHE_MODE}, the LLM cache stays disabled. Expected one of {', '.join(LLM_CACHE_MODES)}"
+        )
+        LLM_CACHE_MODE = None
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "llm_cache")
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+    # e.g. LLM_FALLBACK_MODELS=openai:gpt-4o,anthropic:claude-3-5-sonnet-20240620
+    LLM_FALLBACK_MODELS = []
+    for entry in os.getenv("LLM_FALLBACK_MODELS", "").split(","):
+        provider, _, model = entry.strip().partition(":")
+        if provider and model:
+            LLM_FALLBACK_MODELS.append((provider.strip().lower(), model.strip()))
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+    llm_timeout_env = os.getenv("LLM_REQUEST_TIMEOUT", "")
+    LLM_REQUEST_TIMEOUT = float(llm_timeout_env) if llm_timeout_env else None
+
+    BROWSER_SHARED_MODE = os.getenv("BROWSER_SHARED_MODE", "false").strip().lower() in ("1", "true", "yes")
+    BROWSER_MAX_CONTEXTS_PER_PROCESS = int(os.getenv("BROWSER_MAX_CONTEXTS_PER_PROCESS", "8"))
+    max_processes_env = os.getenv("BROWSER_MAX_PROCESSES", "")
+    BROWSER_MAX_PROCESSES = int(max_processes_env) if max_processes_env else None
+    BROWSER_RESOURCE_PROFILE = os.getenv("BROWSER_RESOURCE_PROFILE", "").strip().lower() or None
+    if BROWSER_RESOURCE_PROFILE and BROWSER_RESOURCE_PROFILE not in RESOURCE_PROFILE_NAMES:
+        logger.warning(
+            f"Ignoring unknown BROWSER_RESOURCE_PROFILE={BROWSER_RESOURCE_PROFILE}, expected one of {', '.join(RESOURCE_PROFILE_NAMES)}"
+        )
+        BROWSER_RESOURCE_PROFILE = None
+
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "").strip() or None
+    HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+    # e.g. HTTP_CACHE_HOSTS=staging.example.com,*.cdn.example.com
+    http_cache_hosts_env = os.getenv("HTTP_CACHE_HOSTS", "")
+    HTTP_CACHE_HOSTS = [host.strip() for host in http_cache_hosts_env.split(",") if host.strip()] or None
+
+    WS_CLIENT_QUEUE_SIZE = int(os.getenv("WS_CLIENT_QUEUE_SIZE", "256"))
+    WS_SLOW_CLIENT_SECONDS = float(os.getenv("WS_SLOW_CLIENT_SECONDS", "10"))
+    WS_REPLAY_BUFFER_SIZE = int(os.getenv("WS_REPLAY_BUFFER_SIZE", "500"))
+
+    AUTH_PRINCIPAL_CACHE_SECONDS = float(os.getenv("AUTH_PRINCIPAL_CACHE_SECONDS", "30"))
+    AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+    bcrypt_concurrency_env = os.getenv("BCRYPT_MAX_CONCURRENCY", "")
+    BCRYPT_MAX_CONCURRENCY = int(bcrypt_concurrency_env) if bcrypt_concurrency_env else None
+
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "64"))
+    PDF_BATCH_MAX_REPORTS = int(os.getenv("PDF_BATCH_MAX_REPORTS", "200"))
+
+    SECURITY_SUITE_MAX_CONCURRENCY = int(os.getenv("SECURITY_SUITE_MAX_CONCURRENCY", "4"))
+    SECURITY_SUITE_MAX_STEPS = int(os.getenv("SECURITY_SUITE_MAX_STEPS", "30"))
+    SECURITY_PROBE_TIMEOUT = float(os.getenv("SECURITY_PROBE_TIMEOUT", "10"))
+    SECURITY_PROBE_MAX_CONNECTIONS = int(os.getenv("SECURITY_PROBE_MAX_CONNECTIONS", "50"))
+
+    JIRA_MAX_CONCURRENT_RUNS = int(os.getenv("JIRA_MAX_CONCURRENT_RUNS", "2"))
+    JIRA_MAX_CONNECTIONS = int(os.getenv("JIRA_MAX_CONNECTIONS", "10"))
+    JIRA_REQUEST_TIMEOUT = float(os.getenv("JIRA_REQUEST_TIMEOUT", "30"))
+    JIRA_COMMENT_UPDATE_SECONDS = float(os.getenv("JIRA_COMMENT_UPDATE_SECONDS", "15"))
+    JIRA_JOB_MAX_ATTEMPTS = int(os.getenv("JIRA_JOB_MAX_ATTEMPTS", "3"))
+
     jira_labels_env = os.getenv("JIRA_AUTOMATION_LABELS", "")
     if jira_labels_env:
         JIRA_AUTOMATION_LABELS = [label.strip() for label in jira_labels_env.split(",") if label.strip()]
@@ -78,6 +191,18 @@ def load_environment_variables():
     else:
         logger.info(f"Jira automation configured with labels: {JIRA_AUTOMATION_LABELS}")
 
+    if LLM_CACHE_MODE:
+        logger.info(f"LLM response cache enabled: mode={LLM_CACHE_MODE}, dir={LLM_CACHE_DIR}, max={LLM_CACHE_MAX_MB}MB")
+
+    if LLM_FALLBACK_MODELS:
+        logger.info(f"LLM hedging/failover configured with fallbacks: {LLM_FALLBACK_MODELS}")
+
+    if BROWSER_SHARED_MODE:
+        logger.info(f"Shared browser mode enabled: {BROWSER_MAX_CONTEXTS_PER_PROCESS} contexts per browser process")
+
+    if HTTP_CACHE_DIR:
+        logger.info(f"Shared HTTP cache enabled: dir={HTTP_CACHE_DIR}, max={HTTP_CACHE_MAX_MB}MB, hosts={HTTP_CACHE_HOSTS or 'all'}")
+
     return {
         "ANTHROPIC_API_KEY": bool(ANTHROPIC_API_KEY),
         "OPENAI_API_KEY": bool(OPENAI_API_KEY),
@@ -106,6 +231,130 @@ def get_jira_automation_config():
     }
 
 
+def get_jira_queue_config():
+    """
+    Webhook runs are queued in MongoDB and executed by max_concurrent_runs workers of the server process.
+    Jira calls share a pool of max_connections connections, the progress comment of a run is edited at most
+    every comment_update_seconds. A job interrupted max_attempts times (server restarts) is marked failed.
+    """
+    return {
+        "max_concurrent_runs": JIRA_MAX_CONCURRENT_RUNS,
+        "max_connections": JIRA_MAX_CONNECTIONS,
+        "request_timeout": JIRA_REQUEST_TIMEOUT,
+        "comment_update_seconds": JIRA_COMMENT_UPDATE_SECONDS,
+        "max_attempts": JIRA_JOB_MAX_ATTEMPTS
+    }
+
+
+def get_llm_cache_config():
+    """
+    LLM response cache settings for agents, or None when LLM_CACHE_MODE is not set.
+    Modes: read_write, record, replay (replay fails the run on a cache miss).
+    """
+    if not LLM_CACHE_MODE:
+        return None
+    return {
+        "mode": LLM_CACHE_MODE,
+        "cache_dir": LLM_CACHE_DIR,
+        "max_size_bytes": LLM_CACHE_MAX_MB * 1024 * 1024
+    }
+
+
+def get_llm_router_config():
+    """
+    Hedging/failover settings for agents, or None when neither fallback models nor a timeout are configured.
+    """
+    if not LLM_FALLBACK_MODELS and LLM_REQUEST_TIMEOUT is None:
+        return None
+    return {
+        "fallback_models": list(LLM_FALLBACK_MODELS),
+        "hedge_percentile": LLM_HEDGE_PERCENTILE,
+        "request_timeout": LLM_REQUEST_TIMEOUT
+    }
+
+
+def get_browser_pool_config():
+    """
+    Shared browser pool settings, or None when every session should launch its own browser.
+    """
+    if not BROWSER_SHARED_MODE:
+        return None
+    return {
+        "max_contexts_per_browser": BROWSER_MAX_CONTEXTS_PER_PROCESS,
+        "max_browsers": BROWSER_MAX_PROCESSES
+    }
+
+
+def get_browser_resource_profile():
+    """
+    Default resource blocking profile for tasks that do not set one: text-only, no-media or security-audit-full.
+    """
+    return BROWSER_RESOURCE_PROFILE
+
+
+def get_http_cache_config():
+    """
+    Shared browser HTTP cache settings, or None when HTTP_CACHE_DIR is not set.
+    """
+    if not HTTP_CACHE_DIR:
+        return None
+    return {
+        "cache_dir": HTTP_CACHE_DIR,
+        "max_size_bytes": HTTP_CACHE_MAX_MB * 1024 * 1024,
+        "hosts": HTTP_CACHE_HOSTS
+    }
+
+
+def get_websocket_fanout_config():
+    """
+    Outbound queue limits of dashboard WebSockets, clients that fall further behind are disconnected.
+    replay_buffer_size events per session are kept for clients that reconnect with last_seq.
+    """
+    return {
+        "max_queue_size": WS_CLIENT_QUEUE_SIZE,
+        "max_lag_seconds": WS_SLOW_CLIENT_SECONDS,
+        "replay_buffer_size": WS_REPLAY_BUFFER_SIZE
+    }
+
+
+def get_auth_cache_config():
+    """
+    Principal cache and password hashing limits of the MongoDB authentication routes.
+    A ttl_seconds of 0 disables the cache, bcrypt_max_workers None means min(4, CPU count).
+    """
+    return {
+        "ttl_seconds": AUTH_PRINCIPAL_CACHE_SECONDS,
+        "max_entries": AUTH_PRINCIPAL_CACHE_SIZE,
+        "bcrypt_max_workers": BCRYPT_MAX_CONCURRENCY
+    }
+
+
+def get_pdf_render_config():
+    """
+    PDF reports are rendered by worker processes (0 workers renders them on a thread of the server process).
+    Rendered PDFs are cached in memory by report input, a batch export covers at most batch_max_reports runs.
+    """
+    return {
+        "workers": PDF_RENDER_WORKERS,
+        "cache_max_bytes": PDF_CACHE_MAX_MB * 1024 * 1024,
+        "batch_max_reports": PDF_BATCH_MAX_REPORTS
+    }
+
+
+def get_security_suite_config():
+    """
+    Security suites run at most max_concurrency tests at once across all suites, each test is an agent run of
+    at most max_steps steps on a context of the shared browser pool. Tests with a "probe" are checked over plain
+    HTTP first, with a pool of probe_max_connections connections.
+    """
+    return {
+        "max_concurrency": SECURITY_SUITE_MAX_CONCURRENCY,
+        "max_steps": SECURITY_SUITE_MAX_STEPS,
+        "probe_timeout": SECURITY_PROBE_TIMEOUT,
+        "probe_max_connections": SECURITY_PROBE_MAX_CONNECTIONS
+    }
+
+
 def check_optional_dependencies():
     dependencies = {
         "aiohttp": False,
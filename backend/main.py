@@ -14,6 +14,9 @@ from mongo_routes import auth_routes as original_auth_routes
 from routes import session_routes, task_routes, websocket_routes, jira_routes, pdf_routes
 from mongodb_config import connect_to_mongodb
 from config import load_environment_variables
+from services.browser_pool import close_browser_pools
+from services.pdf_jobs import close_pdf_workers
+from services.security_probes import close_probe_client
 
 from routes import hacking_routes
 
@@ -63,6 +66,7 @@ async def lifespan(current_app: FastAPI):
                 api_token=jira_api_token_env,
                 automation_labels=jira_automation_labels_list
             )
+            await jira_routes.start_jira_automation()
             print(f"✅ Jira service initialized: {jira_url_env}")
         except Exception as e:
             print(f"❌ Error initializing Jira service: {e}")
@@ -72,6 +76,10 @@ async def lifespan(current_app: FastAPI):
     print("✅ Matrix QA Server startup complete!")
     yield
     print("🛑 Shutting down Matrix QA Server...")
+    await jira_routes.stop_jira_automation()
+    await close_browser_pools()
+    close_pdf_workers()
+    await close_probe_client()
 
 app = FastAPI(title="Matrix QA Test Runner", lifespan=lifespan)
 
@@ -1,8 +1,8 @@
 """
 Pydantic models for API schemas
 """
-from typing import Dict, List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
 
 class User(BaseModel):
     """User model for authentication and user management"""
@@ -37,6 +37,25 @@ class TestTask(BaseModel):
     api_model: Optional[str] = "claude-3-5-sonnet-20240620"
     api_key: Optional[str] = None
     use_default_key: Optional[bool] = True
+    # block irrelevant requests while the task runs, defaults to BROWSER_RESOURCE_PROFILE
+    resource_profile: Optional[Literal["text-only", "no-media", "security-audit-full"]] = None
+
+class SecuritySuiteRequest(BaseModel):
+    """Security suite request model, runs the catalogue tests matching every given filter"""
+    target_url: str
+    category: Optional[str] = None
+    severity: Optional[str] = None
+    keys: Optional[List[str]] = None
+    api_provider: Optional[str] = "anthropic"
+    api_model: Optional[str] = "claude-3-5-sonnet-20240620"
+    api_key: Optional[str] = None
+    use_default_key: Optional[bool] = True
+    # tests of this suite running at once, never more than SECURITY_SUITE_MAX_CONCURRENCY
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    max_steps: Optional[int] = Field(default=None, ge=1)
+    resource_profile: Optional[Literal["text-only", "no-media", "security-audit-full"]] = "security-audit-full"
+    # check tests that have a probe over plain HTTP, the browser agent only runs when the probe cannot decide
+    use_probes: bool = True
 
 class TaskResult(BaseModel):
     """Task result model"""
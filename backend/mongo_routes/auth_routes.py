@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, Header
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Optional, List, Dict, Any
 import jwt
-import bcrypt
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from bson import ObjectId
 
 from mongodb_config import users_collection, JWT_SECRET, encrypt_api_key, decrypt_api_key
+from config import get_auth_cache_config
+from services.auth_cache import PrincipalCache, PasswordHasher
 
 
 class AuthRequest(BaseModel):
@@ -30,6 +31,29 @@ class User(BaseModel):
 router = APIRouter(tags=["mongodb-auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+_principal_cache: Optional[PrincipalCache] = None
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    global _principal_cache
+    if _principal_cache is None:
+        auth_config = get_auth_cache_config()
+        _principal_cache = PrincipalCache(auth_config["ttl_seconds"], auth_config["max_entries"])
+    return _principal_cache
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(get_auth_cache_config()["bcrypt_max_workers"])
+    return _password_hasher
+
+
+def invalidate_user(username: str):
+    """Forget the cached principals of a user, call it whenever a user is deleted or its role changes"""
+    get_principal_cache().invalidate_user(username)
+
 
 def serialize_mongo_doc(doc):
     if isinstance(doc, dict):
@@ -43,10 +67,13 @@ def serialize_mongo_doc(doc):
 
 
 async def verify_password(username: str, password: str):
-    user = await users_collection.find_one({"username": username})
+    """The user (password hash and role only) when the password matches, None otherwise"""
+    user = await users_collection.find_one({"username": username}, {"password": 1, "role": 1})
     if not user:
-        return False
-    return bcrypt.checkpw(password.encode(), user["password"].encode())
+        return None
+    if not await get_password_hasher().check(password, user["password"]):
+        return None
+    return user
 
 
 def generate_token(username: str, role: str):
@@ -62,17 +89,24 @@ def generate_token(username: str, role: str):
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        username = payload.get("sub")
-        role = payload.get("role", "user")
-
-        user = await users_collection.find_one({"username": username})
-        if not user:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-
-        return {"username": username, "role": role}
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
+    principal_cache = get_principal_cache()
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return dict(principal)
+
+    username = payload.get("sub")
+    # never load the password hash or the history of the user just to authenticate a request
+    user = await users_collection.find_one({"username": username}, {"_id": 0, "role": 1})
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+    principal = {"username": username, "role": user.get("role", payload.get("role", "user"))}
+    principal_cache.put(token, principal, payload.get("exp"))
+    return dict(principal)
+
 
 async def get_token_username(authorization: Optional[str] = Header(None)):
     if not authorization:
@@ -91,8 +125,8 @@ async def authenticate(auth_request: AuthRequest):
     username = auth_request.username
     password = auth_request.password
 
-    if await verify_password(username, password):
-        user = await users_collection.find_one({"username": username})
+    user = await verify_password(username, password)
+    if user:
         token = generate_token(username, user.get("role", "user"))
         return {"success": True, "token": token}
     else:
@@ -107,11 +141,11 @@ async def add_user(user: User, current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    existing_user = await users_collection.find_one({"username": user.username})
+    existing_user = await users_collection.find_one({"username": user.username}, {"_id": 1})
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    hashed_password = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt()).decode()
+    hashed_password = await get_password_hasher().hash(user.password)
 
     await users_collection.insert_one({
         "username": user.username,
@@ -133,6 +167,7 @@ async def delete_user(username: str, current_user: dict = Depends(get_current_us
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
 
     result = await users_collection.delete_one({"username": username})
+    invalidate_user(username)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -145,7 +180,7 @@ async def list_users(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
 
     users = []
-    async for user in users_collection.find({}, {"password": 0}):
+    async for user in users_collection.find({}, {"password": 0, "history": 0}):
         serialized_user = serialize_mongo_doc(user)
         users.append(serialized_user)
 
@@ -154,7 +189,7 @@ async def list_users(current_user: dict = Depends(get_current_user)):
 
 @router.get("/model-key/{model}")
 async def get_api_key(model: str, current_user: dict = Depends(get_current_user)):
-    user_doc = await users_collection.find_one({"username": current_user["username"]})
+    user_doc = await users_collection.find_one({"username": current_user["username"]}, {"linked_models": 1})
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
 
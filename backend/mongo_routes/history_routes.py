@@ -20,7 +20,7 @@ class HistoryItem(BaseModel):
 
 @router.get("/")
 async def get_history(current_user: dict = Depends(get_current_user)):
-    user_doc = await users_collection.find_one({"username": current_user["username"]})
+    user_doc = await users_collection.find_one({"username": current_user["username"]}, {"history": 1})
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
 
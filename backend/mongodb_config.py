@@ -25,6 +25,7 @@ database = client.matrix_qa
 
 users_collection = database.users
 history_collection = database.history
+jira_jobs_collection = database.jira_jobs
 
 
 fernet = Fernet(get_encryption_key())
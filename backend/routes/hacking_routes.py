@@ -1,19 +1,45 @@
 import os
 import json
+import time
+import hashlib
 import logging
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from auth import verify_access_jwt
+from config import active_sessions
+from models.schemas import SecuritySuiteRequest
+from services.event_stream import event_stream_response, finished_stream, format_sse, parse_last_event_id, stream_events
+from services.security_probes import ProbeInconclusive, ProbeTarget, has_probe, run_probe
+from services.security_suite import active_suites, start_security_suite
+from routes.websocket_routes import websocket_manager
 
 router = APIRouter(prefix="/hacking", tags=["hacking"])
 logger = logging.getLogger("hacking-routes")
 
 
 class HackingTestsService:
+    """
+    In-memory catalogue of the security tests, indexed by key, category and severity.
+
+    The hacking directory is re-checked on access (see refresh), so added, edited or removed test files are
+    picked up without a restart or a call to the reload endpoint.
+    """
+
+    CHECK_INTERVAL_SECONDS = 2.0
+    MAX_VIEWS = 64
+
     def __init__(self):
 
         self.hacking_tests_dir = self._find_hacking_directory()
-        self.tests_cache = None
+        self.tests_cache: List[Dict[str, Any]] = []
+        self.source = "default"
+        self.version = ""
+        self._files: Dict[str, Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = {}
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_severity: Dict[str, List[Dict[str, Any]]] = {}
+        self._views: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_check = 0.0
         self.load_tests()
 
     def _find_hacking_directory(self):
@@ -44,64 +70,94 @@ class HackingTestsService:
         return fallback_path
 
     def load_tests(self):
-        """Load security tests from JSON files in the hacking directory"""
-        self.tests_cache = []
+        """Load every security test from the JSON files in the hacking directory again"""
+        self._files = {}
+        self._last_check = 0.0
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the catalogue up to date with the hacking directory, returns True when it changed.
+
+        Only files whose mtime or size changed since the last check are parsed again. Unless forced, the
+        directory is checked at most once every CHECK_INTERVAL_SECONDS, so polling clients cost a dict lookup.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.CHECK_INTERVAL_SECONDS:
+            return False
+        self._last_check = now
 
         try:
-            logger.info(f"Attempting to load tests from: {self.hacking_tests_dir}")
-
-            if not os.path.exists(self.hacking_tests_dir):
+            entries = {
+                entry.name: entry.stat()
+                for entry in os.scandir(self.hacking_tests_dir)
+                if entry.name.endswith('.json') and entry.is_file()
+            }
+        except FileNotFoundError:
+            if force:
                 logger.warning(f"Hacking tests directory not found: {self.hacking_tests_dir}")
-                logger.info("Available directories in parent:")
-                parent_dir = os.path.dirname(self.hacking_tests_dir)
-                if os.path.exists(parent_dir):
-                    for item in os.listdir(parent_dir):
-                        item_path = os.path.join(parent_dir, item)
-                        if os.path.isdir(item_path):
-                            logger.info(f"  Directory: {item}")
-
-                self.tests_cache = self._get_default_tests()
-                return
-
-
-            logger.info(f"Directory contents: {os.listdir(self.hacking_tests_dir)}")
-
-            json_files = [f for f in os.listdir(self.hacking_tests_dir) if f.endswith('.json')]
-            logger.info(f"Found JSON files: {json_files}")
-
-            for filename in json_files:
-                file_path = os.path.join(self.hacking_tests_dir, filename)
-                try:
-                    logger.info(f"Loading test file: {file_path}")
-
-
-                    if not os.access(file_path, os.R_OK):
-                        logger.error(f"No read permission for file: {file_path}")
-                        continue
-
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        test_data = json.load(f)
-                        if self._validate_test_format(test_data):
-                            self.tests_cache.append(test_data)
-                            logger.info(f"Successfully loaded test: {test_data.get('key', 'Unknown')}")
-                        else:
-                            logger.warning(f"Invalid test format in {filename}")
-                            logger.info(
-                                f"Test data keys: {list(test_data.keys()) if isinstance(test_data, dict) else 'Not a dict'}")
-
-                except Exception as e:
-                    logger.error(f"Error loading test file {filename}: {str(e)}")
-
-            if not self.tests_cache:
-                logger.warning("No valid tests found in JSON files, using default tests")
-                self.tests_cache = self._get_default_tests()
-            else:
-                logger.info(f"Successfully loaded {len(self.tests_cache)} tests from JSON files")
+            entries = {}
+        except Exception as e:
+            logger.error(f"Error listing hacking tests directory: {str(e)}")
+            return False
 
+        changed = force or entries.keys() != self._files.keys()
+        files = {}
+        for filename, stat in entries.items():
+            signature = (stat.st_mtime_ns, stat.st_size)
+            previous = self._files.get(filename)
+            if previous is not None and previous[0] == signature:
+                files[filename] = previous
+                continue
+            files[filename] = (signature, self._load_test_file(filename))
+            changed = True
+
+        if changed:
+            self._files = files
+            self._build_catalogue()
+        return changed
+
+    def _load_test_file(self, filename: str) -> Optional[Dict[str, Any]]:
+        file_path = os.path.join(self.hacking_tests_dir, filename)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                test_data = json.load(f)
         except Exception as e:
-            logger.error(f"Error loading hacking tests: {str(e)}")
-            logger.exception("Full exception details:")
-            self.tests_cache = self._get_default_tests()
+            logger.error(f"Error loading test file {filename}: {str(e)}")
+            return None
+
+        if not isinstance(test_data, dict) or not self._validate_test_format(test_data):
+            logger.warning(f"Invalid test format in {filename}")
+            return None
+
+        logger.info(f"Loaded test {test_data['key']} from {filename}")
+        return test_data
+
+    def _build_catalogue(self):
+        """Rebuild the indexes and drop the precomputed views, files are taken in name order"""
+        tests = [test for _, (_, test) in sorted(self._files.items()) if test is not None]
+        self.source = "json_files"
+        if not tests:
+            logger.warning("No valid tests found in JSON files, using default tests")
+            tests = self._get_default_tests()
+            self.source = "default"
+
+        self.tests_cache = tests
+        self._by_key = {}
+        self._by_category = {}
+        self._by_severity = {}
+        for test in tests:
+            # the first file wins when two files define the same key
+            self._by_key.setdefault(test['key'], test)
+            self._by_category.setdefault(test['category'].lower(), []).append(test)
+            self._by_severity.setdefault(test['severity'].lower(), []).append(test)
+
+        signature = json.dumps(
+            [self.source, sorted((filename, signature) for filename, (signature, _) in self._files.items())]
+        )
+        self.version = hashlib.sha1(signature.encode()).hexdigest()[:16]
+        self._views = {}
+        logger.info(f"Security test catalogue {self.version}: {len(tests)} tests ({self.source})")
 
     def _validate_test_format(self, test_data: Dict[str, Any]) -> bool:
         """Validate that a test has the required fields"""
@@ -112,6 +168,15 @@ class HackingTestsService:
             logger.warning(f"Test validation failed. Missing fields: {missing_fields}")
             return False
 
+        # the catalogue indexes these, a single bad test pack must not break every catalogue route
+        invalid_fields = [
+            field for field in ('key', 'category', 'severity')
+            if not isinstance(test_data[field], str) or not test_data[field].strip()
+        ]
+        if invalid_fields:
+            logger.warning(f"Test validation failed. Fields that are not text: {invalid_fields}")
+            return False
+
         return True
 
     def _get_default_tests(self) -> List[Dict[str, Any]]:
@@ -136,7 +201,8 @@ class HackingTestsService:
                 "severity": "Medium",
                 "testing_type": "UI Security Assessment",
                 "target": "Frame protection mechanisms",
-                "instructions": "Navigate to the target website and test for clickjacking vulnerabilities: 1) Check X-Frame-Options header in browser developer tools (F12) -> Network tab 2) Create a test iframe by opening browser console and executing: var iframe = document.createElement('iframe'); iframe.src = 'https://target-site.com'; iframe.style.width='100%'; iframe.style.height='500px'; document.body.appendChild(iframe); 3) Check if the site loads in the iframe 4) Test Content Security Policy frame-ancestors directive 5) Try embedding login pages in iframes to test if authentication forms are protected 6) Test different frame options like frame-src and child-src in CSP 7) Create a simple HTML page that attempts to frame the target site. Document whether the site can be embedded in frames, which could allow clickjacking attacks where attackers overlay invisible frames to trick users into clicking malicious links."
+                "instructions": "Navigate to the target website and test for clickjacking vulnerabilities: 1) Check X-Frame-Options header in browser developer tools (F12) -> Network tab 2) Create a test iframe by opening browser console and executing: var iframe = document.createElement('iframe'); iframe.src = 'https://target-site.com'; iframe.style.width='100%'; iframe.style.height='500px'; document.body.appendChild(iframe); 3) Check if the site loads in the iframe 4) Test Content Security Policy frame-ancestors directive 5) Try embedding login pages in iframes to test if authentication forms are protected 6) Test different frame options like frame-src and child-src in CSP 7) Create a simple HTML page that attempts to frame the target site. Document whether the site can be embedded in frames, which could allow clickjacking attacks where attackers overlay invisible frames to trick users into clicking malicious links.",
+                "probe": "clickjacking"
             },
             {
                 "key": "HACK-001",
@@ -176,23 +242,67 @@ class HackingTestsService:
                 "severity": "High",
                 "testing_type": "Path Traversal Testing",
                 "target": "File handling mechanisms",
-                "instructions": "Navigate to the target website and test for directory traversal vulnerabilities: 1) Identify file download, upload, or include functionality 2) Test path traversal payloads in file parameters: ../../../etc/passwd, ..\\..\\..\\windows\\system32\\drivers\\etc\\hosts, ....//....//....//etc/passwd 3) Test URL-encoded versions: %2e%2e%2f, %2e%2e%5c 4) Test double encoding: %252e%252e%252f 5) Look for file inclusion in URL parameters like ?file=, ?page=, ?include= 6) Test local file inclusion: ?file=../../../etc/passwd, ?page=../../../../windows/win.ini 7) Test for remote file inclusion if applicable 8) Use browser developer tools to check responses for system files or error messages. Document any successful file access, system information disclosure, or path traversal bypasses."
+                "instructions": "Navigate to the target website and test for directory traversal vulnerabilities: 1) Identify file download, upload, or include functionality 2) Test path traversal payloads in file parameters: ../../../etc/passwd, ..\\..\\..\\windows\\system32\\drivers\\etc\\hosts, ....//....//....//etc/passwd 3) Test URL-encoded versions: %2e%2e%2f, %2e%2e%5c 4) Test double encoding: %252e%252e%252f 5) Look for file inclusion in URL parameters like ?file=, ?page=, ?include= 6) Test local file inclusion: ?file=../../../etc/passwd, ?page=../../../../windows/win.ini 7) Test for remote file inclusion if applicable 8) Use browser developer tools to check responses for system files or error messages. Document any successful file access, system information disclosure, or path traversal bypasses.",
+                "probe": "path_traversal"
             }
         ]
 
     def get_tests(self) -> List[Dict[str, Any]]:
         """Get all available security tests"""
-        if self.tests_cache is None:
-            self.load_tests()
+        self.refresh()
         return self.tests_cache
 
-    def get_test_by_key(self, test_key: str) -> Dict[str, Any]:
+    def get_test_by_key(self, test_key: str) -> Optional[Dict[str, Any]]:
         """Get a specific test by its key"""
-        tests = self.get_tests()
-        for test in tests:
-            if test.get('key') == test_key:
-                return test
-        return None
+        self.refresh()
+        return self._by_key.get(test_key)
+
+    def get_tests_view(self, category: Optional[str] = None, severity: Optional[str] = None) -> Dict[str, Any]:
+        """
+        The tests of a category and/or severity (case insensitive), with the encoded listing response and its ETag.
+        Views are computed once per catalogue version.
+        """
+        self.refresh()
+        view_key = ((category or "").lower(), (severity or "").lower())
+        view = self._views.get(view_key)
+        if view is not None:
+            return view
+
+        category_key, severity_key = view_key
+        if category_key and severity_key:
+            tests = [test for test in self._by_category.get(category_key, []) if test['severity'].lower() == severity_key]
+        elif category_key:
+            tests = self._by_category.get(category_key, [])
+        elif severity_key:
+            tests = self._by_severity.get(severity_key, [])
+        else:
+            tests = self.tests_cache
+
+        body = json.dumps({
+            "success": True,
+            "tests": tests,
+            "total": len(tests),
+            "message": f"Retrieved {len(tests)} security tests",
+            "source": self.source
+        }).encode()
+        view = {
+            "tests": tests,
+            "body": body,
+            "etag": f'"{self.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        }
+        if len(self._views) >= self.MAX_VIEWS:
+            # filters come from the query string, do not keep a view for every string a client sends
+            self._views.clear()
+        self._views[view_key] = view
+        return view
+
+    def get_categories(self) -> Dict[str, int]:
+        self.refresh()
+        return {tests[0]['category']: len(tests) for tests in self._by_category.values()}
+
+    def get_severities(self) -> Dict[str, int]:
+        self.refresh()
+        return {tests[0]['severity']: len(tests) for tests in self._by_severity.values()}
 
     def reload_tests(self):
         """Reload tests from disk"""
@@ -206,6 +316,8 @@ class HackingTestsService:
             "directory_readable": os.access(self.hacking_tests_dir, os.R_OK) if os.path.exists(
                 self.hacking_tests_dir) else False,
             "tests_count": len(self.tests_cache) if self.tests_cache else 0,
+            "catalogue_version": self.version,
+            "source": self.source,
             "working_directory": os.getcwd(),
             "file_location": __file__,
             "directory_contents": os.listdir(self.hacking_tests_dir) if os.path.exists(self.hacking_tests_dir) else [],
@@ -234,25 +346,22 @@ async def get_debug_info(auth_data: dict = Depends(verify_access_jwt)):
 
 
 @router.get("/tests")
-async def get_hacking_tests(auth_data: dict = Depends(verify_access_jwt)):
+async def get_hacking_tests(
+        category: Optional[str] = None,
+        severity: Optional[str] = None,
+        if_none_match: Optional[str] = Header(None),
+        auth_data: dict = Depends(verify_access_jwt)
+):
 
     try:
-        tests = hacking_service.get_tests()
-
+        view = hacking_service.get_tests_view(category, severity)
+        # no-cache: browsers revalidate with If-None-Match and get a 304 while the catalogue is unchanged
+        headers = {"ETag": view["etag"], "Cache-Control": "no-cache"}
 
-        source = "default"
-        if os.path.exists(hacking_service.hacking_tests_dir):
-            json_files = [f for f in os.listdir(hacking_service.hacking_tests_dir) if f.endswith('.json')]
-            if json_files:
-                source = "json_files"
+        if if_none_match and view["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
 
-        return {
-            "success": True,
-            "tests": tests,
-            "total": len(tests),
-            "message": f"Retrieved {len(tests)} security tests",
-            "source": source
-        }
+        return Response(content=view["body"], media_type="application/json", headers=headers)
 
     except Exception as e:
         logger.error(f"Error retrieving hacking tests: {str(e)}")
@@ -262,6 +371,16 @@ async def get_hacking_tests(auth_data: dict = Depends(verify_access_jwt)):
         )
 
 
+@router.get("/categories")
+async def get_hacking_categories(auth_data: dict = Depends(verify_access_jwt)):
+
+    return {
+        "success": True,
+        "categories": hacking_service.get_categories(),
+        "severities": hacking_service.get_severities()
+    }
+
+
 @router.get("/tests/{test_key}")
 async def get_hacking_test(test_key: str, auth_data: dict = Depends(verify_access_jwt)):
 
@@ -339,6 +458,23 @@ NOTE: Remember to replace any placeholder URLs with the actual target URL before
         )
 
 
+@router.post("/tests/{test_key}/probe")
+async def probe_hacking_test(test_key: str, target_url: str, auth_data: dict = Depends(verify_access_jwt)):
+    """Run the HTTP probe of a test against target_url, without a browser or an LLM"""
+    test = hacking_service.get_test_by_key(test_key)
+    if not test:
+        raise HTTPException(status_code=404, detail=f"Security test with key '{test_key}' not found")
+    if not has_probe(test):
+        raise HTTPException(status_code=400, detail=f"Security test {test_key} needs the browser agent, it has no probe")
+
+    try:
+        probe_result = await run_probe(test, ProbeTarget(target_url))
+    except ProbeInconclusive as e:
+        return {"success": False, "test_key": test_key, "escalate": True, "message": str(e)}
+
+    return {"success": True, "test_key": test_key, "probe": test["probe"], **probe_result}
+
+
 @router.post("/reload-tests")
 async def reload_hacking_tests(auth_data: dict = Depends(verify_access_jwt)):  # ← LÍNEA CRÍTICA
 
@@ -366,4 +502,101 @@ async def reload_hacking_tests(auth_data: dict = Depends(verify_access_jwt)):  #
         raise HTTPException(
             status_code=500,
             detail=f"Error reloading security tests: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def get_suite_for_caller(suite_id: str, auth_data: dict):
+    suite = active_suites.get(suite_id)
+    if suite is None:
+        raise HTTPException(status_code=404, detail="Security suite not found")
+    if auth_data.get("type") == "jwt" and suite.username != auth_data.get("username"):
+        raise HTTPException(status_code=403, detail="Not authorized to access this security suite")
+    return suite
+
+
+@router.post("/suites")
+async def run_security_suite(suite_request: SecuritySuiteRequest, auth_data: dict = Depends(verify_access_jwt)):
+    """
+    Run every catalogue test matching the category, severity and keys filters against target_url, in parallel.
+    Progress is streamed on /hacking/suites/{suite_id}/events and on the /ws/{suite_id} WebSocket.
+    """
+    tests = hacking_service.get_tests_view(suite_request.category, suite_request.severity)["tests"]
+    if suite_request.keys:
+        wanted_keys = set(suite_request.keys)
+        tests = [test for test in tests if test['key'] in wanted_keys]
+
+    # a key defined by two files runs once
+    unique_tests = []
+    seen_keys = set()
+    for test in tests:
+        if test['key'] not in seen_keys:
+            seen_keys.add(test['key'])
+            unique_tests.append(test)
+    if not unique_tests:
+        raise HTTPException(status_code=404, detail="No security tests match the suite filters")
+
+    suite = start_security_suite(suite_request, unique_tests, auth_data.get("username"), websocket_manager)
+
+    return {
+        "success": True,
+        **suite.summary(),
+        "events_url": f"/hacking/suites/{suite.suite_id}/events",
+        "message": f"Security suite of {len(unique_tests)} tests started against {suite_request.target_url}"
+    }
+
+
+@router.get("/suites/{suite_id}")
+async def get_security_suite(suite_id: str, auth_data: dict = Depends(verify_access_jwt)):
+
+    suite = get_suite_for_caller(suite_id, auth_data)
+    return {"success": True, **suite.summary()}
+
+
+@router.get("/suites/{suite_id}/events")
+async def stream_security_suite_events(
+        suite_id: str,
+        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+        accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+        auth_data: dict = Depends(verify_access_jwt)
+):
+    """
+    Server-Sent Events of a suite: the events of every test and suite_progress, ending with suite_complete
+    and the aggregated report. Without Last-Event-ID the stream starts with a suite_snapshot.
+    """
+    suite = get_suite_for_caller(suite_id, auth_data)
+    if suite_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="The session of this security suite was closed")
+
+    event_log = websocket_manager.event_log(suite_id)
+    last_seq = parse_last_event_id(last_event_id)
+    first_chunks = []
+    if last_seq is None:
+        last_seq = event_log.last_seq
+        first_chunks.append(format_sse(json.dumps(suite.summary(), default=str), "suite_snapshot", last_seq))
+        if suite.report is not None:
+            return event_stream_response(finished_stream(first_chunks), accept_encoding)
+
+    def finished_snapshot() -> Optional[str]:
+        if suite.report is None:
+            return None
+        return format_sse(json.dumps(suite.summary(), default=str), "suite_snapshot", event_log.last_seq)
+
+    chunks = stream_events(
+        event_log,
+        last_seq,
+        matches=lambda event: True,
+        is_alive=lambda: suite_id in active_sessions,
+        first_chunks=first_chunks,
+        is_final=lambda event: event.type == "suite_complete",
+        finished_snapshot=finished_snapshot
+    )
+    return event_stream_response(chunks, accept_encoding)
+
+
+@router.post("/suites/{suite_id}/stop")
+async def stop_security_suite(suite_id: str, auth_data: dict = Depends(verify_access_jwt)):
+
+    suite = get_suite_for_caller(suite_id, auth_data)
+    if not suite.stop():
+        raise HTTPException(status_code=400, detail="Security suite is not running")
+    return {"success": True, "message": f"Stopping security suite {suite_id}"}
@@ -2,13 +2,16 @@ import asyncio
 import uuid
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, Request, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 
 from services.jira_service import JiraService
-from services.test_runner import execute_test
-from config import active_sessions
+from services.jira_jobs import JiraJobQueue, JiraRunComment
+from services.browser_pool import acquire_browser_context, build_browser_config, close_session_browser, is_shared_browser_mode
+from services.run_log import RunLogBuilder
+from config import active_sessions, get_jira_queue_config
+from mongodb_config import jira_jobs_collection
 from routes.websocket_routes import websocket_manager
 from auth import verify_access_jwt
 
@@ -16,6 +19,7 @@ router = APIRouter(prefix="/jira", tags=["jira"])
 logger = logging.getLogger("jira-routes")
 
 jira_service: Optional[JiraService] = None
+jira_job_queue: Optional[JiraJobQueue] = None
 
 
 class JiraWebhookPayload(BaseModel):
@@ -31,14 +35,37 @@ class AutomationLabelConfig(BaseModel):
 async def initialize_jira_service(jira_url: str, username: str, api_token: str, automation_labels: List[str] = None):
     global jira_service
     jira_service = JiraService(jira_url, username, api_token, automation_labels)
+    await jira_service.connect()
+
+
+async def start_jira_automation():
+    """Start the workers of the webhook queue, jobs left by a previous server are picked up again"""
+    global jira_job_queue
+    if not jira_service or jira_job_queue:
+        return
+    queue_config = get_jira_queue_config()
+    jira_job_queue = JiraJobQueue(
+        jira_jobs_collection,
+        process_jira_issue,
+        max_workers=queue_config["max_concurrent_runs"],
+        max_attempts=queue_config["max_attempts"]
+    )
+    await jira_job_queue.setup()
+    jira_job_queue.start()
+
+
+async def stop_jira_automation():
+    global jira_job_queue
+    if jira_job_queue:
+        await jira_job_queue.stop()
+        jira_job_queue = None
+    if jira_service:
+        await jira_service.close()
 
 
 @router.post("/webhook")
-async def handle_jira_webhook(
-        request: Request,
-        background_tasks: BackgroundTasks
-):
-    if not jira_service:
+async def handle_jira_webhook(request: Request):
+    if not jira_service or not jira_job_queue:
         raise HTTPException(status_code=500, detail="Jira service not initialized")
 
     try:
@@ -52,23 +79,44 @@ async def handle_jira_webhook(
         if not issue_key:
             raise HTTPException(status_code=400, detail="Could not extract issue key from webhook")
 
-        background_tasks.add_task(process_jira_issue, issue_key)
+        # Jira sends the same identifier again when it retries a delivery
+        webhook_id = request.headers.get("x-atlassian-webhook-identifier")
+        job, queued = await jira_job_queue.enqueue(issue_key, webhook_id)
 
-        return {"message": f"Processing issue {issue_key} for automation", "issue_key": issue_key}
+        if not queued:
+            return {
+                "message": f"Issue {issue_key} already has a {job['status']} automation run",
+                "issue_key": issue_key,
+                "job_id": job["_id"],
+                "queued": False
+            }
+        return {"message": f"Processing issue {issue_key} for automation", "issue_key": issue_key, "job_id": job["_id"], "queued": True}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing webhook: {str(e)}")
 
 
-async def process_jira_issue(issue_key: str):
-    try:
-        issue_data = await jira_service.get_issue(issue_key)
-        if not issue_data:
-            return
+async def process_jira_issue(job: Dict[str, Any]):
+    """Run a queued job, everything the run reports goes to one comment on the issue"""
+    issue_key = job["issue_key"]
+    run_comment = JiraRunComment(
+        jira_service,
+        issue_key,
+        header="🤖 MATRIX QA: Test execution started...",
+        min_interval=get_jira_queue_config()["comment_update_seconds"],
+        comment_id=job.get("comment_id")
+    )
+
+    # nothing can be commented on an issue that cannot be read
+    issue_data = await jira_service.get_issue(issue_key)
+    if not issue_data:
+        raise Exception(f"Could not fetch Jira issue {issue_key}")
 
+    try:
         if not jira_service.has_automation_label(issue_data):
-            await jira_service.add_comment(
-                issue_key,
+            await run_comment.finish(
                 "❌ MATRIX QA: This issue was moved to Done but does not have automation labels. Add one of these labels to enable automation: " +
                 ", ".join(jira_service.automation_labels)
             )
@@ -76,8 +124,7 @@ async def process_jira_issue(issue_key: str):
 
         instructions = jira_service.extract_instructions_from_issue(issue_data)
         if not instructions:
-            await jira_service.add_comment(
-                issue_key,
+            await run_comment.finish(
                 "❌ MATRIX QA: No test instructions found in this issue. Please add test instructions to the description."
             )
             return
@@ -99,16 +146,19 @@ async def process_jira_issue(issue_key: str):
             "jira_issue_key": issue_key
         }
 
-        await jira_service.add_comment(
-            issue_key,
+        run_comment.header = (
             f"🤖 MATRIX QA: Test execution started...\n📝 Instructions: {instructions[:200]}...\n🏷️ Automation triggered by labels: {automation_summary['labels']}"
         )
+        comment_id = await run_comment.flush()
+        if comment_id and comment_id != job.get("comment_id"):
+            await jira_job_queue.set_comment(job["_id"], comment_id)
 
         await execute_test_for_jira(
             session_id=session_id,
             task_id=task_id,
             issue_key=issue_key,
             instructions=instructions,
+            run_comment=run_comment,
             browser_visible=False,
             capture_interval=1.0,
             api_provider="anthropic",
@@ -117,12 +167,13 @@ async def process_jira_issue(issue_key: str):
             use_default_key=False
         )
 
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        if jira_service:
-            await jira_service.add_comment(
-                issue_key,
-                f"❌ MATRIX QA: Error executing test - {str(e)}"
-            )
+        # execute_test_for_jira already reported its own failure in the comment
+        if jira_service and run_comment.final_text is None:
+            await run_comment.finish(f"❌ MATRIX QA: Error executing test - {str(e)}")
+        raise
 
 
 async def execute_test_for_jira(
@@ -130,6 +181,7 @@ async def execute_test_for_jira(
         task_id: str,
         issue_key: str,
         instructions: str,
+        run_comment: JiraRunComment,
         browser_visible: bool,
         capture_interval: float,
         api_provider: str = "anthropic",
@@ -138,20 +190,17 @@ async def execute_test_for_jira(
         use_default_key: bool = True
 ):
     try:
-        from browser_use import Agent, Browser, BrowserConfig, Controller
+        from browser_use import Agent, Browser, Controller
         from services.ai_providers import get_llm_for_provider
         from config import X_SERVER_AVAILABLE
 
         session = active_sessions[session_id]
 
         actual_headless = True if not X_SERVER_AVAILABLE else not browser_visible
-        browser_config = BrowserConfig(
-            headless=actual_headless,
-            viewport_width=1920,
-            viewport_height=1080
-        )
-
-        session["browser"] = Browser(config=browser_config)
+        if is_shared_browser_mode():
+            await acquire_browser_context(session, actual_headless)
+        else:
+            session["browser"] = Browser(config=build_browser_config(actual_headless))
         session["controller"] = Controller()
         session["status"] = "browser_ready"
 
@@ -165,23 +214,23 @@ async def execute_test_for_jira(
             False
         )
 
+        def report_progress(event):
+            if event.type == "model_output" and event.next_goal:
+                run_comment.progress(f"📍 Step {event.step_number}: {event.next_goal}")
+
+        run_log = RunLogBuilder()
         agent = Agent(
             task=instructions,
             llm=llm,
             browser=session["browser"],
+            browser_context=session.get("browser_context"),
             controller=session["controller"],
-            enable_memory=True
+            enable_memory=True,
+            event_hooks=[run_log.handle, report_progress]
         )
 
-        raw_result = await agent.run()
-
-        if not isinstance(raw_result, str):
-            raw_result = str(raw_result)
-
-        from services.test_runner import extract_clean_result, format_raw_output
-
-        formatted_raw_result = format_raw_output(raw_result)
-        clean_result, structured_logs = extract_clean_result(raw_result)
+        await agent.run()
+        clean_result = run_log.result
 
         execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
 
@@ -189,16 +238,15 @@ async def execute_test_for_jira(
         if any(keyword in clean_result.lower() for keyword in ["error", "failed", "exception"]):
             status = "FAILED"
 
-        await jira_service.add_formatted_comment(
-            issue_key=issue_key,
+        await run_comment.finish(jira_service.format_result_comment(
             title=f"Automated Test Execution",
             result=clean_result,
             execution_time=execution_time,
             status=status
-        )
+        ))
 
         if session["browser"]:
-            await session["browser"].close()
+            await close_session_browser(session)
 
         if session_id in active_sessions:
             del active_sessions[session_id]
@@ -206,21 +254,22 @@ async def execute_test_for_jira(
     except Exception as e:
         if jira_service:
             execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-            await jira_service.add_formatted_comment(
-                issue_key=issue_key,
+            await run_comment.finish(jira_service.format_result_comment(
                 title="Automated Test Execution - ERROR",
                 result=f"Test execution failed with error: {str(e)}",
                 execution_time=execution_time,
                 status="FAILED"
-            )
+            ))
         try:
             if session_id in active_sessions:
                 session = active_sessions[session_id]
                 if session.get("browser"):
-                    await session["browser"].close()
+                    await close_session_browser(session)
                 del active_sessions[session_id]
         except Exception as cleanup_error:
             pass
+        # the job queue records the run as failed
+        raise
 
 
 @router.get("/status")
@@ -243,31 +292,31 @@ async def get_jira_tickets(auth_data: dict = Depends(verify_access_jwt)):
         labels_jql = " OR ".join([f'labels = "{label}"' for label in automation_labels])
         jql = f'({labels_jql}) AND status IN ("Done", "In Progress")'
 
-        issues = jira_service.jira.search_issues(
+        issues = await jira_service.search_issues(
             jql,
-            maxResults=50,
-            expand='changelog',
+            max_results=50,
             fields='summary,description,status,labels,assignee,reporter,created,updated,priority,components,fixVersions'
         )
 
         tickets = []
         for issue in issues:
+            fields = issue.get('fields', {})
+            status = fields.get('status') or {}
             ticket_data = {
-                'key': issue.key,
-                'summary': issue.fields.summary,
-                'description': issue.fields.description or "No description",
-                'status': issue.fields.status.name,
-                'status_category': issue.fields.status.statusCategory.name,
-                'labels': issue.fields.labels,
-                'assignee': issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
-                'reporter': issue.fields.reporter.displayName if issue.fields.reporter else "No reporter",
-                'created': issue.fields.created,
-                'updated': issue.fields.updated,
-                'priority': issue.fields.priority.name if issue.fields.priority else "No priority",
-                'url': f"{jira_service.jira_url}/browse/{issue.key}",
-                'components': [comp.name for comp in issue.fields.components] if issue.fields.components else [],
-                'fix_versions': [version.name for version in
-                                 issue.fields.fixVersions] if issue.fields.fixVersions else []
+                'key': issue['key'],
+                'summary': fields.get('summary'),
+                'description': fields.get('description') or "No description",
+                'status': status.get('name'),
+                'status_category': (status.get('statusCategory') or {}).get('name'),
+                'labels': fields.get('labels') or [],
+                'assignee': fields['assignee']['displayName'] if fields.get('assignee') else "Unassigned",
+                'reporter': fields['reporter']['displayName'] if fields.get('reporter') else "No reporter",
+                'created': fields.get('created'),
+                'updated': fields.get('updated'),
+                'priority': fields['priority']['name'] if fields.get('priority') else "No priority",
+                'url': f"{jira_service.jira_url}/browse/{issue['key']}",
+                'components': [comp['name'] for comp in fields.get('components') or []],
+                'fix_versions': [version['name'] for version in fields.get('fixVersions') or []]
             }
             tickets.append(ticket_data)
 
@@ -325,7 +374,9 @@ async def execute_jira_ticket(ticket_key: str, auth_data: dict = Depends(verify_
         raise HTTPException(status_code=503, detail="Jira service not initialized")
 
     try:
-        issue = jira_service.jira.issue(ticket_key, fields='summary,description,status')
+        issue = await jira_service.get_issue(ticket_key)
+        if not issue:
+            raise HTTPException(status_code=404, detail=f"Jira issue {ticket_key} not found")
         execution_comment = f"""
 🤖 **AUTOMATED EXECUTION STARTED**
 - Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -334,15 +385,32 @@ async def execute_jira_ticket(ticket_key: str, auth_data: dict = Depends(verify_
 
 The automated testing for this ticket has been initiated.
         """
-        jira_service.jira.add_comment(ticket_key, execution_comment)
+        await jira_service.add_comment(ticket_key, execution_comment)
         return {
             "success": True,
             "ticket_key": ticket_key,
-            "summary": issue.fields.summary,
-            "description": issue.fields.description or "No description",
-            "status": issue.fields.status.name,
+            "summary": issue["fields"]["summary"],
+            "description": issue["fields"]["description"] or "No description",
+            "status": issue["fields"]["status"]["name"],
             "execution_started": True,
-            "instructions": issue.fields.description or "No specific description in ticket"
+            "instructions": issue["fields"]["description"] or "No specific description in ticket"
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error executing ticket: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error executing ticket: {str(e)}")
+
+
+@router.get("/jobs")
+async def get_jira_jobs(limit: int = 50, auth_data: dict = Depends(verify_access_jwt)):
+    """Latest webhook runs with their status, and the number of jobs per status"""
+    if not jira_job_queue:
+        raise HTTPException(status_code=503, detail="Jira service not initialized")
+
+    limit = max(1, min(limit, 200))
+    return {
+        "success": True,
+        "jobs": await jira_job_queue.list_jobs(limit),
+        "counts": await jira_job_queue.counts(),
+        "max_concurrent_runs": jira_job_queue.max_workers
+    }
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 import auth
 from config import active_sessions, API_KEY, HARDCODED_FRONTEND_KEY
 from models.schemas import SessionInfo
+from services.browser_pool import close_session_browser, invalidate_http_cache
 
 router = APIRouter(tags=["sessions"])
 logger = logging.getLogger("session-routes")
@@ -69,10 +70,16 @@ async def delete_session(
     session = active_sessions[session_id]
     if session.get("browser"):
         try:
-            await session["browser"].close()
+            await close_session_browser(session)
         except Exception as e:
             pass
 
     del active_sessions[session_id]
 
-    return {"message": "Session closed successfully"}
\ No newline at end of file
+    return {"message": "Session closed successfully"}
+
+@router.post("/browser-cache/invalidate", dependencies=[Depends(verify_access)])
+async def invalidate_browser_cache(origin: str):
+    """Drop cached static resources of an origin, e.g. from a deploy hook of the site under test"""
+    removed = invalidate_http_cache(origin)
+    return {"origin": origin, "removed_entries": removed}
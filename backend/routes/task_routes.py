@@ -1,13 +1,19 @@
 import uuid
+import json
 import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
 
 import auth
 from config import active_sessions
 from models.schemas import TestTask
 from services.ai_providers import test_api_connection
+from services.event_stream import (
+    TASK_FINISHED_EVENTS, event_stream_response, finished_stream, format_sse, parse_last_event_id, stream_events
+)
 from services.test_runner import execute_test
+from services.ws_fanout import light_task
 from routes.websocket_routes import websocket_manager
 
 router = APIRouter(tags=["tasks"])
@@ -67,6 +73,7 @@ async def create_task(
         "api_model": task.api_model,
         "api_key": task.api_key,
         "use_default_key": task.use_default_key,
+        "resource_profile": task.resource_profile,
         "status": "pending"
     }
 
@@ -82,6 +89,7 @@ async def create_task(
         api_model=task.api_model,
         api_key=task.api_key,
         use_default_key=task.use_default_key,
+        resource_profile=task.resource_profile,
         websocket_manager=websocket_manager
     ))
 
@@ -140,4 +148,81 @@ async def stop_task(
                 raise HTTPException(status_code=400, detail="Task is not running")
 
     if not task_found:
-        raise HTTPException(status_code=404, detail="Task not found")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Task not found")
+
+
+@router.get("/sessions/{session_id}/tasks/{task_id}/events", dependencies=[Depends(verify_access)])
+async def stream_task_events(
+        session_id: str,
+        task_id: str,
+        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+        accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+        current_user: str = Depends(auth.get_token_username)
+):
+    """
+    Server-Sent Events of one task: the task_update / task_step / task_complete / task_error events the session
+    WebSocket gets, ending after the task finished. Without Last-Event-ID the stream starts with a task_snapshot.
+    """
+    if session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if current_user and active_sessions[session_id].get("username") != current_user:
+        raise HTTPException(status_code=403, detail="Not authorized to access this session")
+
+    session = active_sessions[session_id]
+    task = next((task_item for task_item in session["tasks"] if task_item["id"] == task_id), None)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    event_log = websocket_manager.event_log(session_id)
+    last_seq = parse_last_event_id(last_event_id)
+    first_chunks = []
+    if last_seq is None:
+        last_seq = event_log.last_seq
+        first_chunks.append(format_sse(json.dumps(light_task(task), default=str), "task_snapshot", last_seq))
+        if task["status"] in ("completed", "failed", "stopped"):
+            return event_stream_response(finished_stream(first_chunks), accept_encoding)
+
+    def finished_snapshot() -> Optional[str]:
+        if task["status"] not in ("completed", "failed", "stopped"):
+            return None
+        return format_sse(json.dumps(light_task(task), default=str), "task_snapshot", event_log.last_seq)
+
+    chunks = stream_events(
+        event_log,
+        last_seq,
+        matches=lambda event: event.task_id == task_id,
+        is_alive=lambda: session_id in active_sessions,
+        first_chunks=first_chunks,
+        is_final=lambda event: event.type in TASK_FINISHED_EVENTS,
+        finished_snapshot=finished_snapshot
+    )
+    return event_stream_response(chunks, accept_encoding)
+
+
+@router.get("/events", dependencies=[Depends(verify_access)])
+async def stream_user_events(
+        username: Optional[str] = None,
+        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+        accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+        current_user: str = Depends(auth.get_token_username)
+):
+    """
+    Server-Sent Events of the tasks of every session of a user, each event carries its session_id.
+    Token callers get their own events, API key callers choose the user with ?username=.
+    """
+    if current_user and username and username != current_user:
+        raise HTTPException(status_code=403, detail="Not authorized to follow this user")
+    username = current_user or username
+    if not username:
+        raise HTTPException(status_code=400, detail="username is required")
+
+    event_log = websocket_manager.user_event_log(username)
+    last_seq = parse_last_event_id(last_event_id)
+    chunks = stream_events(
+        event_log,
+        event_log.last_seq if last_seq is None else last_seq,
+        matches=lambda event: True,
+        is_alive=lambda: True
+    )
+    return event_stream_response(chunks, accept_encoding)
@@ -5,28 +5,41 @@ from typing import Dict, List, Any, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from config import active_sessions, active_connections, screenshot_tasks
-from utils.helpers import sanitize_message_for_json
+from config import active_sessions, active_connections, screenshot_tasks, get_websocket_fanout_config
 from services.screenshot import take_screenshot
 from services.video_recorder import video_recorder
+from services.ws_fanout import ClientConnection, EventLog, SLOW_CLIENT_CLOSE_CODE, light_task
 
 router = APIRouter(tags=["websockets"])
 logger = logging.getLogger("websocket-routes")
 
 
 class WebSocketManager:
-    async def connect(self, websocket: WebSocket, session_id: str):
+    def __init__(self):
+        # closes of dropped slow clients, referenced until they finish
+        self._background_tasks = set()
+        # task events of all sessions of a user, for the per-user event stream
+        self._user_event_logs: Dict[str, EventLog] = {}
+
+    async def connect(self, websocket: WebSocket, session_id: str) -> Optional[ClientConnection]:
         await websocket.accept()
 
         if session_id not in active_sessions:
             await websocket.close(code=4000, reason="Invalid session")
-            return False
-
+            return None
+
+        fanout_config = get_websocket_fanout_config()
+        client = ClientConnection(
+            websocket,
+            max_queue_size=fanout_config["max_queue_size"],
+            max_lag_seconds=fanout_config["max_lag_seconds"],
+            on_slow=lambda slow_client: self._drop_slow_client(slow_client, session_id)
+        )
         if session_id not in active_connections:
             active_connections[session_id] = []
-        active_connections[session_id].append(websocket)
+        active_connections[session_id].append(client)
 
-        return True
+        return client
 
     async def connect_screenshot(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
@@ -45,18 +58,40 @@ class WebSocketManager:
 
 
     async def disconnect(self, websocket: WebSocket, session_id: str):
-        if session_id in active_connections and websocket in active_connections[session_id]:
-            active_connections[session_id].remove(websocket)
-            if not active_connections[session_id]:
-                del active_connections[session_id]
-
-
-                recording_data = await video_recorder.stop_recording(session_id)
-                if recording_data:
-                    logger.info(f"Auto-stopped recording for disconnected session {session_id}")
-                    await self._save_video_to_database(recording_data)
-
-                await self.stop_screenshot_stream(session_id)
+        clients = active_connections.get(session_id, [])
+        client = next((client for client in clients if client.websocket is websocket), None)
+        if client is not None:
+            clients.remove(client)
+            await client.close()
+            if not clients:
+                await self._on_last_client_gone(session_id)
+
+    async def _on_last_client_gone(self, session_id: str):
+        active_connections.pop(session_id, None)
+
+        recording_data = await video_recorder.stop_recording(session_id)
+        if recording_data:
+            logger.info(f"Auto-stopped recording for disconnected session {session_id}")
+            await self._save_video_to_database(recording_data)
+
+        await self.stop_screenshot_stream(session_id)
+
+    def _drop_slow_client(self, client: ClientConnection, session_id: str):
+        """Called synchronously while queuing, the client leaves the session at once and is closed in the background"""
+        clients = active_connections.get(session_id, [])
+        if client not in clients:
+            return
+        clients.remove(client)
+        logger.warning(f"Disconnected slow WebSocket client of session {session_id}")
+
+        async def close_client():
+            await client.close(code=SLOW_CLIENT_CLOSE_CODE, reason="Client too slow")
+            if not clients:
+                await self._on_last_client_gone(session_id)
+
+        task = asyncio.create_task(close_client())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
     async def disconnect_screenshot(self, session_id: str):
         if f"screenshot_{session_id}" in active_connections:
@@ -68,33 +103,78 @@ class WebSocketManager:
                 logger.info(f"Auto-stopped recording for screenshot disconnect {session_id}")
                 await self._save_video_to_database(recording_data)
 
+    def event_log(self, session_id: str) -> EventLog:
+        session = active_sessions[session_id]
+        if "event_log" not in session:
+            session["event_log"] = EventLog(get_websocket_fanout_config()["replay_buffer_size"])
+        return session["event_log"]
+
+    def user_event_log(self, username: str) -> EventLog:
+        if username not in self._user_event_logs:
+            self._user_event_logs[username] = EventLog(get_websocket_fanout_config()["replay_buffer_size"])
+        return self._user_event_logs[username]
+
     async def broadcast_to_session(self, session_id: str, message: Dict[str, Any]):
-        if session_id in active_connections:
-            websockets = active_connections[session_id]
-
-            if message.get("type") == "task_complete" and "result" in message:
-                for task in active_sessions[session_id].get("tasks", []):
-                    if task.get("id") == message.get("task_id") and task.get("result"):
-                        if message["result"] == "Task completed successfully." and len(task.get("result")) > len(
-                                message["result"]):
-                            message["result"] = task["result"]
-                            if task.get("structured_logs") and not message.get("structured_logs"):
-                                message["structured_logs"] = task.get("structured_logs")
-                            break
-                if message.get("raw_result") and not message.get("formatted_output"):
-                    message["formatted_output"] = self._format_output_for_display(
-                        message.get("raw_result", ""),
-                        message.get("structured_logs", [])
-                    )
-
-            sanitized_message = sanitize_message_for_json(message)
-
-            for websocket in websockets[:]:
-                try:
-                    await websocket.send_json(sanitized_message)
-                except Exception as e:
-                    if websocket in active_connections[session_id]:
-                        active_connections[session_id].remove(websocket)
+        """
+        Number the message in the session's event log and queue it for every client of the session.
+        Never waits for a client to receive it, clients that are offline get it when they resume.
+        """
+        if session_id not in active_sessions:
+            return
+
+        if message.get("type") == "task_complete" and "result" in message:
+            for task in active_sessions[session_id].get("tasks", []):
+                if task.get("id") == message.get("task_id") and task.get("result"):
+                    if message["result"] == "Task completed successfully." and len(task.get("result")) > len(
+                            message["result"]):
+                        message["result"] = task["result"]
+                        if task.get("structured_logs") and not message.get("structured_logs"):
+                            message["structured_logs"] = task.get("structured_logs")
+                        break
+            if message.get("raw_result") and not message.get("formatted_output"):
+                message["formatted_output"] = self._format_output_for_display(
+                    message.get("raw_result", ""),
+                    message.get("structured_logs", [])
+                )
+
+        # encoded once for all clients, slow clients are removed from the list while sending
+        event = self.event_log(session_id).append(message)
+        for client in active_connections.get(session_id, [])[:]:
+            client.send_encoded(event.payload, event.key)
+
+        username = active_sessions[session_id].get("username")
+        if username and message.get("task_id"):
+            self.user_event_log(username).append({**message, "session_id": session_id})
+
+    def send_initial_state(self, client: ClientConnection, session_id: str, last_seq: Optional[int], full: bool):
+        """
+        Send a (re)connecting client the events it missed after last_seq, or a session snapshot when last_seq is
+        not given or its events already left the buffer. The snapshot omits bulky task fields unless full is set,
+        its seq is the point where the event stream continues.
+        """
+        session = active_sessions[session_id]
+        event_log = self.event_log(session_id)
+        missed = event_log.since(last_seq) if last_seq is not None else None
+        if missed is not None:
+            client.send({
+                "type": "session_resume",
+                "session_id": session_id,
+                "status": session["status"],
+                "resumed_from": last_seq,
+                "missed_events": len(missed)
+            })
+            client.replay(missed)
+            return
+
+        tasks = session["tasks"] if full else [light_task(task) for task in session["tasks"]]
+        client.send({
+            "type": "session_status",
+            "session_id": session_id,
+            "status": session["status"],
+            "tasks": tasks,
+            "full": full,
+            "seq": event_log.last_seq
+        })
 
     def _format_output_for_display(self, raw_output: str, structured_logs: List[Dict[str, str]]) -> str:
         if structured_logs:
@@ -316,23 +396,19 @@ class WebSocketManager:
 websocket_manager = WebSocketManager()
 
 @router.websocket("/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    if not await websocket_manager.connect(websocket, session_id):
+async def websocket_endpoint(websocket: WebSocket, session_id: str, last_seq: Optional[int] = None, full: bool = False):
+    client = await websocket_manager.connect(websocket, session_id)
+    if client is None:
         return
 
     try:
-        await websocket.send_json({
-            "type": "session_status",
-            "session_id": session_id,
-            "status": active_sessions[session_id]["status"],
-            "tasks": active_sessions[session_id]["tasks"]
-        })
+        websocket_manager.send_initial_state(client, session_id, last_seq, full)
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
 
             if message["type"] == "ping":
-                await websocket.send_json({"type": "pong"})
+                client.send({"type": "pong"})
             elif message["type"] == "start_capture":
                 await websocket_manager.start_screenshot_stream(session_id, message.get("interval", 1.0))
             elif message["type"] == "stop_capture":
@@ -343,14 +419,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             elif message["type"] == "get_recording_status":
                 recording_status = video_recorder.get_recording_status(session_id)
                 if recording_status:
-                    await websocket.send_json({
+                    client.send({
                         "type": "recording_status_response",
                         "status": "active",
                         "frame_count": recording_status["frame_count"],
                         "duration": recording_status["duration"]
                     })
                 else:
-                    await websocket.send_json({
+                    client.send({
                         "type": "recording_status_response",
                         "status": "inactive"
                     })
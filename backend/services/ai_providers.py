@@ -1,6 +1,6 @@
 import os
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from config import ANTHROPIC_API_KEY, OPENAI_API_KEY, DEEPSEEK_API_KEY
 
@@ -190,6 +190,44 @@ def get_llm_for_provider(
             raise ValueError(f"Failed to initialize AI model: {str(e)}")
 
 
+def get_fallback_llms(
+        fallback_models: List[Tuple[str, str]],
+        primary_provider: Optional[str] = None,
+        primary_model: Optional[str] = None
+) -> List[Any]:
+    """
+    Build LLM clients for hedged/failover requests from the default API keys
+
+    Args:
+        fallback_models: (provider, model) pairs in priority order
+        primary_provider: Provider already used as the primary model (skipped)
+        primary_model: Model already used as the primary model (skipped)
+
+    Returns:
+        List of LLM client objects, without duplicates of the primary or of each other
+    """
+    fallback_llms = []
+    seen = {(primary_provider, primary_model)}
+    for provider, model in fallback_models:
+        if (provider, model) in seen:
+            continue
+        try:
+            llm = get_llm_for_provider(provider, model, None, use_default_key=True)
+        except Exception as e:
+            logger.warning(f"Skipping fallback model {provider}/{model}: {str(e)}")
+            continue
+
+        # get_llm_for_provider may substitute the default Anthropic model when a key is missing
+        actual_model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        actual_key = (llm.__class__.__name__, actual_model)
+        if actual_key in seen:
+            continue
+        seen.add((provider, model))
+        seen.add(actual_key)
+        fallback_llms.append(llm)
+    return fallback_llms
+
+
 async def test_api_connection(provider: str, api_key: str, model: str = None, use_default_key: bool = False) -> Dict[
     str, Any]:
     """
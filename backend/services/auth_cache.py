@@ -0,0 +1,103 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+import bcrypt
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of authenticated principals, keyed by JWT.
+
+    A hit skips the user lookup of an authenticated request. Entries live ttl_seconds at most, never past the
+    expiry of their token, and all the tokens of a user are dropped at once by invalidate_user when the user is
+    deleted or changed.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # token -> (expires at, principal)
+        self._entries: Dict[str, tuple] = {}
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if time.monotonic() >= expires_at:
+            self._remove(token)
+            return None
+        return principal
+
+    def put(self, token: str, principal: Dict[str, Any], token_expires_at: Optional[float] = None):
+        """Cache a principal, token_expires_at is the "exp" claim of the token (unix time)"""
+        if self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+            if ttl <= 0:
+                return
+        if token not in self._entries and len(self._entries) >= self.max_entries:
+            self._prune()
+        self._entries[token] = (time.monotonic() + ttl, principal)
+        self._tokens_by_user.setdefault(principal["username"], set()).add(token)
+
+    def invalidate_user(self, username: str):
+        for token in self._tokens_by_user.pop(username, ()):
+            self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        username = entry[1]["username"]
+        tokens = self._tokens_by_user.get(username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[username]
+
+    def _prune(self):
+        """Drop expired entries, and the oldest ones when the cache is still full"""
+        now = time.monotonic()
+        for token in [token for token, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            self._remove(token)
+        # dicts keep insertion order, the first entries are the oldest
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool so hashing never blocks the event loop.
+
+    bcrypt is CPU bound and deliberately slow. max_workers caps how many hashes run at once, further logins
+    wait for a free worker instead of competing with the streams and agents for every core.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+
+    async def hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        hashed = await loop.run_in_executor(self._executor, bcrypt.hashpw, password.encode(), bcrypt.gensalt())
+        return hashed.decode()
+
+    async def check(self, password: str, hashed_password: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, bcrypt.checkpw, password.encode(), hashed_password.encode()
+        )
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Any, Dict
+
+from config import get_browser_pool_config, get_http_cache_config
+
+logger = logging.getLogger("browser-pool")
+
+# one pool per headless/visible mode, every session gets an isolated context in it
+_pools: Dict[bool, Any] = {}
+_pools_lock = asyncio.Lock()
+
+
+def is_shared_browser_mode() -> bool:
+    return get_browser_pool_config() is not None
+
+
+def build_browser_config(headless: bool):
+    """Browser settings shared by every agent the backend starts"""
+    from browser_use import BrowserConfig, BrowserContextConfig
+    from browser_use.browser.http_cache import HttpCacheConfig
+
+    http_cache_settings = get_http_cache_config()
+    context_config = BrowserContextConfig(
+        http_cache=HttpCacheConfig(**http_cache_settings) if http_cache_settings else None
+    )
+    return BrowserConfig(headless=headless, viewport_width=1920, viewport_height=1080, new_context_config=context_config)
+
+
+def invalidate_http_cache(origin: str) -> int:
+    """Drop the cached static resources of an origin, e.g. after a deployment"""
+    from browser_use.browser.http_cache import HttpCacheConfig, get_shared_http_cache
+
+    http_cache_settings = get_http_cache_config()
+    if not http_cache_settings:
+        return 0
+    return get_shared_http_cache(HttpCacheConfig(**http_cache_settings)).invalidate_origin(origin)
+
+
+async def _get_pool(headless: bool):
+    from browser_use import BrowserPool, BrowserPoolConfig
+
+    async with _pools_lock:
+        if headless not in _pools:
+            pool_settings = get_browser_pool_config() or {}
+            _pools[headless] = BrowserPool(build_browser_config(headless), BrowserPoolConfig(**pool_settings))
+            logger.info(f"Created shared browser pool (headless={headless}, settings={pool_settings})")
+        return _pools[headless]
+
+
+async def acquire_browser_context(session: Dict[str, Any], headless: bool):
+    """Create an isolated browser context for a session on a shared browser process"""
+    pool = await _get_pool(headless)
+    context = await pool.new_context()
+    session["browser_context"] = context
+    session["browser"] = context.browser
+    logger.info(f"Session context placed on shared browser, contexts per browser: {pool.context_counts}")
+    return context
+
+
+async def new_pooled_context(headless: bool):
+    """Isolated browser context on a shared, already running browser process, for runs without a session browser"""
+    pool = await _get_pool(headless)
+    return await pool.new_context()
+
+
+async def release_pooled_context(context) -> None:
+    for pool in _pools.values():
+        if context in pool.browsers.get(context.browser, ()):
+            await pool.release_context(context)
+            return
+    await context.close()
+
+
+async def close_session_browser(session: Dict[str, Any]) -> None:
+    """Release the browser resources of a session, whether it owns a browser or a shared context"""
+    context = session.pop("browser_context", None)
+    browser = session.get("browser")
+    session["browser"] = None
+
+    if context is not None:
+        await release_pooled_context(context)
+    elif browser is not None:
+        await browser.close()
+
+
+async def close_browser_pools() -> None:
+    async with _pools_lock:
+        for pool in _pools.values():
+            try:
+                await pool.close()
+            except Exception as e:
+                logger.error(f"Error closing browser pool: {str(e)}")
+        _pools.clear()
@@ -0,0 +1,110 @@
+import json
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from services.ws_fanout import EventLog, LoggedEvent
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# events after which a task stream ends
+TASK_FINISHED_EVENTS = {"task_complete", "task_error"}
+
+
+def format_sse(payload: str, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    if value is None or not value.strip().isdigit():
+        return None
+    return int(value.strip())
+
+
+async def stream_events(
+        event_log: EventLog,
+        last_seq: int,
+        matches: Callable[[LoggedEvent], bool],
+        is_alive: Callable[[], bool],
+        first_chunks: Iterable[str] = (),
+        is_final: Callable[[LoggedEvent], bool] = lambda event: False,
+        finished_snapshot: Callable[[], Optional[str]] = lambda: None
+) -> AsyncIterator[str]:
+    """
+    SSE chunks for the events of event_log after last_seq that match, live until is_final or not is_alive.
+
+    The event ids are the log's seq numbers, so a consumer that reconnects with Last-Event-ID continues right
+    after the last event it got. When the events it missed already left the buffer a "reset" event is sent
+    and the stream continues with the oldest buffered event. A consumer may resume after the final event, or the
+    final event may have been among the lost ones: after catching up (again after a reset) the stream ends with
+    the chunk of finished_snapshot when it returns one.
+    """
+    for chunk in first_chunks:
+        yield chunk
+
+    check_finished = True
+    while True:
+        events = event_log.since(last_seq)
+        if events is None:
+            missed_from = last_seq + 1
+            last_seq = event_log.first_seq - 1
+            yield format_sse(json.dumps({"missed_from": missed_from, "resumed_at": last_seq + 1}), "reset", last_seq)
+            check_finished = True
+            continue
+
+        for event in events:
+            last_seq = event.seq
+            if matches(event):
+                yield format_sse(event.payload, event.type, event.seq)
+                if is_final(event):
+                    return
+
+        if check_finished:
+            check_finished = False
+            snapshot = finished_snapshot()
+            if snapshot is not None:
+                yield snapshot
+                return
+
+        if not await event_log.wait(last_seq, SSE_KEEPALIVE_SECONDS):
+            if not is_alive():
+                return
+            # comment line, keeps proxies from closing an idle stream
+            yield ": keepalive\n\n"
+
+
+async def gzip_stream(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Gzip a stream, flushing after every chunk so events are not held back in the compressor"""
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def sse_headers(gzip: bool) -> Dict[str, str]:
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return headers
+
+
+def event_stream_response(chunks: AsyncIterator[str], accept_encoding: Optional[str]) -> StreamingResponse:
+    use_gzip = "gzip" in (accept_encoding or "").lower()
+    return StreamingResponse(
+        gzip_stream(chunks) if use_gzip else chunks,
+        media_type="text/event-stream",
+        headers=sse_headers(use_gzip)
+    )
+
+
+async def finished_stream(chunks: Iterable[str]) -> AsyncIterator[str]:
+    """Stream of chunks known up front, e.g. the snapshot of something that already finished"""
+    for chunk in chunks:
+        yield chunk
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.jira_service import JiraService
+
+logger = logging.getLogger("jira-jobs")
+
+# a worker sleeps at most this long between two looks at the queue, enqueues in this process wake it at once
+POLL_SECONDS = 5.0
+# running jobs refresh their lease, a job whose lease expired was left by a server that stopped
+LEASE_SECONDS = 300.0
+HEARTBEAT_SECONDS = 60.0
+# recording the outcome of a job is retried with a growing pause before the job is left to its lease
+FINISH_ATTEMPTS = 3
+FINISH_RETRY_SECONDS = 2.0
+
+MAX_PROGRESS_LINES = 10
+
+
+class JiraJobQueue:
+    """
+    Durable queue of Jira automation runs in MongoDB.
+
+    A webhook only inserts a job, a fixed number of workers claim jobs one at a time and run them with handler.
+    An issue has at most one queued or running job: webhooks for it are merged into that job (a unique partial
+    index on issue_key keeps this true across server processes), and redeliveries of a webhook already seen are
+    ignored. Jobs survive restarts, a running job whose lease expired is queued again up to max_attempts times.
+    """
+
+    def __init__(self, collection, handler: Callable[[Dict[str, Any]], Awaitable[None]], max_workers: int,
+                 max_attempts: int = 3):
+        self.collection = collection
+        self.handler = handler
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max_attempts
+        self.worker_id = str(uuid.uuid4())
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        # jobs run by this process, their leases are never treated as expired here
+        self._running: Set[str] = set()
+
+    async def setup(self):
+        await self.collection.create_index(
+            [("issue_key", ASCENDING)], unique=True, name="active_issue",
+            partialFilterExpression={"active": True}
+        )
+        await self.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created")
+        await self.collection.create_index([("webhook_ids", ASCENDING)], name="webhook_ids")
+        await self._requeue_expired()
+
+    def start(self):
+        for number in range(self.max_workers):
+            self._workers.append(asyncio.create_task(self._work(number)))
+        logger.info(f"Started {self.max_workers} Jira automation workers")
+
+    async def stop(self):
+        """Stop the workers, their running jobs are queued again by the next server start"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def enqueue(self, issue_key: str, webhook_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """Queue a run of issue_key, returns the job and False when an existing job absorbed the webhook"""
+        if webhook_id:
+            delivered = await self.collection.find_one({"webhook_ids": webhook_id})
+            if delivered:
+                return delivered, False
+
+        now = datetime.now()
+        job = {
+            "_id": str(uuid.uuid4()),
+            "issue_key": issue_key,
+            "status": "queued",
+            "active": True,
+            "attempts": 0,
+            "webhook_ids": [webhook_id] if webhook_id else [],
+            "duplicate_webhooks": 0,
+            "comment_id": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        try:
+            await self.collection.insert_one(job)
+        except DuplicateKeyError:
+            update: Dict[str, Any] = {"$inc": {"duplicate_webhooks": 1}, "$set": {"updated_at": now}}
+            if webhook_id:
+                update["$addToSet"] = {"webhook_ids": webhook_id}
+            existing = await self.collection.find_one_and_update(
+                {"issue_key": issue_key, "active": True}, update, return_document=ReturnDocument.AFTER
+            )
+            if existing:
+                return existing, False
+            # the active job finished in between
+            return await self.enqueue(issue_key, webhook_id)
+
+        self._wakeup.set()
+        return job, True
+
+    async def set_comment(self, job_id: str, comment_id: str):
+        await self.collection.update_one({"_id": job_id}, {"$set": {"comment_id": comment_id}})
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({}, {"webhook_ids": 0}).sort("created_at", DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def counts(self) -> Dict[str, int]:
+        return {
+            status["_id"]: status["count"]
+            async for status in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}])
+        }
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.now()
+        return await self.collection.find_one_and_update(
+            {"status": "queued"},
+            {
+                "$set": {
+                    "status": "running", "worker_id": self.worker_id, "started_at": now, "updated_at": now,
+                    "lease_until": now + timedelta(seconds=LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        """Record the outcome of a job, retried so a short database outage does not leave the job running"""
+        for attempt in range(1, FINISH_ATTEMPTS + 1):
+            now = datetime.now()
+            try:
+                # a job whose lease expired anyway may already run in another process, that run records the outcome
+                await self.collection.update_one(
+                    {"_id": job_id, "worker_id": self.worker_id},
+                    {
+                        "$set": {"status": status, "error": error, "finished_at": now, "updated_at": now},
+                        "$unset": {"active": "", "lease_until": ""}
+                    }
+                )
+                return
+            except Exception as e:
+                logger.error(f"Could not mark Jira job {job_id} {status} (attempt {attempt}): {str(e)}")
+                if attempt < FINISH_ATTEMPTS:
+                    await asyncio.sleep(FINISH_RETRY_SECONDS * attempt)
+
+    async def _release(self, job_id: str):
+        """Hand a job interrupted by a shutdown back to the queue"""
+        await self.collection.update_one(
+            {"_id": job_id, "status": "running"},
+            {"$set": {"status": "queued", "updated_at": datetime.now()}, "$unset": {"lease_until": ""}}
+        )
+
+    async def _requeue_expired(self):
+        expired = {"status": "running", "lease_until": {"$lt": datetime.now()}, "_id": {"$nin": list(self._running)}}
+        failed = await self.collection.update_many(
+            {**expired, "attempts": {"$gte": self.max_attempts}},
+            {
+                "$set": {"status": "failed", "error": "Interrupted too many times"},
+                "$unset": {"active": "", "lease_until": ""}
+            }
+        )
+        requeued = await self.collection.update_many(
+            expired, {"$set": {"status": "queued"}, "$unset": {"lease_until": ""}}
+        )
+        if failed.modified_count or requeued.modified_count:
+            logger.warning(f"Interrupted Jira jobs: {requeued.modified_count} queued again, {failed.modified_count} failed")
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                await self.collection.update_one(
+                    {"_id": job_id, "worker_id": self.worker_id},
+                    {"$set": {"lease_until": datetime.now() + timedelta(seconds=LEASE_SECONDS)}}
+                )
+            except Exception as e:
+                # the lease lasts several heartbeats, the next one may get through
+                logger.warning(f"Could not extend the lease of Jira job {job_id}: {str(e)}")
+
+    async def _work(self, number: int):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Jira worker {number} could not claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    try:
+                        await self._requeue_expired()
+                    except Exception as e:
+                        logger.error(f"Could not requeue interrupted Jira jobs: {str(e)}")
+                self._wakeup.clear()
+                continue
+
+            logger.info(f"Jira worker {number} running {job['issue_key']} (attempt {job['attempts']})")
+            self._running.add(job["_id"])
+            heartbeat = asyncio.create_task(self._heartbeat(job["_id"]))
+            try:
+                await self.handler(job)
+                await self._finish(job["_id"], "completed")
+            except asyncio.CancelledError:
+                await asyncio.shield(self._release(job["_id"]))
+                raise
+            except Exception as e:
+                logger.error(f"Jira job for {job['issue_key']} failed: {str(e)}", exc_info=True)
+                await self._finish(job["_id"], "failed", str(e))
+            finally:
+                heartbeat.cancel()
+                self._running.discard(job["_id"])
+
+
+class JiraRunComment:
+    """
+    The single comment of an automation run on its issue.
+
+    The comment is created when the run starts and edited afterwards. Progress lines are coalesced, the comment is
+    written at most once every min_interval seconds, and the final result replaces the progress in the same comment.
+    """
+
+    def __init__(self, jira_service: JiraService, issue_key: str, header: str, min_interval: float = 15.0,
+                 comment_id: Optional[str] = None):
+        self.jira_service = jira_service
+        self.issue_key = issue_key
+        self.header = header
+        self.min_interval = min_interval
+        self.comment_id = comment_id
+        self.lines: List[str] = []
+        self.final_text: Optional[str] = None
+        self._last_write = 0.0
+        self._pending: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def render(self) -> str:
+        if self.final_text is not None:
+            return self.final_text
+        return "\n".join([self.header, *self.lines])
+
+    def progress(self, line: str):
+        """Add a progress line, the comment is edited with the lines gathered until the next allowed write"""
+        self.lines = [*self.lines, line][-MAX_PROGRESS_LINES:]
+        if self._pending is None or self._pending.done():
+            delay = max(0.0, self._last_write + self.min_interval - time.monotonic())
+            self._pending = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        # finish() may cancel this task, a write already started still has to record the comment id
+        await asyncio.shield(self.flush())
+
+    async def flush(self) -> Optional[str]:
+        async with self._lock:
+            text = self.render()
+            if self.comment_id is None:
+                self.comment_id = await self.jira_service.add_comment(self.issue_key, text)
+            else:
+                await self.jira_service.update_comment(self.issue_key, self.comment_id, text)
+            self._last_write = time.monotonic()
+            return self.comment_id
+
+    async def finish(self, final_text: str) -> Optional[str]:
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self.final_text = final_text
+        return await self.flush()
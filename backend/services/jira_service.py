@@ -1,14 +1,16 @@
-import aiohttp
 import asyncio
-import json
 import logging
 import base64
 from typing import List, Dict, Any, Optional
-from jira import JIRA
-import aiohttp
+
+import httpx
+
+from config import get_jira_queue_config
 
 logger = logging.getLogger("jira-service")
 
+ISSUE_FIELDS = "summary,description,status,labels,assignee,reporter"
+
 
 class JiraService:
     """Service for interacting with Jira API"""
@@ -27,6 +29,7 @@ class JiraService:
         self.username = username
         self.api_token = api_token
         self.automation_labels = automation_labels or ['qa-automation', 'matrix-test', 'automated-test', 'automation']
+        self.connected = False
 
 
         auth_string = f"{username}:{api_token}"
@@ -34,20 +37,42 @@ class JiraService:
         auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
         self.auth_header = f"Basic {auth_b64}"
 
-
+        # one pooled client for every Jira call, requests beyond max_connections wait for a free connection
+        queue_config = get_jira_queue_config()
+        self.client = httpx.AsyncClient(
+            base_url=f"{self.jira_url}/rest/api/2",
+            headers={"Authorization": self.auth_header, "Accept": "application/json"},
+            timeout=queue_config["request_timeout"],
+            limits=httpx.Limits(max_connections=queue_config["max_connections"])
+        )
+
+    async def connect(self) -> bool:
+        """Check the credentials against the Jira instance"""
         try:
-            self.jira = JIRA(
-                server=jira_url,
-                basic_auth=(username, api_token)
-            )
-            logger.info(f"Successfully connected to Jira at {jira_url}")
+            await self._request("GET", "/myself")
+            self.connected = True
+            logger.info(f"Successfully connected to Jira at {self.jira_url}")
         except Exception as e:
             logger.error(f"Failed to connect to Jira: {e}")
-            self.jira = None
+            self.connected = False
+        return self.connected
 
     def is_connected(self) -> bool:
         """Check if Jira connection is established"""
-        return self.jira is not None
+        return self.connected
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = await self.client.request(method, path, **kwargs)
+        if response.status_code == 429:
+            # Jira Cloud rate limiting, retry once after the advertised delay
+            retry_after = float(response.headers.get("retry-after") or 5)
+            await asyncio.sleep(min(retry_after, 60))
+            response = await self.client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
 
     async def get_issue(self, issue_key: str) -> Optional[Dict[str, Any]]:
         """
@@ -60,25 +85,22 @@ class JiraService:
             Issue data dict or None if not found
         """
         try:
-            if not self.jira:
-                logger.error("Jira client not initialized")
-                return None
-
-            issue = self.jira.issue(issue_key)
+            issue = await self._request("GET", f"/issue/{issue_key}", params={"fields": ISSUE_FIELDS})
+            fields = issue.get("fields", {})
             return {
-                "key": issue.key,
+                "key": issue["key"],
                 "fields": {
-                    "summary": issue.fields.summary,
-                    "description": issue.fields.description,
+                    "summary": fields.get("summary"),
+                    "description": fields.get("description"),
                     "status": {
-                        "name": issue.fields.status.name
+                        "name": (fields.get("status") or {}).get("name")
                     },
-                    "labels": issue.fields.labels,
+                    "labels": fields.get("labels") or [],
                     "assignee": {
-                        "displayName": issue.fields.assignee.displayName if issue.fields.assignee else None
+                        "displayName": (fields.get("assignee") or {}).get("displayName")
                     },
                     "reporter": {
-                        "displayName": issue.fields.reporter.displayName if issue.fields.reporter else None
+                        "displayName": (fields.get("reporter") or {}).get("displayName")
                     }
                 }
             }
@@ -86,6 +108,13 @@ class JiraService:
             logger.error(f"Error getting issue {issue_key}: {e}")
             return None
 
+    async def search_issues(self, jql: str, max_results: int = 50, fields: str = ISSUE_FIELDS) -> List[Dict[str, Any]]:
+        """Raw issues matching a JQL query"""
+        result = await self._request(
+            "GET", "/search", params={"jql": jql, "maxResults": max_results, "fields": fields}
+        )
+        return result.get("issues", [])
+
     def has_automation_label(self, issue_data: Dict[str, Any]) -> bool:
         """Check if issue has any automation labels"""
         if not issue_data or not issue_data.get("fields"):
@@ -149,27 +178,30 @@ class JiraService:
         except Exception:
             return None
 
-    async def add_comment(self, issue_key: str, comment_text: str) -> bool:
-        """Add comment to Jira issue"""
+    async def add_comment(self, issue_key: str, comment_text: str) -> Optional[str]:
+        """Add comment to Jira issue, returns the id of the comment or None on failure"""
         try:
-            if not self.jira:
-                logger.error("Jira client not initialized")
-                return False
-
-            self.jira.add_comment(issue_key, comment_text)
+            comment = await self._request("POST", f"/issue/{issue_key}/comment", json={"body": comment_text})
             logger.info(f"Added comment to issue {issue_key}")
-            return True
+            return comment["id"]
         except Exception as e:
             logger.error(f"Error adding comment to {issue_key}: {e}")
-            return False
+            return None
 
-    async def add_formatted_comment(self, issue_key: str, title: str, result: str,
-                                    execution_time: str, status: str) -> bool:
-        """Add formatted test result comment to Jira issue"""
+    async def update_comment(self, issue_key: str, comment_id: str, comment_text: str) -> bool:
+        """Replace the text of an existing comment"""
         try:
-            status_emoji = "✅" if status == "SUCCESS" else "❌"
+            await self._request("PUT", f"/issue/{issue_key}/comment/{comment_id}", json={"body": comment_text})
+            return True
+        except Exception as e:
+            logger.error(f"Error updating comment {comment_id} of {issue_key}: {e}")
+            return False
 
-            comment = f"""
+    def format_result_comment(self, title: str, result: str, execution_time: str, status: str) -> str:
+        """Formatted test result comment"""
+        status_emoji = "✅" if status == "SUCCESS" else "❌"
+
+        return f"""
 {status_emoji} **MATRIX QA - {title}**
 
 **Status:** {status}
@@ -182,10 +214,11 @@ class JiraService:
 *Automated by Matrix QA Test Runner*
             """
 
-            return await self.add_comment(issue_key, comment)
-        except Exception as e:
-            logger.error(f"Error adding formatted comment to {issue_key}: {e}")
-            return False
+    async def add_formatted_comment(self, issue_key: str, title: str, result: str,
+                                    execution_time: str, status: str) -> bool:
+        """Add formatted test result comment to Jira issue"""
+        comment = self.format_result_comment(title, result, execution_time, status)
+        return await self.add_comment(issue_key, comment) is not None
 
     def get_automation_summary(self, issue_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get summary of automation-relevant data from issue"""
@@ -207,21 +240,10 @@ class JiraService:
     async def add_automation_label(self, issue_key: str, label: str) -> bool:
         """Add automation label to issue"""
         try:
-            if not self.jira:
-                logger.error("Jira client not initialized")
-                return False
-
-            issue = self.jira.issue(issue_key)
-            current_labels = issue.fields.labels or []
-
-            if label not in current_labels:
-                current_labels.append(label)
-                issue.update(fields={'labels': current_labels})
-                logger.info(f"Added label '{label}' to issue {issue_key}")
-            else:
-                logger.info(f"Label '{label}' already exists on issue {issue_key}")
-
+            # an "add" operation leaves the other labels alone and is a no-op when the label is already set
+            await self._request("PUT", f"/issue/{issue_key}", json={"update": {"labels": [{"add": label}]}})
+            logger.info(f"Added label '{label}' to issue {issue_key}")
             return True
         except Exception as e:
             logger.error(f"Error adding label to {issue_key}: {e}")
-            return False
\ No newline at end of file
+            return False
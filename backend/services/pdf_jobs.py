@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import logging
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config import get_pdf_render_config
+from services import pdf_renderer
+
+logger = logging.getLogger("pdf-jobs")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_cache: Optional["PDFCache"] = None
+
+
+class PDFCache:
+    """In-memory LRU of rendered PDFs keyed by a hash of the report input, bounded by total size"""
+
+    def __init__(self, max_size_bytes: int):
+        self.max_size_bytes = max_size_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        pdf_content = self._entries.get(key)
+        if pdf_content is not None:
+            self._entries.move_to_end(key)
+        return pdf_content
+
+    def put(self, key: str, pdf_content: bytes):
+        if len(pdf_content) > self.max_size_bytes:
+            return
+        if key in self._entries:
+            self.size_bytes -= len(self._entries.pop(key))
+        self._entries[key] = pdf_content
+        self.size_bytes += len(pdf_content)
+        while self.size_bytes > self.max_size_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+
+def report_cache_key(kind: str, payload: Any) -> str:
+    return hashlib.sha256(json.dumps([kind, payload], sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _get_cache() -> PDFCache:
+    global _cache
+    if _cache is None:
+        _cache = PDFCache(get_pdf_render_config()["cache_max_bytes"])
+    return _cache
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    workers = get_pdf_render_config()["workers"]
+    if workers <= 0:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"Started PDF render pool with {workers} worker processes")
+    return _executor
+
+
+async def _render(kind: str, render_function, *args) -> bytes:
+    """Render off the event loop, an identical report input is only rendered once while it stays cached"""
+    cache = _get_cache()
+    key = report_cache_key(kind, args)
+    pdf_content = cache.get(key)
+    if pdf_content is not None:
+        return pdf_content
+
+    executor = _get_executor()
+    if executor is None:
+        pdf_content = await asyncio.to_thread(render_function, *args)
+    else:
+        pdf_content = await asyncio.get_running_loop().run_in_executor(executor, render_function, *args)
+    cache.put(key, pdf_content)
+    return pdf_content
+
+
+async def render_report(report_data: Dict[str, Any]) -> bytes:
+    return await _render("report", pdf_renderer.render_pdf_report, report_data)
+
+
+async def render_multi_run_report(reports: List[Dict[str, Any]], period: str) -> bytes:
+    return await _render("multi_run", pdf_renderer.render_multi_run_report, reports, period)
+
+
+class _ChunkWriter:
+    """Unseekable file object for zipfile, the written bytes are handed out with drain()"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_report_zip(reports: List[Dict[str, Any]], filenames: List[str]) -> AsyncIterator[bytes]:
+    """
+    Zip of one PDF per report, every entry is sent as soon as it is rendered.
+
+    Reports are rendered a few at a time ahead of the one being written, so all the workers stay busy while
+    the archive is sent in order.
+    """
+    window = max(1, get_pdf_render_config()["workers"]) * 2
+    pending: List[asyncio.Task] = []
+    writer = _ChunkWriter()
+    next_report = 0
+
+    try:
+        # PDFs are already compressed, deflating them again would only cost event loop time
+        with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for filename in filenames:
+                while next_report < len(reports) and len(pending) < window:
+                    pending.append(asyncio.create_task(render_report(reports[next_report])))
+                    next_report += 1
+                pdf_content = await pending.pop(0)
+                archive.writestr(filename, pdf_content)
+                yield writer.drain()
+        yield writer.drain()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def close_pdf_workers():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,120 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+DEFAULT_RESULT = "Task completed successfully."
+
+
+def _clean_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text.replace("\xa0", " ").replace("\x00", "")).strip()
+
+
+def _is_json_extraction(text: str) -> bool:
+    return "Extracted from page" in text and "```json" in text
+
+
+class RunLogBuilder:
+    """
+    Builds the structured logs, the raw output and the result of an agent run from its events, as they happen.
+
+    Register handle() as an event hook of the Agent. Every event is processed once, so the cost grows with the
+    number of steps instead of re-serializing and scanning the whole history at the end of the run.
+    """
+
+    def __init__(self):
+        self.structured_logs: List[Dict[str, str]] = []
+        self.step_number = 0
+        self.last_goal: Optional[str] = None
+        self.last_action: Optional[Dict[str, Any]] = None
+        self.last_metadata = None
+        self.is_done = False
+        self.success: Optional[bool] = None
+        self.final_llm_message: Optional[str] = None
+        self._raw_lines: List[str] = []
+        self._last_result: Optional[str] = None
+        self._json_extraction: Optional[str] = None
+
+    def handle(self, event):
+        handler = getattr(self, f"_on_{event.type}", None)
+        if handler:
+            handler(event)
+
+    def _add_entry(self, entry_type: str, icon: str, text: str):
+        text = _clean_text(text)
+        if text:
+            self.structured_logs.append({"type": entry_type, "icon": icon, "text": text})
+
+    def _on_step_started(self, event):
+        self.step_number = event.step_number
+        # stay None for a step that failed before the model answered
+        self.last_goal = None
+        self.last_action = None
+        self._raw_lines.append(f"📍 Step {event.step_number}")
+
+    def _on_model_output(self, event):
+        self.step_number = event.step_number
+        self.last_goal = event.next_goal
+        self.last_action = event.actions[0] if event.actions else None
+        self._raw_lines.append(f"👍 Eval: {event.evaluation_previous_goal}")
+        self._raw_lines.append(f"🧠 Memory: {event.memory}")
+        self._raw_lines.append(f"🎯 Next goal: {event.next_goal}")
+        self._add_entry("memory", "🧠", event.memory)
+        self._add_entry("goal", "🎯", event.next_goal)
+        for number, action in enumerate(event.actions, start=1):
+            action_json = json.dumps(action, default=str)
+            self._raw_lines.append(f"🛠️  Action {number}/{len(event.actions)}: {action_json}")
+            self._add_entry("action", "🛠️", action_json)
+
+    def _on_action_result(self, event):
+        if event.error:
+            self._raw_lines.append(f"❌ Error: {event.error}")
+            self._add_entry("error", "❌", event.error)
+        if event.extracted_content:
+            self._raw_lines.append(f"📄 Result: {event.extracted_content}")
+            self._add_entry("result", "📄", event.extracted_content)
+            result_text = _clean_text(event.extracted_content)
+            if _is_json_extraction(result_text):
+                self._json_extraction = self._json_extraction or result_text
+            elif result_text:
+                self._last_result = result_text
+        if event.is_done:
+            self.is_done = True
+            self.success = event.success
+
+    def _on_step_finished(self, event):
+        self.last_metadata = event.metadata
+
+    def _on_done(self, event):
+        self.is_done = event.is_done
+        self.success = event.success
+        self.final_llm_message = event.final_result
+        if event.error:
+            self._raw_lines.append(f"❌ {event.error}")
+            self._add_entry("error", "❌", event.error)
+        elif event.is_done and event.success is False:
+            self._raw_lines.append("❌ Task completed without success")
+            self._add_entry("error", "❌", "Task completed without success")
+        elif event.is_done:
+            self._raw_lines.append("✅ Task completed successfully")
+            self._add_entry("success", "✅", "Task completed successfully")
+
+    @property
+    def raw_output(self) -> str:
+        return "\n".join(self._raw_lines)
+
+    @property
+    def result(self) -> str:
+        """Last plain result of the run, a JSON page extraction when there is none"""
+        return self._last_result or self._json_extraction or DEFAULT_RESULT
+
+    def step_info(self) -> Dict[str, Any]:
+        """Summary of the last step for task_step messages, goal is None when the model did not answer"""
+        step_info_data = {
+            "step": self.step_number,
+            "goal": self.last_goal,
+            "action": json.dumps(self.last_action, default=str) if self.last_action else "No action"
+        }
+        if self.last_metadata and self.last_metadata.blocked_requests:
+            step_info_data["blocked_requests"] = self.last_metadata.blocked_requests
+            step_info_data["blocked_bytes_estimate"] = self.last_metadata.blocked_bytes_estimate
+        return step_info_data
@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from config import get_security_suite_config
+
+logger = logging.getLogger("security-probes")
+
+_client: Optional[httpx.AsyncClient] = None
+
+USER_AGENT = "Mozilla/5.0 (compatible; MatrixQA-Probe/1.0)"
+
+# statuses that usually mean a bot wall or a login in front of the page, a real browser may get further
+BLOCKED_STATUSES = {401, 403, 407, 429, 503}
+
+TRAVERSAL_PAYLOADS = [
+    "../../../../../../../../etc/passwd",
+    "..%2f..%2f..%2f..%2f..%2f..%2f..%2f..%2fetc%2fpasswd",
+    "....//....//....//....//....//....//etc/passwd",
+    "..\\..\\..\\..\\..\\..\\windows\\win.ini",
+]
+TRAVERSAL_PARAMETERS = ["file", "page", "path", "include", "doc", "template"]
+TRAVERSAL_SIGNATURES = re.compile(r"root:[x*]?:0:0:|\[fonts\]|\[extensions\]|for 16-bit app support")
+
+EXPOSED_FILES = {
+    ".env": re.compile(r"^[A-Z][A-Z0-9_]*=", re.MULTILINE),
+    ".git/config": re.compile(r"\[core\]"),
+    ".git/HEAD": re.compile(r"^ref: refs/"),
+    "config.php": re.compile(r"<\?php|DB_PASSWORD"),
+    "wp-config.php": re.compile(r"<\?php|DB_PASSWORD"),
+    "web.config": re.compile(r"<configuration"),
+    "database.yml": re.compile(r"^\s*adapter:", re.MULTILINE),
+}
+
+VERSION_PATTERN = re.compile(r"\d+\.\d+")
+
+
+class ProbeCheck(NamedTuple):
+    name: str
+    # None for checks that only inform and do not count for the verdict
+    passed: Optional[bool]
+    detail: str
+
+
+class ProbeInconclusive(Exception):
+    """The target could not be checked without a browser, the test is escalated to the agent"""
+
+
+def get_probe_client() -> httpx.AsyncClient:
+    """One pooled client for every probe, connections to a target are reused across the tests of a suite"""
+    global _client
+    if _client is None:
+        suite_config = get_security_suite_config()
+        _client = httpx.AsyncClient(
+            timeout=suite_config["probe_timeout"],
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=suite_config["probe_max_connections"])
+        )
+    return _client
+
+
+async def close_probe_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class ProbeTarget:
+    """A target URL with its page response, fetched once for every probe of a suite that needs it"""
+
+    def __init__(self, target_url: str, client: Optional[httpx.AsyncClient] = None):
+        self.target_url = target_url
+        self.client = client or get_probe_client()
+        self._page: Optional[asyncio.Task] = None
+
+    @property
+    def is_https(self) -> bool:
+        return urlsplit(self.target_url).scheme == "https"
+
+    async def page(self) -> httpx.Response:
+        if self._page is None:
+            self._page = asyncio.ensure_future(self.client.get(self.target_url))
+        try:
+            response = await asyncio.shield(self._page)
+        except httpx.HTTPError as e:
+            raise ProbeInconclusive(f"Could not fetch {self.target_url}: {str(e) or type(e).__name__}")
+        if response.status_code in BLOCKED_STATUSES:
+            raise ProbeInconclusive(f"{self.target_url} answered {response.status_code} to a plain HTTP client")
+        return response
+
+    async def get(self, url: str) -> Optional[httpx.Response]:
+        try:
+            return await self.client.get(url, follow_redirects=False)
+        except httpx.HTTPError as e:
+            logger.debug(f"Probe request to {url} failed: {str(e)}")
+            return None
+
+
+def framing_checks(response: httpx.Response) -> List[ProbeCheck]:
+    frame_options = response.headers.get("x-frame-options", "").strip().upper()
+    csp = response.headers.get("content-security-policy", "")
+    frame_ancestors = next(
+        (directive.strip() for directive in csp.split(";") if directive.strip().lower().startswith("frame-ancestors")),
+        None
+    )
+
+    checks = []
+    if frame_ancestors:
+        sources = frame_ancestors.split()[1:]
+        checks.append(ProbeCheck(
+            "CSP frame-ancestors",
+            "*" not in sources,
+            f"{frame_ancestors}" + (" allows framing by any site" if "*" in sources else "")
+        ))
+    if frame_options:
+        checks.append(ProbeCheck(
+            "X-Frame-Options",
+            frame_options in ("DENY", "SAMEORIGIN"),
+            frame_options
+        ))
+    if not checks:
+        checks.append(ProbeCheck(
+            "Frame protection", False,
+            "X-Frame-Options and CSP frame-ancestors are both missing, the page can be framed (clickjacking)"
+        ))
+    return checks
+
+
+def cookie_checks(response: httpx.Response, is_https: bool) -> List[ProbeCheck]:
+    checks = []
+    for hop in [*response.history, response]:
+        for set_cookie in hop.headers.get_list("set-cookie"):
+            name = set_cookie.split("=", 1)[0].strip()
+            attributes = {part.strip().split("=", 1)[0].lower() for part in set_cookie.split(";")[1:]}
+            missing = [
+                flag for flag, present in (
+                    ("Secure", "secure" in attributes or not is_https),
+                    ("HttpOnly", "httponly" in attributes),
+                    ("SameSite", "samesite" in attributes)
+                ) if not present
+            ]
+            checks.append(ProbeCheck(
+                f"Cookie {name}",
+                not missing,
+                f"missing {', '.join(missing)}" if missing else "Secure, HttpOnly and SameSite set"
+            ))
+    return checks
+
+
+async def probe_clickjacking(target: ProbeTarget) -> List[ProbeCheck]:
+    return framing_checks(await target.page())
+
+
+async def probe_cookie_flags(target: ProbeTarget) -> List[ProbeCheck]:
+    checks = cookie_checks(await target.page(), target.is_https)
+    if not checks:
+        # the interesting cookies are usually set after a login
+        raise ProbeInconclusive("The page sets no cookies without interaction")
+    return checks
+
+
+async def probe_security_headers(target: ProbeTarget) -> List[ProbeCheck]:
+    response = await target.page()
+    headers = response.headers
+    checks = []
+
+    if target.is_https:
+        hsts = headers.get("strict-transport-security")
+        checks.append(ProbeCheck("Strict-Transport-Security", bool(hsts), hsts or "missing"))
+    else:
+        checks.append(ProbeCheck("HTTPS", False, "the target is served over plain HTTP"))
+
+    csp = headers.get("content-security-policy")
+    checks.append(ProbeCheck("Content-Security-Policy", bool(csp), csp or "missing"))
+
+    content_type_options = headers.get("x-content-type-options", "")
+    checks.append(ProbeCheck(
+        "X-Content-Type-Options", content_type_options.lower() == "nosniff", content_type_options or "missing"
+    ))
+
+    referrer_policy = headers.get("referrer-policy")
+    checks.append(ProbeCheck("Referrer-Policy", bool(referrer_policy), referrer_policy or "missing"))
+
+    permissions_policy = headers.get("permissions-policy")
+    checks.append(ProbeCheck("Permissions-Policy", bool(permissions_policy), permissions_policy or "missing"))
+
+    checks.extend(framing_checks(response))
+
+    for header in ("server", "x-powered-by", "x-aspnet-version"):
+        value = headers.get(header)
+        if value:
+            checks.append(ProbeCheck(
+                header.title(),
+                not VERSION_PATTERN.search(value),
+                f"{value}" + (" discloses a version" if VERSION_PATTERN.search(value) else "")
+            ))
+
+    checks.extend(cookie_checks(response, target.is_https))
+    return checks
+
+
+def _traversal_urls(target_url: str) -> List[str]:
+    scheme, netloc, path, query, _ = urlsplit(target_url)
+    parameters = parse_qsl(query, keep_blank_values=True)
+    names = [name for name, _ in parameters] or TRAVERSAL_PARAMETERS
+
+    urls = []
+    for payload in TRAVERSAL_PAYLOADS:
+        for name in names:
+            probe_query = urlencode([(key, payload if key == name else value) for key, value in parameters] or [(name, payload)], safe="%./\\")
+            urls.append(urlunsplit((scheme, netloc, path, probe_query, "")))
+        if payload.startswith("../"):
+            # encoded dot segments survive URL normalization on the way to the server
+            urls.append(urlunsplit((scheme, netloc, "/" + payload.replace("../", "%2e%2e/"), "", "")))
+    return urls
+
+
+async def probe_path_traversal(target: ProbeTarget) -> List[ProbeCheck]:
+    await target.page()
+    urls = _traversal_urls(target.target_url)
+    responses = await asyncio.gather(*(target.get(url) for url in urls))
+
+    answered = 0
+    checks = []
+    for url, response in zip(urls, responses):
+        if response is None:
+            continue
+        answered += 1
+        if response.status_code == 200 and TRAVERSAL_SIGNATURES.search(response.text):
+            checks.append(ProbeCheck("Path traversal", False, f"system file content returned by {url}"))
+
+    if not answered:
+        raise ProbeInconclusive("None of the traversal requests got an answer")
+    if not checks:
+        checks.append(ProbeCheck(
+            "Path traversal", True,
+            f"{answered} traversal payloads in the URL path and file parameters returned no system file"
+        ))
+    return checks
+
+
+async def probe_exposed_files(target: ProbeTarget) -> List[ProbeCheck]:
+    await target.page()
+    scheme, netloc = urlsplit(target.target_url)[:2]
+    base_url = f"{scheme}://{netloc}/"
+    paths = list(EXPOSED_FILES)
+    responses = await asyncio.gather(*(target.get(base_url + path) for path in [*paths, "robots.txt"]))
+
+    checks = []
+    for path, response in zip(paths, responses):
+        exposed = response is not None and response.status_code == 200 and bool(EXPOSED_FILES[path].search(response.text))
+        checks.append(ProbeCheck(f"/{path}", not exposed, "exposed" if exposed else "not accessible"))
+
+    robots = responses[-1]
+    if robots is not None and robots.status_code == 200:
+        disallowed = [
+            line.split(":", 1)[1].strip() for line in robots.text.splitlines()
+            if line.lower().startswith("disallow:") and line.split(":", 1)[1].strip()
+        ]
+        checks.append(ProbeCheck(
+            "/robots.txt", None,
+            f"{len(disallowed)} disallowed paths" + (f": {', '.join(disallowed[:20])}" if disallowed else "")
+        ))
+    return checks
+
+
+# value of the optional "probe" field of a catalogue test
+PROBES: Dict[str, Callable[[ProbeTarget], Awaitable[List[ProbeCheck]]]] = {
+    "clickjacking": probe_clickjacking,
+    "cookie_flags": probe_cookie_flags,
+    "security_headers": probe_security_headers,
+    "path_traversal": probe_path_traversal,
+    "exposed_files": probe_exposed_files,
+}
+
+
+def has_probe(test: Dict[str, Any]) -> bool:
+    return test.get("probe") in PROBES
+
+
+async def run_probe(test: Dict[str, Any], target: ProbeTarget) -> Dict[str, Any]:
+    """
+    Run the probe of a catalogue test. Returns the result fields of an agent run (status, verdict, result,
+    structured_logs), raises ProbeInconclusive when only a browser can tell.
+    """
+    checks = await PROBES[test["probe"]](target)
+
+    failed = [check for check in checks if check.passed is False]
+    counted = [check for check in checks if check.passed is not None]
+    if failed:
+        verdict = "issues_found"
+    elif counted:
+        verdict = "secure"
+    else:
+        verdict = "completed"
+
+    lines = []
+    structured_logs = []
+    for check in checks:
+        icon = "ℹ️" if check.passed is None else ("✅" if check.passed else "❌")
+        lines.append(f"{icon} {check.name}: {check.detail}")
+        structured_logs.append({
+            "type": "result" if check.passed is not False else "error", "icon": icon, "text": f"{check.name}: {check.detail}"
+        })
+
+    if failed:
+        summary = f"{test['summary']}: {len(failed)} of {len(counted)} checks failed on {target.target_url}."
+    else:
+        summary = f"{test['summary']}: all {len(counted)} checks passed on {target.target_url}."
+
+    return {
+        "status": "completed",
+        "verdict": verdict,
+        "result": "\n".join([summary, *lines]),
+        "structured_logs": structured_logs,
+        "checks": [check._asdict() for check in checks]
+    }
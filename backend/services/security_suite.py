@@ -0,0 +1,414 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import active_sessions, get_security_suite_config
+from models.schemas import SecuritySuiteRequest
+from services.ai_providers import get_llm_for_provider
+from services.browser_pool import new_pooled_context, release_pooled_context
+from services.pdf_renderer import assess_result
+from services.run_log import DEFAULT_RESULT, RunLogBuilder
+from services.security_probes import ProbeInconclusive, ProbeTarget, has_probe, run_probe
+from services.test_runner import build_agent_llm_options, direct_save_result_to_mongodb
+
+logger = logging.getLogger("security-suite")
+
+SEVERITY_ORDER = ["critical", "high", "medium", "low", "info"]
+
+# finished suites kept for GET /hacking/suites/{suite_id}, older ones are forgotten
+MAX_FINISHED_SUITES = 50
+
+NO_MESSAGE_RESULTS = {"Task completed but no message extracted", "Task completed, message not extracted."}
+
+active_suites: Dict[str, "SecuritySuiteRun"] = {}
+
+# shared by every suite, bounds the agents running security tests at once
+_suite_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_suite_slots() -> asyncio.Semaphore:
+    global _suite_slots
+    if _suite_slots is None:
+        _suite_slots = asyncio.Semaphore(get_security_suite_config()["max_concurrency"])
+    return _suite_slots
+
+
+def severity_rank(severity: Optional[str]) -> int:
+    severity = (severity or "").lower()
+    return SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else len(SEVERITY_ORDER)
+
+
+def new_test_result(test: Dict[str, Any], task_id: str, **fields) -> Dict[str, Any]:
+    result = {
+        "key": test["key"],
+        "summary": test["summary"],
+        "category": test["category"],
+        "severity": test["severity"],
+        "task_id": task_id,
+        "engine": "agent",
+        "status": "failed",
+        "verdict": "error",
+        "result": None,
+        "steps": 0,
+        "error": None,
+        "duration_seconds": 0
+    }
+    result.update(fields)
+    return result
+
+
+def format_test_instructions(test: Dict[str, Any], target_url: str) -> str:
+    """Same layout as the tests the dashboard submits, so results and PDF reports read the same"""
+    return f"TARGET URL: {target_url}\n\nSECURITY TEST: {test['summary']}\n\nINSTRUCTIONS:\n{test['instructions']}"
+
+
+class SecuritySuiteRun:
+    """
+    Runs catalogue tests against one target, every test as an isolated agent run on its own context of the
+    shared browser pool.
+
+    The suite is a session: each test is one of its tasks, so its progress reaches the session WebSocket, the
+    task and user SSE streams like any other task. Suite level suite_progress and suite_complete messages
+    are broadcast to the same session.
+    """
+
+    def __init__(
+            self,
+            request: SecuritySuiteRequest,
+            tests: List[Dict[str, Any]],
+            username: Optional[str],
+            websocket_manager
+    ):
+        suite_config = get_security_suite_config()
+        self.suite_id = str(uuid.uuid4())
+        self.request = request
+        self.tests = tests
+        self.username = username
+        self.websocket_manager = websocket_manager
+        self.max_steps = request.max_steps or suite_config["max_steps"]
+        self.max_concurrency = min(request.max_concurrency or suite_config["max_concurrency"], suite_config["max_concurrency"])
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.task_ids = {test["key"]: str(uuid.uuid4()) for test in tests}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.report: Optional[Dict[str, Any]] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.llm = None
+        self.llm_options: Dict[str, Any] = {}
+        self.probe_target = ProbeTarget(request.target_url)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        active_sessions[self.suite_id] = {
+            "browser": None,
+            "controller": None,
+            "status": "suite_running",
+            "tasks": [
+                {
+                    "id": self.task_ids[test["key"]],
+                    "instructions": format_test_instructions(test, self.request.target_url),
+                    "test_key": test["key"],
+                    "api_provider": self.request.api_provider,
+                    "api_model": self.request.api_model,
+                    "status": "pending"
+                }
+                for test in self.tests
+            ],
+            "capture_enabled": False,
+            "last_screenshot": None,
+            "username": self.username
+        }
+        active_suites[self.suite_id] = self
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        self._task.cancel()
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "suite_id": self.suite_id,
+            "session_id": self.suite_id,
+            "target_url": self.request.target_url,
+            "status": self.status,
+            "total": len(self.tests),
+            "finished": len(self.results),
+            "max_concurrency": self.max_concurrency,
+            "tests": [{"key": test["key"], "task_id": self.task_ids[test["key"]]} for test in self.tests],
+            "error": self.error,
+            "report": self.report
+        }
+
+    async def _broadcast(self, message: Dict[str, Any]):
+        if self.websocket_manager:
+            await self.websocket_manager.broadcast_to_session(self.suite_id, message)
+
+    def _update_task(self, task_id: str, **fields):
+        session = active_sessions.get(self.suite_id)
+        if not session:
+            return
+        for task_item in session["tasks"]:
+            if task_item["id"] == task_id:
+                task_item.update(fields)
+                return
+
+    async def run(self):
+        self.status = "running"
+        await self._broadcast({
+            "type": "suite_started",
+            "suite_id": self.suite_id,
+            "target_url": self.request.target_url,
+            "total": len(self.tests),
+            "tests": self.summary()["tests"]
+        })
+
+        try:
+            self.llm = get_llm_for_provider(
+                self.request.api_provider, self.request.api_model, self.request.api_key, self.request.use_default_key
+            )
+            self.llm_options = build_agent_llm_options(self.request.api_provider, self.request.api_model)
+            await asyncio.gather(*(self._run_bounded(test) for test in self.tests))
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "stopped"
+        except Exception as e:
+            logger.error(f"Security suite {self.suite_id} failed: {str(e)}", exc_info=True)
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            await self._finish()
+
+    async def _finish(self):
+        self.finished_at = datetime.utcnow()
+        self.report = build_suite_report(self)
+        session = active_sessions.get(self.suite_id)
+        if session:
+            session["status"] = f"suite_{self.status}"
+
+        await self._broadcast({"type": "suite_complete", "suite_id": self.suite_id, "status": self.status, "report": self.report})
+        logger.info(
+            f"Security suite {self.suite_id} {self.status}: {len(self.results)}/{len(self.tests)} tests, "
+            f"{self.report['verdicts'].get('issues_found', 0)} with issues"
+        )
+
+        if self.username and self.results:
+            await direct_save_result_to_mongodb(
+                username=self.username,
+                title=f"Security suite: {self.request.target_url}"[:100],
+                content=format_suite_report(self.report),
+                model_name=f"{self.request.api_provider}/{self.request.api_model}",
+                instructions_text=f"TARGET URL: {self.request.target_url}\n\nSECURITY TEST: Security suite of {len(self.tests)} tests"
+            )
+
+    async def _run_bounded(self, test: Dict[str, Any]):
+        # probes do not take a browser slot, only the tests they cannot decide wait for one
+        if self.request.use_probes and has_probe(test) and await self._run_probe(test, self.task_ids[test["key"]]):
+            return
+
+        async with self._slots:
+            async with _get_suite_slots():
+                if self.suite_id not in active_sessions:
+                    # the session was deleted, the tests that did not start yet are left out
+                    return
+                await self._run_test(test, self.task_ids[test["key"]])
+
+    async def _run_probe(self, test: Dict[str, Any], task_id: str) -> bool:
+        """Check a test over plain HTTP, returns False when it has to be escalated to the browser agent"""
+        if self.suite_id not in active_sessions:
+            return True
+
+        started = time.monotonic()
+        try:
+            probe_result = await run_probe(test, self.probe_target)
+        except ProbeInconclusive as e:
+            logger.info(f"Escalating {test['key']} to the browser agent: {str(e)}")
+            await self._broadcast({
+                "type": "task_update", "task_id": task_id, "test_key": test["key"], "status": "pending",
+                "message": f"Probe inconclusive ({str(e)}), queued for the browser agent"
+            })
+            return False
+        except Exception as e:
+            logger.error(f"Probe of {test['key']} failed, escalating to the browser agent: {str(e)}", exc_info=True)
+            return False
+
+        result = new_test_result(
+            test, task_id, engine="probe", duration_seconds=round(time.monotonic() - started, 3), **probe_result
+        )
+        self.results[test["key"]] = result
+        await self._report_test(result)
+        return True
+
+    async def _run_test(self, test: Dict[str, Any], task_id: str):
+        started = time.monotonic()
+        result = new_test_result(test, task_id)
+        self._update_task(task_id, status="running")
+        await self._broadcast({
+            "type": "task_update", "task_id": task_id, "test_key": test["key"], "status": "running",
+            "message": f"Running {test['key']}: {test['summary']}"
+        })
+
+        run_log = RunLogBuilder()
+        context = None
+        try:
+            from browser_use import Agent, Controller
+
+            context = await new_pooled_context(headless=True)
+
+            async def on_agent_event(event):
+                run_log.handle(event)
+                if event.type == "step_finished" and run_log.last_goal is not None:
+                    await self._broadcast({"type": "task_step", "task_id": task_id, "status": "running", "step_info": run_log.step_info()})
+
+            agent = Agent(
+                task=format_test_instructions(test, self.request.target_url),
+                llm=self.llm,
+                browser=context.browser,
+                browser_context=context,
+                controller=Controller(),
+                # short, independent runs, nothing worth summarizing into memory
+                enable_memory=False,
+                event_hooks=[on_agent_event],
+                **self.llm_options
+            )
+            await agent.browser_context.set_resource_blocking_profile(self.request.resource_profile)
+
+            agent_response_dict = await agent.run(max_steps=self.max_steps)
+            final_message = agent_response_dict.get("final_llm_message")
+            has_final_message = bool(final_message) and final_message not in NO_MESSAGE_RESULTS
+
+            # only the agent's own conclusion is graded, a run that stopped early or gave up proves nothing
+            if not run_log.is_done:
+                final_message = f"Agent stopped after {run_log.step_number} steps without finishing the test."
+                if run_log.result != DEFAULT_RESULT:
+                    final_message += f" Last result: {run_log.result}"
+                verdict = "completed"
+            elif run_log.success is False or not has_final_message:
+                final_message = final_message if has_final_message else run_log.result
+                verdict = "completed"
+            else:
+                verdict = assess_result(final_message)
+
+            result.update(
+                status="completed", result=final_message, verdict=verdict, structured_logs=run_log.structured_logs
+            )
+        except asyncio.CancelledError:
+            result.update(status="stopped", verdict="not_run", error="Suite stopped")
+            raise
+        except Exception as e:
+            logger.error(f"Security test {test['key']} failed: {str(e)}", exc_info=True)
+            result["error"] = str(e)
+        finally:
+            if context is not None:
+                try:
+                    await release_pooled_context(context)
+                except Exception as e:
+                    logger.error(f"Error releasing browser context of {test['key']}: {str(e)}")
+
+            result["steps"] = run_log.step_number
+            result["duration_seconds"] = round(time.monotonic() - started, 1)
+            self.results[test["key"]] = result
+            await self._report_test(result)
+
+    async def _report_test(self, result: Dict[str, Any]):
+        task_id = result["task_id"]
+        if result["status"] == "completed":
+            self._update_task(
+                task_id, status="completed", result=result["result"], verdict=result["verdict"],
+                engine=result["engine"], structured_logs=result.get("structured_logs", [])
+            )
+            await self._broadcast({
+                "type": "task_complete", "task_id": task_id, "test_key": result["key"], "status": "completed",
+                "result": result["result"], "verdict": result["verdict"], "engine": result["engine"],
+                "structured_logs": result.get("structured_logs", [])
+            })
+        else:
+            self._update_task(task_id, status=result["status"], error=result["error"])
+            await self._broadcast({
+                "type": "task_error", "task_id": task_id, "test_key": result["key"], "status": result["status"],
+                "error": result["error"]
+            })
+
+        await self._broadcast({
+            "type": "suite_progress",
+            "suite_id": self.suite_id,
+            "finished": len(self.results),
+            "total": len(self.tests),
+            "verdicts": dict(Counter(item["verdict"] for item in self.results.values()))
+        })
+
+
+def build_suite_report(suite: SecuritySuiteRun) -> Dict[str, Any]:
+    """Findings of every test, issues first by severity"""
+    results = []
+    for test in suite.tests:
+        result = suite.results.get(test["key"])
+        if result is None:
+            result = new_test_result(test, suite.task_ids[test["key"]], engine=None, status="not_run", verdict="not_run")
+        # the logs stay on the tasks, the report keeps the outcome
+        results.append({key: value for key, value in result.items() if key != "structured_logs"})
+
+    findings = sorted(
+        (result for result in results if result["verdict"] == "issues_found"),
+        key=lambda result: severity_rank(result["severity"])
+    )
+    return {
+        "suite_id": suite.suite_id,
+        "target_url": suite.request.target_url,
+        "status": suite.status,
+        "started_at": suite.created_at.isoformat() + "Z",
+        "finished_at": suite.finished_at.isoformat() + "Z" if suite.finished_at else None,
+        "total": len(results),
+        "statuses": dict(Counter(result["status"] for result in results)),
+        "verdicts": dict(Counter(result["verdict"] for result in results)),
+        "engines": dict(Counter(result["engine"] for result in results if result["engine"])),
+        "issues_by_severity": dict(Counter(result["severity"] for result in findings)),
+        "findings": [
+            {key: result[key] for key in ("key", "summary", "category", "severity", "result")}
+            for result in findings
+        ],
+        "results": results
+    }
+
+
+def format_suite_report(report: Dict[str, Any]) -> str:
+    """Plain text version of a suite report for the history"""
+    verdicts = report["verdicts"]
+    lines = [
+        f"Security suite for {report['target_url']}: {report['total']} tests, "
+        f"{verdicts.get('issues_found', 0)} with issues, {verdicts.get('secure', 0)} secure, "
+        f"{verdicts.get('completed', 0)} inconclusive, {verdicts.get('error', 0)} failed, "
+        f"{verdicts.get('not_run', 0)} not run."
+    ]
+    for finding in report["findings"]:
+        lines.append(f"[{finding['severity']}] {finding['key']} {finding['summary']}: {finding['result']}")
+    for verdict, label in (("secure", "Secure"), ("completed", "Inconclusive"), ("error", "Failed")):
+        keys = [result["key"] for result in report["results"] if result["verdict"] == verdict]
+        if keys:
+            lines.append(f"{label}: {', '.join(keys)}.")
+    return "\n\n".join(lines)
+
+
+def start_security_suite(
+        request: SecuritySuiteRequest,
+        tests: List[Dict[str, Any]],
+        username: Optional[str],
+        websocket_manager
+) -> SecuritySuiteRun:
+    finished = [suite_id for suite_id, suite in active_suites.items() if suite.report is not None]
+    for suite_id in finished[:max(0, len(finished) - MAX_FINISHED_SUITES + 1)]:
+        del active_suites[suite_id]
+        # the suite's session holds the task results and the event log of its streams
+        active_sessions.pop(suite_id, None)
+
+    suite = SecuritySuiteRun(request, tests, username, websocket_manager)
+    suite.start()
+    logger.info(f"Started security suite {suite.suite_id}: {len(tests)} tests against {request.target_url}, {suite.max_concurrency} at once")
+    return suite
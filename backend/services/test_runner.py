@@ -1,13 +1,13 @@
 import asyncio
 import logging
-import re
-import json
 from datetime import datetime
 from bson import ObjectId
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional
 
-from config import active_sessions
-from services.ai_providers import get_llm_for_provider
+from config import active_sessions, get_browser_resource_profile, get_llm_cache_config, get_llm_router_config
+from services.ai_providers import get_llm_for_provider, get_fallback_llms
+from services.browser_pool import acquire_browser_context, build_browser_config, is_shared_browser_mode
+from services.run_log import RunLogBuilder
 from mongodb_config import users_collection
 
 logger = logging.getLogger("test-runner")
@@ -20,137 +20,6 @@ async def broadcast_to_session(session_id: str, message: Dict[str, Any], websock
     await websocket_manager.broadcast_to_session(session_id, message)
 
 
-def extract_log_entries(result_text: str) -> List[Dict[str, str]]:
-    """
-    Extract structured log entries from the raw output
-
-    Args:
-        result_text: Raw result text from test execution
-
-    Returns:
-        List of structured log entries
-    """
-    entries = []
-    cleaned_text = result_text.replace('\xa0', ' ').replace('\x00', '').strip()
-    info_lines = re.findall(r'INFO:browser_use\.agent\.service:(.*?)(?=\nINFO:browser_use\.agent\.service:|$)',
-                            cleaned_text, re.DOTALL)
-
-    for line_content in info_lines:
-        entry_text = line_content.strip()
-        if not entry_text:
-            continue
-
-        entry_type = "info"
-        icon = ""
-        clean_text = entry_text
-
-        if entry_text.startswith('🧠'):
-            entry_type = "memory"; icon = "🧠"; clean_text = entry_text[2:].strip()
-        elif entry_text.startswith('🎯'):
-            entry_type = "goal"; icon = "🎯"; clean_text = entry_text[2:].strip()
-        elif entry_text.startswith('🛠️'):
-            entry_type = "action"; icon = "🛠️"; clean_text = entry_text[3:].strip()
-        elif entry_text.startswith('📄 Result:'):
-            entry_type = "result"; icon = "📄"; clean_text = entry_text[10:].strip()
-        elif entry_text.startswith('📄'):
-            entry_type = "result"; icon = "📄"; clean_text = entry_text[2:].strip()
-        elif entry_text.startswith('✅'):
-            entry_type = "success"; icon = "✅"; clean_text = entry_text[2:].strip()
-        elif entry_text.startswith('❌'):
-            entry_type = "error"; icon = "❌"; clean_text = entry_text[2:].strip()
-        elif 'Result:' in entry_text:
-            entry_type = "result"; icon = "📄"
-            result_match = re.search(r'Result:\s*(.*)', entry_text, re.DOTALL)
-            if result_match: clean_text = result_match.group(1).strip()
-
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        if clean_text:
-            entries.append({"type": entry_type, "icon": icon, "text": clean_text})
-    return entries
-
-
-def clean_history_string(history_str: str) -> str:
-    """
-    Cleans and extracts the actual result text from agent history string
-    """
-    cleaned_str = history_str.replace('\xa0', ' ').replace('\x00', '').strip()
-    extracted_contents = re.findall(r"extracted_content='([^']*)'", cleaned_str)
-    done_texts = re.findall(r"text': '([^']*)'", cleaned_str)
-
-    for content in extracted_contents:
-        if ("navigated to" in content.lower() and "requested" in content.lower()) or \
-           ("successfully" in content.lower() and "requested" in content.lower()):
-            return content
-    for text in done_texts:
-        if text and len(text) > 5: return text
-    if extracted_contents: return extracted_contents[-1]
-    return "Task completed successfully."
-
-
-def extract_clean_result(result_text: str) -> Tuple[str, List[Dict[str, str]]]:
-    """
-    Extract a clean result text and structured log entries from the raw result
-    """
-    log_entries = extract_log_entries(result_text)
-    clean_result = None
-    json_extraction = None
-    result_entries = [entry for entry in log_entries if entry["type"] == "result"]
-
-    for entry in reversed(result_entries):
-        if "Extracted from page" in entry["text"] and "```json" in entry["text"]:
-            if not json_extraction: json_extraction = entry["text"]
-            continue
-        else:
-            clean_result = entry["text"]; break
-
-    if not clean_result:
-        cleaned_text = result_text.replace('\xa0', ' ').replace('\x00', '').strip()
-        patterns = [
-            r'📄 Result:\s*(.*?)(?=\n(?:INFO:|✅|📝|$))',
-            r'INFO:browser_use\.agent\.service:📄 Result:\s*(.*?)(?=\n(?:INFO:|$))',
-            r'📄\s*Result:\s*(.*?)(?=\n(?:INFO:|✅|📝|$))',
-            r'Result:\s*(.*?)(?=\n(?:INFO:|✅|📝|$))',
-        ]
-        for pattern in patterns:
-            matches = list(re.finditer(pattern, cleaned_text, re.DOTALL | re.IGNORECASE))
-            if matches:
-                match = matches[-1]; result_text_found = match.group(1).strip()
-                if "Extracted from page" in result_text_found and "```json" in result_text_found:
-                    if not json_extraction: json_extraction = result_text_found
-                    continue
-                else:
-                    clean_result = re.sub(r'\s+', ' ', result_text_found).strip(); break
-
-    if not clean_result and '{"done":{"text":' in result_text:
-        done_match = re.search(r'"done":\s*{"text":\s*"([^"]*)"', result_text)
-        if done_match: clean_result = done_match.group(1)
-
-    if not clean_result and ("AgentHistoryList" in result_text or "ActionResult" in result_text):
-        clean_result = clean_history_string(result_text)
-
-    json_content = None
-    json_match = re.search(r'```json\n([\s\S]*?)\n```', result_text)
-    if json_match: json_content = json_match.group(1).strip()
-
-    if clean_result: return clean_result, log_entries
-    elif json_extraction: return json_extraction, log_entries
-    elif json_content: return f"```json\n{json_content}\n```", log_entries
-    else: return "Task completed successfully.", log_entries
-
-
-def format_raw_output(raw_output: str) -> str:
-    """
-    Format the raw output to be more readable
-    """
-    formatted = re.sub(r'\n{3,}', '\n\n', raw_output)
-    formatted = re.sub(r'(INFO:[^\n]+)\n', r'\1\n\n', formatted)
-    if "AgentHistoryList" in formatted:
-        try:
-            formatted = formatted.replace(", ", ",\n  ").replace("(", "(\n  ").replace(")", "\n)") \
-                               .replace("[", "[\n  ").replace("]", "\n]")
-        except Exception: pass
-    return formatted
-
 async def direct_save_result_to_mongodb(
     username: str,
     title: str,
@@ -194,6 +63,27 @@ async def direct_save_result_to_mongodb(
 
 
 
+def build_agent_llm_options(api_provider: Optional[str], api_model: Optional[str]) -> Dict[str, Any]:
+    """Agent arguments for the configured LLM response cache and hedging/failover"""
+    options: Dict[str, Any] = {}
+
+    llm_cache_settings = get_llm_cache_config()
+    if llm_cache_settings:
+        from browser_use.agent.llm_cache import LLMCacheConfig
+        options["llm_cache_config"] = LLMCacheConfig(**llm_cache_settings)
+
+    llm_router_settings = get_llm_router_config()
+    if llm_router_settings:
+        from browser_use.agent.llm_router import LLMRouterConfig
+        options["fallback_llms"] = get_fallback_llms(llm_router_settings["fallback_models"], api_provider, api_model)
+        router_kwargs = {"hedge_percentile": llm_router_settings["hedge_percentile"]}
+        if llm_router_settings["request_timeout"] is not None:
+            router_kwargs["request_timeout"] = llm_router_settings["request_timeout"]
+        options["llm_router_config"] = LLMRouterConfig(**router_kwargs)
+
+    return options
+
+
 async def execute_test(
         session_id: str,
         task_id: str,
@@ -204,7 +94,8 @@ async def execute_test(
         api_model: Optional[str] = "claude-3-5-sonnet-20240620",
         api_key: Optional[str] = None,
         use_default_key: bool = True,
-        websocket_manager=None
+        websocket_manager=None,
+        resource_profile: Optional[str] = None
 ):
     if session_id not in active_sessions:
         logger.error(f"Sesión {session_id} no found")
@@ -228,7 +119,7 @@ async def execute_test(
     }, websocket_manager)
 
     try:
-        from browser_use import Agent, Browser, BrowserConfig, Controller
+        from browser_use import Agent, Browser, Controller
 
         if not session.get("browser"):
             from config import X_SERVER_AVAILABLE
@@ -237,9 +128,13 @@ async def execute_test(
                 logger.warning("Forcing headless mode due to missing X server.")
                 await broadcast_to_session(session_id, {"type": "task_update", "task_id": task_id, "status": "running", "message": "No display server. Forced headless."}, websocket_manager)
 
-            browser_config = BrowserConfig(headless=actual_headless, viewport_width=1920, viewport_height=1080)
-            logger.info(f"Initializing browser with headless={actual_headless}, viewport=1920x1080")
-            session["browser"] = Browser(config=browser_config)
+            if is_shared_browser_mode():
+                logger.info(f"Initializing shared browser context with headless={actual_headless}, viewport=1920x1080")
+                await acquire_browser_context(session, actual_headless)
+            else:
+                browser_config = build_browser_config(actual_headless)
+                logger.info(f"Initializing browser with headless={actual_headless}, viewport=1920x1080")
+                session["browser"] = Browser(config=browser_config)
             session["controller"] = Controller()
             session["status"] = "browser_ready"
             await broadcast_to_session(session_id, {"type": "session_update", "status": "browser_ready", "message": f"Browser initialized ({'headless' if actual_headless else 'visible'})"}, websocket_manager)
@@ -266,55 +161,46 @@ async def execute_test(
             await broadcast_to_session(session_id, {"type": "task_error", "task_id": task_id, "status": "failed", "error": f"AI init error: {str(llm_error)}"}, websocket_manager)
             return
 
+        run_log = RunLogBuilder()
+
+        async def on_agent_event(event):
+            run_log.handle(event)
+            if event.type == "step_finished" and run_log.last_goal is not None:
+                await broadcast_to_session(session_id, {"type": "task_step", "task_id": task_id, "status": "running", "step_info": run_log.step_info()}, websocket_manager)
+
         agent = Agent(
             task=instructions,
             llm=llm_for_agent,
             browser=session["browser"],
+            browser_context=session.get("browser_context"),
             controller=session["controller"],
-            enable_memory=True
+            enable_memory=True,
+            event_hooks=[on_agent_event],
+            **build_agent_llm_options(api_provider, api_model)
         )
 
 
-        original_step = agent.step
-        async def step_with_notification(*args, **kwargs):
-            step_result = await original_step(*args, **kwargs)
-            try:
-                if agent.state.history.history and agent.state.history.history[-1].model_output:
-                    step_info_data = {
-                        "step": agent.state.n_steps,
-                        "goal": agent.state.history.history[-1].model_output.current_state.next_goal,
-                        "action": str(agent.state.history.history[-1].model_output.action[0]) if agent.state.history.history[-1].model_output.action else "No action"
-                    }
-                    await broadcast_to_session(session_id, {"type": "task_step", "task_id": task_id, "status": "running", "step_info": step_info_data}, websocket_manager)
-            except Exception as e_step: logger.error(f"Error extracting step info: {str(e_step)}")
-            return step_result
-        agent.step = step_with_notification
+        resource_profile = resource_profile or get_browser_resource_profile()
+        await agent.browser_context.set_resource_blocking_profile(resource_profile)
+        if resource_profile:
+            logger.info(f"Blocking browser resources with profile: {resource_profile}")
 
         logger.info(f"Running agent with instructions: {instructions}")
         agent_response_dict = await agent.run(max_steps=100)
 
-        agent_history_list_object = agent_response_dict.get("history")
         intercepted_final_llm_message = agent_response_dict.get("final_llm_message", "Task completed, message not extracted.")
 
         logger.info(f"=== USING LLM MESSAGE DIRECTLY: {intercepted_final_llm_message[:200] if intercepted_final_llm_message else 'None'}...")
 
-        raw_result_str_for_processing = ""
-        if agent_history_list_object:
-            try:
-                raw_result_str_for_processing = agent_history_list_object.json()
-            except AttributeError:
-                raw_result_str_for_processing = str(agent_history_list_object)
-        else:
-            raw_result_str_for_processing = intercepted_final_llm_message
-
-        formatted_raw_result_for_client = format_raw_output(raw_result_str_for_processing)
-        clean_result_from_extraction, structured_logs_for_client = extract_clean_result(raw_result_str_for_processing)
+        # built step by step from the agent events while the run was going
+        formatted_raw_result_for_client = run_log.raw_output
+        structured_logs_for_client = run_log.structured_logs
 
         final_message_to_show_and_save = intercepted_final_llm_message
 
         if not final_message_to_show_and_save or final_message_to_show_and_save == "Task completed, message not extracted.":
-            logger.warning("No message from LLM, using fallback...")
-            final_message_to_show_and_save = "Task completed successfully."
+            logger.warning("No message from LLM, using the last result of the run...")
+            final_message_to_show_and_save = run_log.result
 
         logger.info(f"Final message for task: {final_message_to_show_and_save[:200]}...")
 
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("ws-fanout")
+
+# Status messages that only matter in their latest version. A queued one is replaced by a newer message
+# with the same key instead of being sent twice to a client that is behind.
+COALESCED_MESSAGE_TYPES = {"session_update", "task_update", "task_progress", "capture_status", "suite_progress"}
+
+SLOW_CLIENT_CLOSE_CODE = 4002
+
+# task fields left out of reconnect snapshots unless the client asks for the full tasks
+BULKY_TASK_FIELDS = ("raw_output", "structured_logs", "formatted_output")
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialize a message once for every client, values that are not JSON types are sent as strings"""
+    return json.dumps(message, default=str)
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    message_type = message.get("type")
+    if message_type not in COALESCED_MESSAGE_TYPES:
+        return None
+    return message_type, message.get("task_id")
+
+
+def light_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in task.items() if key not in BULKY_TASK_FIELDS}
+
+
+class LoggedEvent(NamedTuple):
+    seq: int
+    payload: str
+    key: Optional[Tuple[str, Any]]
+    type: Optional[str]
+    task_id: Optional[str]
+
+
+class EventLog:
+    """
+    Bounded, sequence-numbered history of the events broadcast to a session (or to all sessions of a user).
+
+    Every event gets the next "seq" before it is encoded, so a client that reconnects with the last seq it
+    saw can be sent exactly the events it missed, as long as they are still in the buffer.
+    """
+
+    def __init__(self, max_events: int = 500):
+        self.last_seq = 0
+        self._events: Deque[LoggedEvent] = deque(maxlen=max_events)
+        # replaced on every append, waiters keep the instance they started waiting on
+        self._appended = asyncio.Event()
+
+    def append(self, message: Dict[str, Any]) -> LoggedEvent:
+        """Number and encode a message"""
+        self.last_seq += 1
+        event = LoggedEvent(
+            self.last_seq,
+            encode_message({**message, "seq": self.last_seq}),
+            coalesce_key(message),
+            message.get("type"),
+            message.get("task_id")
+        )
+        self._events.append(event)
+        self._appended.set()
+        self._appended = asyncio.Event()
+        return event
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest seq still in the buffer"""
+        return self._events[0].seq if self._events else self.last_seq + 1
+
+    def since(self, last_seq: int) -> Optional[List[LoggedEvent]]:
+        """Events after last_seq, or None when some of them already left the buffer (or last_seq is unknown)"""
+        if last_seq > self.last_seq or last_seq < 0:
+            return None
+        if last_seq == self.last_seq:
+            return []
+        first_seq = self.first_seq
+        if last_seq + 1 < first_seq:
+            return None
+        return list(islice(self._events, last_seq + 1 - first_seq, None))
+
+    async def wait(self, last_seq: int, timeout: float) -> bool:
+        """Wait until there is an event after last_seq, returns False on timeout"""
+        if self.last_seq > last_seq:
+            return True
+        appended = self._appended
+        try:
+            await asyncio.wait_for(appended.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class ClientConnection:
+    """
+    One dashboard WebSocket with its own bounded outbound queue, drained by a dedicated writer task.
+
+    Enqueuing never awaits the network, so a slow tab cannot delay the other clients or the agent that
+    broadcasts. A client whose queue overflows, or whose oldest queued message waited longer than
+    max_lag_seconds, is disconnected and reported through on_slow.
+    """
+
+    def __init__(
+            self,
+            websocket: WebSocket,
+            max_queue_size: int = 256,
+            max_lag_seconds: float = 10.0,
+            on_slow: Optional[Callable[["ClientConnection"], None]] = None
+    ):
+        self.websocket = websocket
+        self.max_queue_size = max_queue_size
+        self.max_lag_seconds = max_lag_seconds
+        self.on_slow = on_slow
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        # entries are [coalesce key, encoded message, enqueue time], a coalesced entry moves to the tail
+        self._queue: Deque[list] = deque()
+        self._queued_by_key: Dict[Tuple[str, Any], list] = {}
+        self._wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        return self.send_encoded(encode_message(message), coalesce_key(message))
+
+    def send_encoded(self, payload: str, key: Optional[Tuple[str, Any]] = None) -> bool:
+        """Queue an encoded message, returns False when the client is closed or was dropped for being too slow"""
+        if self.closed:
+            return False
+
+        now = time.monotonic()
+        if key is not None and key in self._queued_by_key:
+            self._coalesce(key, payload)
+            self.coalesced += 1
+            return True
+
+        if len(self._queue) >= self.max_queue_size or (
+                self._queue and now - self._queue[0][2] > self.max_lag_seconds
+        ):
+            logger.warning(
+                f"Dropping slow WebSocket client: {len(self._queue)} messages queued, "
+                f"oldest waiting {now - self._queue[0][2]:.1f}s"
+            )
+            self._drop()
+            return False
+
+        self._enqueue(payload, key, now)
+        return True
+
+    def replay(self, events: List[LoggedEvent]):
+        """Queue missed events on reconnect, a backlog the client did not cause does not count as being slow"""
+        now = time.monotonic()
+        for event in events:
+            if event.key is not None and event.key in self._queued_by_key:
+                self._coalesce(event.key, event.payload)
+            else:
+                self._enqueue(event.payload, event.key, now)
+
+    def _coalesce(self, key: Tuple[str, Any], payload: str):
+        """
+        Replace the queued message of key by a newer one. The replacement goes to the tail so the seq numbers
+        stay increasing: a client resumes from the highest seq it got and must have received everything before it.
+        The enqueue time of the old message is kept, the client has been behind on this key since then.
+        """
+        old_entry = self._queued_by_key[key]
+        self._queue.remove(old_entry)
+        entry = [key, payload, old_entry[2]]
+        self._queue.append(entry)
+        self._queued_by_key[key] = entry
+        self._wakeup.set()
+
+    def _enqueue(self, payload: str, key: Optional[Tuple[str, Any]], now: float):
+        entry = [key, payload, now]
+        self._queue.append(entry)
+        if key is not None:
+            self._queued_by_key[key] = entry
+        self._wakeup.set()
+
+    async def _writer(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                key, payload, _ = self._queue.popleft()
+                if key is not None:
+                    self._queued_by_key.pop(key, None)
+                await self.websocket.send_text(payload)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # the socket is gone, the receive loop of the endpoint handles the disconnect
+            logger.debug(f"WebSocket writer stopped: {str(e)}")
+            self.closed = True
+
+    def _drop(self):
+        self.closed = True
+        self._writer_task.cancel()
+        self._queue.clear()
+        self._queued_by_key.clear()
+        if self.on_slow:
+            self.on_slow(self)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        """Stop the writer and close the socket, queued messages are discarded"""
+        self.closed = True
+        self._writer_task.cancel()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
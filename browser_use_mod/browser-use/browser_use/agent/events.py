@@ -0,0 +1,56 @@
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from browser_use.agent.views import StepMetadata
+
+
+class StepStartedEvent(BaseModel):
+	type: Literal['step_started'] = 'step_started'
+	step_number: int
+
+
+class ModelOutputEvent(BaseModel):
+	"""The model decided the actions of a step"""
+
+	type: Literal['model_output'] = 'model_output'
+	step_number: int
+	evaluation_previous_goal: str
+	memory: str
+	next_goal: str
+	actions: list[dict[str, Any]]
+
+
+class ActionResultEvent(BaseModel):
+	"""One result of a step, in the order the actions ran (step errors are results too)"""
+
+	type: Literal['action_result'] = 'action_result'
+	step_number: int
+	extracted_content: str | None = None
+	error: str | None = None
+	is_done: bool = False
+	success: bool | None = None
+
+
+class StepFinishedEvent(BaseModel):
+	type: Literal['step_finished'] = 'step_finished'
+	step_number: int
+	metadata: StepMetadata | None = None
+
+
+class AgentDoneEvent(BaseModel):
+	"""End of Agent.run, also emitted when the run stopped early or failed"""
+
+	type: Literal['done'] = 'done'
+	step_number: int
+	is_done: bool
+	success: bool | None = None
+	final_result: str | None = None
+	error: str | None = None
+
+
+AgentEvent = StepStartedEvent | ModelOutputEvent | ActionResultEvent | StepFinishedEvent | AgentDoneEvent
+
+# sync or async, called in order for every event the agent emits
+AgentEventHook = Callable[[AgentEvent], None] | Callable[[AgentEvent], Awaitable[None]]
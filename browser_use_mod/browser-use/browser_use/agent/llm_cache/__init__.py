@@ -0,0 +1,4 @@
+from browser_use.agent.llm_cache.service import LLMResponseCache
+from browser_use.agent.llm_cache.views import LLMCacheConfig
+
+__all__ = ['LLMResponseCache', 'LLMCacheConfig']
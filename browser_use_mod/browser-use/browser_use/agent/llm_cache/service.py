@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import BaseMessage
+
+from browser_use.agent.llm_cache.views import LLMCacheConfig
+from browser_use.exceptions import LLMCacheMissError
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+	"""
+	Content-addressed disk cache for LLM responses.
+
+	Entries are keyed by a hash of the normalized input messages, the model name and a namespace
+	(e.g. the action schema), stored as one JSON file per key and evicted least-recently-used
+	once the cache directory grows past `max_size_bytes`. File mtimes double as the LRU clock.
+	"""
+
+	# volatile parts of the prompt that would otherwise make every key unique
+	DATETIME_PATTERN = re.compile(r'Current date and time: \d{4}-\d{2}-\d{2} \d{2}:\d{2}')
+	WHITESPACE_PATTERN = re.compile(r'\s+')
+
+	def __init__(self, config: LLMCacheConfig | None = None):
+		self.config = config or LLMCacheConfig()
+		self.cache_dir = Path(self.config.cache_dir)
+		self.cache_dir.mkdir(parents=True, exist_ok=True)
+		self.hits = 0
+		self.misses = 0
+
+		# path -> (size, last access), loaded once and kept in sync on every write
+		self._index: dict[Path, tuple[int, float]] = {}
+		for path in self.cache_dir.glob('*/*.json'):
+			stat = path.stat()
+			self._index[path] = (stat.st_size, stat.st_mtime)
+		self._total_size = sum(size for size, _ in self._index.values())
+
+	# Keys -------------------------------------------------------------------
+
+	def _normalize_text(self, text: str) -> str:
+		text = self.DATETIME_PATTERN.sub('', text)
+		return self.WHITESPACE_PATTERN.sub(' ', text).strip()
+
+	def _normalize_content(self, content: Any) -> Any:
+		if isinstance(content, str):
+			return self._normalize_text(content)
+		if isinstance(content, list):
+			parts = []
+			for part in content:
+				if isinstance(part, dict) and part.get('type') == 'image_url':
+					if not self.config.include_images_in_key:
+						parts.append('<image>')
+						continue
+					url = part['image_url']['url'] if isinstance(part.get('image_url'), dict) else str(part.get('image_url'))
+					parts.append(hashlib.sha256(url.encode()).hexdigest())
+				elif isinstance(part, dict) and part.get('type') == 'text':
+					parts.append(self._normalize_text(part.get('text', '')))
+				else:
+					parts.append(self._normalize_content(part))
+			return parts
+		return content
+
+	def _normalize_message(self, message: BaseMessage) -> dict[str, Any]:
+		normalized: dict[str, Any] = {'type': message.type, 'content': self._normalize_content(message.content)}
+		# tool call ids are counters, only the calls themselves matter
+		tool_calls = getattr(message, 'tool_calls', None)
+		if tool_calls:
+			normalized['tool_calls'] = [{'name': call['name'], 'args': call['args']} for call in tool_calls]
+		return normalized
+
+	def make_key(self, model_name: str, messages: list[BaseMessage] | str, namespace: str = '') -> str:
+		"""Hash the normalized messages together with the model name and namespace"""
+		if isinstance(messages, str):
+			normalized_messages: Any = self._normalize_text(messages)
+		else:
+			normalized_messages = [self._normalize_message(message) for message in messages]
+		payload = json.dumps(
+			{'model': model_name, 'namespace': namespace, 'messages': normalized_messages},
+			sort_keys=True,
+			ensure_ascii=False,
+			default=str,
+		)
+		return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+	# Storage ----------------------------------------------------------------
+
+	def _path_for_key(self, key: str) -> Path:
+		return self.cache_dir / key[:2] / f'{key}.json'
+
+	def get(self, key: str) -> Any | None:
+		"""Return the cached value for `key`, or None on a miss (raises LLMCacheMissError in replay mode)"""
+		path = self._path_for_key(key)
+		value = None
+		if self.config.mode != 'record' and path.exists():
+			try:
+				value = json.loads(path.read_text(encoding='utf-8'))['value']
+			except (OSError, ValueError, KeyError) as e:
+				logger.debug(f'Ignoring unreadable LLM cache entry {path}: {e}')
+				value = None
+
+		if value is None:
+			self.misses += 1
+			if self.config.mode == 'replay':
+				raise LLMCacheMissError(key)
+			return None
+
+		self.hits += 1
+		now = time.time()
+		try:
+			os.utime(path, (now, now))
+		except OSError:
+			pass
+		if path in self._index:
+			size = self._index[path][0]
+		else:
+			# written by another process sharing the cache dir
+			size = path.stat().st_size
+			self._total_size += size
+		self._index[path] = (size, now)
+		logger.debug(f'LLM cache hit {key[:12]}')
+		return value
+
+	def set(self, key: str, value: Any) -> None:
+		"""Store `value` (must be JSON serializable) under `key` and evict old entries if over the size cap"""
+		if self.config.mode == 'replay':
+			return
+
+		path = self._path_for_key(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		data = json.dumps({'key': key, 'created_at': time.time(), 'value': value}, ensure_ascii=False)
+
+		# write to a temp file first so concurrent readers never see a half-written entry
+		tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+		tmp_path.write_text(data, encoding='utf-8')
+		os.replace(tmp_path, path)
+
+		old_size = self._index.get(path, (0, 0.0))[0]
+		size = path.stat().st_size
+		self._index[path] = (size, time.time())
+		self._total_size += size - old_size
+		self._evict()
+
+	def _evict(self) -> None:
+		"""Drop least-recently-used entries until the cache fits in max_size_bytes"""
+		if self._total_size <= self.config.max_size_bytes:
+			return
+
+		for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+			if self._total_size <= self.config.max_size_bytes:
+				break
+			try:
+				path.unlink()
+			except FileNotFoundError:
+				pass
+			except OSError as e:
+				logger.debug(f'Failed to evict LLM cache entry {path}: {e}')
+				continue
+			del self._index[path]
+			self._total_size -= size
+
+	def __len__(self) -> int:
+		return len(self._index)
+
+	@property
+	def total_size(self) -> int:
+		return self._total_size
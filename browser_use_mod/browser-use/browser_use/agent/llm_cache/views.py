@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+LLMCacheMode = Literal['read_write', 'record', 'replay']
+
+
+class LLMCacheConfig(BaseModel):
+	"""Configuration for the on-disk LLM response cache."""
+
+	model_config = ConfigDict(validate_default=True, validate_assignment=True)
+
+	cache_dir: str = Field(default='/tmp/browser_use_llm_cache', min_length=1)
+	max_size_bytes: int = Field(default=256 * 1024 * 1024, gt=0)
+
+	# read_write: serve hits, call the LLM and store on miss
+	# record: always call the LLM and overwrite the stored entry
+	# replay: serve hits only, raise LLMCacheMissError on miss (for CI)
+	mode: LLMCacheMode = 'read_write'
+
+	# screenshots differ between runs of the same page, so by default they are left out of the key
+	include_images_in_key: bool = False
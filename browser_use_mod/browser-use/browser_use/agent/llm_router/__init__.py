@@ -0,0 +1,4 @@
+from browser_use.agent.llm_router.service import LatencyHistogram, LLMRouter
+from browser_use.agent.llm_router.views import LLMRouterConfig
+
+__all__ = ['LatencyHistogram', 'LLMRouter', 'LLMRouterConfig']
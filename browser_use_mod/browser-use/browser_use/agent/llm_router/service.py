@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.llm_router.views import LLMRouterConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class LatencyHistogram:
+	"""Rolling window of successful request latencies (seconds) for one provider/model"""
+
+	def __init__(self, size: int = 200):
+		self.samples: deque[float] = deque(maxlen=size)
+
+	def record(self, latency: float) -> None:
+		self.samples.append(latency)
+
+	def percentile(self, q: float) -> float | None:
+		"""Nearest-rank percentile, q in (0, 1). None if there are no samples yet"""
+		if not self.samples:
+			return None
+		ordered = sorted(self.samples)
+		rank = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+		return ordered[rank]
+
+	def __len__(self) -> int:
+		return len(self.samples)
+
+
+# shared by every router in the process so thresholds survive across agent runs
+_latency_histograms: dict[str, LatencyHistogram] = {}
+
+
+def get_latency_histogram(label: str, size: int = 200) -> LatencyHistogram:
+	if label not in _latency_histograms:
+		_latency_histograms[label] = LatencyHistogram(size=size)
+	return _latency_histograms[label]
+
+
+def get_llm_label(llm: BaseChatModel) -> str:
+	model_name = getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or 'Unknown'
+	return f'{llm.__class__.__name__}/{model_name}'
+
+
+class LLMRouter(Generic[T]):
+	"""
+	Runs an LLM request against a primary model with hedging and failover.
+
+	If the primary has not answered within the configured latency percentile of its own history, a duplicate
+	request is sent to the next model; the first successful result wins and the other requests are cancelled.
+	A failed or timed out request fails over to the next model. Errors are only raised once every model failed.
+	"""
+
+	def __init__(self, llms: list[BaseChatModel], config: LLMRouterConfig | None = None):
+		if not llms:
+			raise ValueError('LLMRouter needs at least one LLM')
+		self.llms = llms
+		self.config = config or LLMRouterConfig()
+		self.labels = [get_llm_label(llm) for llm in llms]
+
+	def histogram(self, label: str) -> LatencyHistogram:
+		return get_latency_histogram(label, size=self.config.histogram_size)
+
+	def hedge_delay(self, label: str) -> float:
+		"""Seconds to wait on a request to `label` before sending a hedged duplicate"""
+		histogram = self.histogram(label)
+		threshold = histogram.percentile(self.config.hedge_percentile)
+		if threshold is None or len(histogram) < self.config.min_samples:
+			return self.config.default_hedge_delay
+		return max(self.config.min_hedge_delay, threshold)
+
+	async def _timed(self, call: Callable[[BaseChatModel], Awaitable[T]], llm: BaseChatModel) -> T:
+		if self.config.request_timeout is None:
+			return await call(llm)
+		return await asyncio.wait_for(call(llm), timeout=self.config.request_timeout)
+
+	async def run(self, call: Callable[[BaseChatModel], Awaitable[T]]) -> T:
+		"""Run `call(llm)` with hedging/failover and return the first successful result"""
+		pending: dict[asyncio.Task, tuple[str, float]] = {}
+		next_index = 0
+		hedges_left = self.config.max_hedges
+		last_error: BaseException | None = None
+
+		def launch() -> None:
+			nonlocal next_index
+			llm, label = self.llms[next_index], self.labels[next_index]
+			next_index += 1
+			task = asyncio.ensure_future(self._timed(call, llm))
+			pending[task] = (label, time.monotonic())
+
+		launch()
+		try:
+			while pending:
+				can_hedge = hedges_left > 0 and next_index < len(self.llms)
+				timeout = None
+				if can_hedge:
+					# hedge against the oldest request still in flight
+					oldest_label, oldest_start = min(pending.values(), key=lambda item: item[1])
+					timeout = max(0.0, self.hedge_delay(oldest_label) - (time.monotonic() - oldest_start))
+
+				done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+				if not done:
+					logger.info(f'⏱️  {oldest_label} slower than p{int(self.config.hedge_percentile * 100)}, hedging with {self.labels[next_index]}')
+					hedges_left -= 1
+					launch()
+					continue
+
+				for task in done:
+					label, start = pending.pop(task)
+					error = task.exception()
+					if error is None:
+						latency = time.monotonic() - start
+						self.histogram(label).record(latency)
+						logger.debug(f'LLM request to {label} succeeded in {latency:.2f}s')
+						return task.result()
+
+					last_error = error
+					reason = 'timed out' if isinstance(error, asyncio.TimeoutError) else f'failed: {error}'
+					logger.warning(f'⚠️  LLM request to {label} {reason}')
+
+				if not pending and next_index < len(self.llms):
+					logger.info(f'↪️  Failing over to {self.labels[next_index]}')
+					launch()
+		finally:
+			for task in pending:
+				task.cancel()
+			if pending:
+				await asyncio.gather(*pending, return_exceptions=True)
+
+		assert last_error is not None
+		raise last_error
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LLMRouterConfig(BaseModel):
+	"""Configuration for hedged and failover LLM requests."""
+
+	model_config = ConfigDict(validate_default=True, validate_assignment=True)
+
+	# hedge once the primary is slower than this percentile of its own recent latencies
+	hedge_percentile: float = Field(default=0.95, gt=0, lt=1)
+	# samples needed before the percentile is trusted, until then default_hedge_delay is used
+	min_samples: int = Field(default=5, ge=1)
+	default_hedge_delay: float = Field(default=15.0, gt=0)
+	min_hedge_delay: float = Field(default=1.0, ge=0)
+	# maximum number of concurrent duplicate requests on top of the primary (0 = failover only)
+	max_hedges: int = Field(default=1, ge=0)
+	# per-request timeout in seconds, a timed out request counts as failed and triggers failover
+	request_timeout: float | None = Field(default=120.0, gt=0)
+	# number of latency samples kept per provider
+	histogram_size: int = Field(default=200, ge=1)
@@ -22,7 +22,20 @@ from langchain_core.messages import (
 # from lmnr.sdk.decorators import observe
 from pydantic import BaseModel, ValidationError
 
+from browser_use.agent.events import (
+	ActionResultEvent,
+	AgentDoneEvent,
+	AgentEvent,
+	AgentEventHook,
+	ModelOutputEvent,
+	StepFinishedEvent,
+	StepStartedEvent,
+)
 from browser_use.agent.gif import create_history_gif
+from browser_use.agent.llm_cache.service import LLMResponseCache
+from browser_use.agent.llm_cache.views import LLMCacheConfig
+from browser_use.agent.llm_router.service import LLMRouter
+from browser_use.agent.llm_router.views import LLMRouterConfig
 from browser_use.agent.memory.service import Memory
 from browser_use.agent.memory.views import MemoryConfig
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
@@ -33,6 +46,7 @@ from browser_use.agent.message_manager.utils import (
 	save_conversation,
 )
 from browser_use.agent.prompts import AgentMessagePrompt, PlannerPrompt, SystemPrompt
+from browser_use.agent.stream_parser import STREAMING_SAFE_ACTIONS, StreamingActionParser
 from browser_use.agent.views import (
 	REQUIRED_LLM_API_ENV_VARS,
 	ActionResult,
@@ -43,6 +57,7 @@ from browser_use.agent.views import (
 	AgentSettings,
 	AgentState,
 	AgentStepInfo,
+	ReplayStepTiming,
 	StepMetadata,
 	ToolCallingMethod,
 )
@@ -55,7 +70,9 @@ from browser_use.dom.history_tree_processor.service import (
 	DOMHistoryElement,
 	HistoryTreeProcessor,
 )
-from browser_use.exceptions import LLMException
+from browser_use.dom.history_tree_processor.view import HashedDomElement
+from browser_use.dom.views import DOMElementNode
+from browser_use.exceptions import LLMCacheMissError, LLMException, ReplayElementNotFoundError, StreamedActionsError
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
 	AgentTelemetryEvent,
@@ -115,6 +132,8 @@ class Agent(Generic[Context]):
 			| None
 		) = None,
 		register_external_agent_status_raise_error_callback: Callable[[], Awaitable[bool]] | None = None,
+		# Typed events of the run (step started, model output, action results, step finished, done)
+		event_hooks: list[AgentEventHook] | None = None,
 		# Agent settings
 		use_vision: bool = True,
 		use_vision_for_planner: bool = False,
@@ -142,6 +161,10 @@ class Agent(Generic[Context]):
 			'data-date-format',
 		],
 		max_actions_per_step: int = 10,
+		stream_actions: bool = False,
+		batch_actions: bool = False,
+		pipeline_steps: bool = False,
+		pipeline_prewarm_elements: int = 20,
 		tool_calling_method: ToolCallingMethod | None = 'auto',
 		page_extraction_llm: BaseChatModel | None = None,
 		planner_llm: BaseChatModel | None = None,
@@ -153,6 +176,9 @@ class Agent(Generic[Context]):
 		save_playwright_script_path: str | None = None,
 		enable_memory: bool = True,
 		memory_config: MemoryConfig | None = None,
+		llm_cache_config: LLMCacheConfig | None = None,
+		fallback_llms: list[BaseChatModel] | None = None,
+		llm_router_config: LLMRouterConfig | None = None,
 		source: str | None = None,
 	):
 		if page_extraction_llm is None:
@@ -180,6 +206,10 @@ class Agent(Generic[Context]):
 			available_file_paths=available_file_paths,
 			include_attributes=include_attributes,
 			max_actions_per_step=max_actions_per_step,
+			stream_actions=stream_actions,
+			batch_actions=batch_actions,
+			pipeline_steps=pipeline_steps,
+			pipeline_prewarm_elements=pipeline_prewarm_elements,
 			tool_calling_method=tool_calling_method,
 			page_extraction_llm=page_extraction_llm,
 			planner_llm=planner_llm,
@@ -193,10 +223,26 @@ class Agent(Generic[Context]):
 		self.enable_memory = enable_memory
 		self.memory_config = memory_config
 
+		# LLM response cache settings (None = every call goes to the LLM)
+		self.llm_cache = LLMResponseCache(llm_cache_config) if llm_cache_config else None
+		# seconds the page took to settle after each action of the current step
+		self._action_settle_times: list[float] = []
+		# timing of every step of the last rerun_history call
+		self.replay_timings: list[ReplayStepTiming] = []
+
+		# Hedged / failover requests for get_next_action (None = single request to llm, no timeout)
+		if fallback_llms or llm_router_config:
+			self.llm_router = LLMRouter([llm, *(fallback_llms or [])], config=llm_router_config)
+		else:
+			self.llm_router = None
+
 		# Initialize state
 		self.state = injected_agent_state or AgentState()
 
 		# Action setup
+		if not self.settings.batch_actions:
+			# the model must not call it directly either: no clicks or key events, no new-element check in between
+			self.controller.registry.registry.actions.pop('batch_actions', None)
 		self._setup_action_models()
 		self._set_browser_use_version_and_source(source)
 		self.initial_actions = self._convert_initial_actions(initial_actions) if initial_actions else None
@@ -227,7 +273,9 @@ class Agent(Generic[Context]):
 			f'{" +tools" if self.tool_calling_method == "function_calling" else ""}'
 			f'{" +rawtools" if self.tool_calling_method == "raw" else ""}'
 			f'{" +vision" if self.settings.use_vision else ""}'
-			f'{" +memory" if self.enable_memory else ""}, '
+			f'{" +memory" if self.enable_memory else ""}'
+			f'{f" +cache({self.llm_cache.config.mode})" if self.llm_cache is not None else ""}'
+			f'{f" +fallbacks={self.llm_router.labels[1:]}" if self.llm_router and len(self.llm_router.labels) > 1 else ""}, '
 			f'planner_model={self.planner_model_name}'
 			f'{" +reasoning" if self.settings.is_planner_reasoning else ""}'
 			f'{" +vision" if self.settings.use_vision_for_planner else ""}, '
@@ -313,6 +361,7 @@ class Agent(Generic[Context]):
 		self.register_new_step_callback = register_new_step_callback
 		self.register_done_callback = register_done_callback
 		self.register_external_agent_status_raise_error_callback = register_external_agent_status_raise_error_callback
+		self.event_hooks: list[AgentEventHook] = list(event_hooks or [])
 
 		# Context
 		self.context = context
@@ -385,29 +434,40 @@ class Agent(Generic[Context]):
 
 	def _setup_action_models(self) -> None:
 		"""Setup dynamic action models from controller's registry"""
+		# output models per action model, the registry returns the same action model for the same set of actions
+		self._agent_output_models: dict[type[ActionModel], type[AgentOutput]] = {}
+
 		# Initially only include actions with no filters
 		self.ActionModel = self.controller.registry.create_action_model()
 		# Create output model with the dynamic actions
-		self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
+		self.AgentOutput = self._get_agent_output_model(self.ActionModel)
 
 		# used to force the done action when max_steps is reached
 		self.DoneActionModel = self.controller.registry.create_action_model(include_actions=['done'])
-		self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
+		self.DoneAgentOutput = self._get_agent_output_model(self.DoneActionModel)
+
+	def _get_agent_output_model(self, action_model: type[ActionModel]) -> type[AgentOutput]:
+		if action_model not in self._agent_output_models:
+			self._agent_output_models[action_model] = AgentOutput.type_with_custom_actions(action_model)
+		return self._agent_output_models[action_model]
 
 	def _set_tool_calling_method(self) -> ToolCallingMethod | None:
+		return self._get_tool_calling_method(self.chat_model_library, self.model_name)
+
+	def _get_tool_calling_method(self, chat_model_library: str, model_name: str) -> ToolCallingMethod | None:
 		tool_calling_method = self.settings.tool_calling_method
 		if tool_calling_method == 'auto':
-			if is_model_without_tool_support(self.model_name):
+			if is_model_without_tool_support(model_name):
 				return 'raw'
-			elif self.chat_model_library == 'ChatGoogleGenerativeAI':
+			elif chat_model_library == 'ChatGoogleGenerativeAI':
 				return None
-			elif self.chat_model_library == 'ChatOpenAI':
+			elif chat_model_library == 'ChatOpenAI':
 				return 'function_calling'
-			elif self.chat_model_library == 'AzureChatOpenAI':
+			elif chat_model_library == 'AzureChatOpenAI':
 				# Azure OpenAI API requires 'tools' parameter for GPT-4
 				# The error 'content must be either a string or an array' occurs when
 				# the API expects a tools array but gets something else
-				if 'gpt-4' in self.model_name.lower():
+				if 'gpt-4' in model_name.lower():
 					return 'tools'
 				else:
 					return 'function_calling'
@@ -435,9 +495,15 @@ class Agent(Generic[Context]):
 	async def step(self, step_info: AgentStepInfo | None = None) -> None:
 		"""Execute one step of the task"""
 		logger.info(f'📍 Step {self.state.n_steps}')
+		await self._emit_event(StepStartedEvent(step_number=self.state.n_steps))
 		state = None
 		model_output = None
 		result: list[ActionResult] = []
+		# actions already executed while the model output was streaming
+		streamed_results: list[ActionResult] = []
+		prewarm_task: asyncio.Task | None = None
+		pipelined_seconds = 0.0
+		self._action_settle_times = []
 		step_start_time = time.time()
 		tokens = 0
 
@@ -500,8 +566,17 @@ class Agent(Generic[Context]):
 			input_messages = self._message_manager.get_messages()
 			tokens = self._message_manager.state.history.current_tokens
 
+			if self.settings.pipeline_steps:
+				prewarm_task = asyncio.create_task(self._prewarm_step(state))
+
 			try:
-				model_output = await self.get_next_action(input_messages)
+				if self._can_stream_actions():
+					model_output, streamed_results = await self._stream_next_action(input_messages)
+				else:
+					model_output = await self.get_next_action(input_messages)
+				if prewarm_task:
+					pipelined_seconds = await self._finish_prewarm(prewarm_task)
+					prewarm_task = None
 				if (
 					not model_output.action
 					or not isinstance(model_output.action, list)
@@ -536,6 +611,15 @@ class Agent(Generic[Context]):
 						await self.register_new_step_callback(state, model_output, self.state.n_steps)
 					else:
 						self.register_new_step_callback(state, model_output, self.state.n_steps)
+				await self._emit_event(
+					ModelOutputEvent(
+						step_number=self.state.n_steps,
+						evaluation_previous_goal=model_output.current_state.evaluation_previous_goal,
+						memory=model_output.current_state.memory,
+						next_goal=model_output.current_state.next_goal,
+						actions=[action.model_dump(exclude_unset=True) for action in model_output.action],
+					)
+				)
 				if self.settings.save_conversation_path:
 					target = self.settings.save_conversation_path + f'_{self.state.n_steps}.txt'
 					save_conversation(input_messages, model_output, target, self.settings.save_conversation_path_encoding)
@@ -559,7 +643,14 @@ class Agent(Generic[Context]):
 				self._message_manager._remove_last_state_message()
 				raise e
 
-			result: list[ActionResult] = await self.multi_act(model_output.action)
+			if streamed_results and (
+				streamed_results[-1].is_done or streamed_results[-1].error or len(streamed_results) == len(model_output.action)
+			):
+				result = streamed_results
+			else:
+				result = streamed_results + await self.multi_act(
+					model_output.action[len(streamed_results) :], executed_before=len(streamed_results)
+				)
 
 			self.state.last_result = result
 
@@ -582,23 +673,67 @@ class Agent(Generic[Context]):
 			# logger.debug('Task cancelled - agent was paused with Ctrl+C')
 			self.state.last_result = [ActionResult(error='The agent was paused with Ctrl+C', include_in_memory=False)]
 			raise InterruptedError('Step cancelled by user')
+		except StreamedActionsError as e:
+			# the executed actions stay in the history and in the next prompt, the page has moved
+			result = e.results + await self._handle_step_error(e.error)
+			self.state.last_result = result
 		except Exception as e:
 			result = await self._handle_step_error(e)
 			self.state.last_result = result
 
 		finally:
+			if prewarm_task:
+				pipelined_seconds = await self._finish_prewarm(prewarm_task)
+
 			step_end_time = time.time()
+			blocking_stats = self.browser_context.take_resource_blocking_stats()
+			if blocking_stats and blocking_stats.blocked_requests:
+				logger.debug(
+					f'🚫 Blocked {blocking_stats.blocked_requests} requests (~{blocking_stats.estimated_bytes_saved // 1024} KB) '
+					f'{blocking_stats.by_resource_type}'
+				)
 			if not result:
 				return
 
+			for action_result in result:
+				await self._emit_event(
+					ActionResultEvent(
+						step_number=self.state.n_steps,
+						extracted_content=action_result.extracted_content,
+						error=action_result.error,
+						is_done=action_result.is_done or False,
+						success=action_result.success,
+					)
+				)
+
+			metadata = None
 			if state:
 				metadata = StepMetadata(
 					step_number=self.state.n_steps,
 					step_start_time=step_start_time,
 					step_end_time=step_end_time,
 					input_tokens=tokens,
+					pipelined_seconds=pipelined_seconds,
+					action_settle_seconds=[round(seconds, 3) for seconds in self._action_settle_times],
+					blocked_requests=blocking_stats.blocked_requests if blocking_stats else 0,
+					blocked_bytes_estimate=blocking_stats.estimated_bytes_saved if blocking_stats else 0,
 				)
 				self._make_history_item(model_output, state, result, metadata)
+			await self._emit_event(StepFinishedEvent(step_number=self.state.n_steps, metadata=metadata))
+
+	def add_event_hook(self, hook: AgentEventHook) -> None:
+		self.event_hooks.append(hook)
+
+	async def _emit_event(self, event: AgentEvent) -> None:
+		"""Call every event hook in order, a failing hook is logged and never interrupts the run"""
+		for hook in self.event_hooks:
+			try:
+				if inspect.iscoroutinefunction(hook):
+					await hook(event)
+				else:
+					hook(event)
+			except Exception as e:
+				logger.error(f'Agent event hook failed on {event.type}: {type(e).__name__}: {e}')
 
 	@time_execution_async('--handle_step_error (agent)')
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
@@ -612,6 +747,12 @@ class Agent(Generic[Context]):
 			logger.error('❌  Browser is closed or disconnected, unable to proceed')
 			return [ActionResult(error='Browser closed or disconnected, unable to proceed', include_in_memory=False)]
 
+		if isinstance(error, LLMCacheMissError) or isinstance(error.__cause__, LLMCacheMissError):
+			# strict replay must not fall back to the LLM, stop the run instead of retrying
+			logger.error(f'❌  {error_msg}')
+			self.state.stopped = True
+			return [ActionResult(error=f'LLM cache miss in replay mode: {error_msg}', include_in_memory=False)]
+
 		if isinstance(error, (ValidationError, ValueError)):
 			logger.error(f'{prefix}{error_msg}')
 			if 'Max token limit reached' in error_msg:
@@ -682,27 +823,75 @@ class Agent(Generic[Context]):
 		text = re.sub(self.STRAY_CLOSE_TAG, '', text)
 		return text.strip()
 
-	def _convert_input_messages(self, input_messages: list[BaseMessage]) -> list[BaseMessage]:
+	def _convert_input_messages(self, input_messages: list[BaseMessage], model_name: str | None = None) -> list[BaseMessage]:
 		"""Convert input messages to the correct format"""
-		if is_model_without_tool_support(self.model_name):
-			return convert_input_messages(input_messages, self.model_name)
+		model_name = model_name or self.model_name
+		if is_model_without_tool_support(model_name):
+			return convert_input_messages(input_messages, model_name)
 		else:
 			return input_messages
 
 	@time_execution_async('--get_next_action (agent)')
 	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
 		"""Get next action from LLM based on current state"""
-		input_messages = self._convert_input_messages(input_messages)
+		converted_messages = self._convert_input_messages(input_messages)
+
+		cache_key = None
+		if self.llm_cache is not None:
+			# the action schema is part of the key so a cached output always validates against the current model
+			namespace = f'{self.tool_calling_method}:{",".join(sorted(self.ActionModel.model_fields))}'
+			cache_key = self.llm_cache.make_key(self.model_name, converted_messages, namespace=namespace)
+			cached_output = self.llm_cache.get(cache_key)
+			if cached_output is not None:
+				try:
+					parsed = self.AgentOutput.model_validate(cached_output)
+				except ValidationError as e:
+					if self.llm_cache.config.mode == 'replay':
+						raise LLMCacheMissError(cache_key) from e
+					logger.debug(f'Cached model output no longer validates, calling the LLM: {e}')
+				else:
+					logger.info('♻️  Using cached model output')
+					if not (self.state.paused or self.state.stopped):
+						log_response(parsed)
+					return parsed
 
-		if self.tool_calling_method == 'raw':
-			logger.debug(f'Using {self.tool_calling_method} for {self.chat_model_library}')
+		if self.llm_router:
+			parsed = await self.llm_router.run(lambda llm: self._get_next_action_from_llm(llm, input_messages))
+		else:
+			parsed = await self._get_next_action_from_llm(self.llm, input_messages)
+
+		# cut the number of actions to max_actions_per_step if needed
+		if len(parsed.action) > self.settings.max_actions_per_step:
+			parsed.action = parsed.action[: self.settings.max_actions_per_step]
+
+		if not (hasattr(self.state, 'paused') and (self.state.paused or self.state.stopped)):
+			log_response(parsed)
+
+		if cache_key:
+			self.llm_cache.set(cache_key, parsed.model_dump(exclude_unset=True))
+
+		return parsed
+
+	async def _get_next_action_from_llm(self, llm: BaseChatModel, input_messages: list[BaseMessage]) -> AgentOutput:
+		"""Query a single LLM for the next action and parse its output"""
+		if llm is self.llm:
+			model_name, chat_model_library, tool_calling_method = self.model_name, self.chat_model_library, self.tool_calling_method
+		else:
+			# fallback model from the router
+			chat_model_library = llm.__class__.__name__
+			model_name = getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or 'Unknown'
+			tool_calling_method = self._get_tool_calling_method(chat_model_library, model_name)
+		input_messages = self._convert_input_messages(input_messages, model_name)
+
+		if tool_calling_method == 'raw':
+			logger.debug(f'Using {tool_calling_method} for {chat_model_library}')
 			try:
-				output = self.llm.invoke(input_messages)
+				output = await llm.ainvoke(input_messages)
 				response = {'raw': output, 'parsed': None}
 			except Exception as e:
 				logger.error(f'Failed to invoke model: {str(e)}')
 				raise LLMException(401, 'LLM API call failed') from e
-			# TODO: currently invoke does not return reasoning_content, we should override invoke
+			# TODO: currently ainvoke does not return reasoning_content, we should override it
 			output.content = self._remove_think_tags(str(output.content))
 			try:
 				parsed_json = extract_json_from_model_output(output.content)
@@ -712,8 +901,8 @@ class Agent(Generic[Context]):
 				logger.warning(f'Failed to parse model output: {output} {str(e)}')
 				raise ValueError('Could not parse response.')
 
-		elif self.tool_calling_method is None:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
+		elif tool_calling_method is None:
+			structured_llm = llm.with_structured_output(self.AgentOutput, include_raw=True)
 			try:
 				response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
 				parsed: AgentOutput | None = response['parsed']
@@ -723,8 +912,8 @@ class Agent(Generic[Context]):
 				raise LLMException(401, 'LLM API call failed') from e
 
 		else:
-			logger.debug(f'Using {self.tool_calling_method} for {self.chat_model_library}')
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True, method=self.tool_calling_method)
+			logger.debug(f'Using {tool_calling_method} for {chat_model_library}')
+			structured_llm = llm.with_structured_output(self.AgentOutput, include_raw=True, method=tool_calling_method)
 			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
 
 		# Handle tool call responses
@@ -763,14 +952,161 @@ class Agent(Generic[Context]):
 				logger.warning(f'Failed to parse model output: {response["raw"].content} {str(e)}')
 				raise ValueError('Could not parse response.')
 
-		# cut the number of actions to max_actions_per_step if needed
+		return parsed
+
+	async def _prewarm_step(self, state: BrowserState) -> float:
+		"""
+		Browser work for the upcoming actions that can run while the model is thinking.
+		Returns the seconds spent, which would otherwise be spent after the model answered.
+		"""
+		start = time.monotonic()
+		# elements the model is most likely to pick: new ones first, then the rest of the viewport
+		candidates = sorted(
+			(index for index, element in state.selector_map.items() if element.is_in_viewport or element.is_new),
+			key=lambda index: (not state.selector_map[index].is_new, index),
+		)[: self.settings.pipeline_prewarm_elements]
+		resolved = await self.browser_context.prewarm_elements(candidates)
+		elapsed = time.monotonic() - start
+		logger.debug(f'Prewarmed {resolved} element handles in {elapsed:.2f}s while waiting for the model')
+		return elapsed
+
+	async def _finish_prewarm(self, task: asyncio.Task) -> float:
+		"""Return the seconds of completed prewarm work, prewarming still running when the model answered is cancelled"""
+		if not task.done():
+			task.cancel()
+		try:
+			return await task
+		except asyncio.CancelledError:
+			return 0.0
+		except Exception as e:
+			logger.debug(f'Prewarming failed: {type(e).__name__}: {e}')
+			return 0.0
+
+	def _can_stream_actions(self) -> bool:
+		"""Streaming needs the raw response stream, so it is skipped for cached or hedged requests"""
+		return (
+			self.settings.stream_actions
+			and self.llm_cache is None
+			and self.llm_router is None
+			and self.tool_calling_method in ('raw', 'function_calling', 'tools', None)
+		)
+
+	@time_execution_async('--stream_next_action (agent)')
+	async def _stream_next_action(self, input_messages: list[BaseMessage]) -> tuple[AgentOutput, list[ActionResult]]:
+		"""
+		Stream the next action from the LLM and start executing safe leading actions before the output is complete.
+
+		Returns the parsed output and the results of the leading actions that were already executed,
+		the caller is responsible for running the rest with multi_act.
+		"""
+		input_messages = self._convert_input_messages(input_messages)
+		parser = StreamingActionParser()
+		queue: asyncio.Queue[ActionModel | None] = asyncio.Queue()
+		executor = asyncio.create_task(self._execute_streamed_actions(queue))
+
+		try:
+			if self.tool_calling_method == 'raw':
+				runnable = self.llm
+			else:
+				runnable = self.llm.bind_tools([self.AgentOutput], tool_choice=self.AgentOutput.__name__)
+
+			message = None
+			tool_index = None
+			async for chunk in runnable.astream(input_messages):
+				message = chunk if message is None else message + chunk
+				if self.tool_calling_method == 'raw':
+					delta = str(chunk.content)
+				else:
+					delta = ''
+					for tool_chunk in chunk.tool_call_chunks:
+						if tool_index is None and tool_chunk.get('name'):
+							tool_index = tool_chunk.get('index')
+						if tool_chunk.get('index') == tool_index:
+							delta += tool_chunk.get('args') or ''
+
+				for action_dict in parser.feed(delta):
+					try:
+						queue.put_nowait(self.ActionModel.model_validate(action_dict))
+					except ValidationError as e:
+						logger.debug(f'Streamed action does not validate, waiting for the full output: {e}')
+						queue.put_nowait(None)
+			queue.put_nowait(None)
+
+			if message is None:
+				raise ValueError('Could not parse response.')
+			try:
+				if self.tool_calling_method == 'raw':
+					parsed_json = extract_json_from_model_output(self._remove_think_tags(str(message.content)))
+				else:
+					parsed_json = message.tool_calls[0]['args']
+				parsed = self.AgentOutput(**parsed_json)
+			except (IndexError, KeyError, ValueError, ValidationError) as e:
+				logger.warning(f'Failed to parse streamed model output: {message} {str(e)}')
+				raise ValueError('Could not parse response.')
+
+			streamed_results = await executor
+		except Exception as e:
+			# actions that already started may have navigated, let the running one finish and keep their results
+			queue.put_nowait(None)
+			executed = (await asyncio.gather(executor, return_exceptions=True))[0]
+			if isinstance(executed, list) and executed:
+				raise StreamedActionsError(e, executed) from e
+			raise
+		except BaseException:
+			executor.cancel()
+			await asyncio.gather(executor, return_exceptions=True)
+			raise
+
 		if len(parsed.action) > self.settings.max_actions_per_step:
 			parsed.action = parsed.action[: self.settings.max_actions_per_step]
 
-		if not (hasattr(self.state, 'paused') and (self.state.paused or self.state.stopped)):
+		if not (self.state.paused or self.state.stopped):
 			log_response(parsed)
 
-		return parsed
+		return parsed, streamed_results
+
+	async def _execute_streamed_actions(self, queue: asyncio.Queue[ActionModel | None]) -> list[ActionResult]:
+		"""Execute streamed actions in order until the first one that is not safe to run early"""
+		results: list[ActionResult] = []
+		executing = True
+		while True:
+			action = await queue.get()
+			if action is None:
+				# end of stream, or an action we could not validate
+				break
+			if not executing:
+				continue
+
+			action_name = next(iter(action.model_dump(exclude_unset=True)), None)
+			if (
+				action_name not in STREAMING_SAFE_ACTIONS
+				or action.get_index() is not None
+				or len(results) >= self.settings.max_actions_per_step
+			):
+				executing = False
+				continue
+
+			await self._raise_if_stopped_or_paused()
+			if results:
+				self._action_settle_times.append(await self.browser_context.wait_between_actions())
+			else:
+				await self.browser_context.remove_highlights()
+
+			result = await self.controller.act(
+				action,
+				self.browser_context,
+				self.settings.page_extraction_llm,
+				self.sensitive_data,
+				self.settings.available_file_paths,
+				context=self.context,
+				llm_cache=self.llm_cache,
+			)
+			results.append(result)
+			logger.info(f'⚡ Executed {action_name} while the model was still responding')
+
+			if result.is_done or result.error:
+				executing = False
+		return results
 
 	def _log_agent_run(self) -> None:
 		"""Log the agent run"""
@@ -985,6 +1321,15 @@ class Agent(Generic[Context]):
 			}
 		finally:
 			signal_handler.unregister()
+			await self._emit_event(
+				AgentDoneEvent(
+					step_number=self.state.n_steps,
+					is_done=self.state.history.is_done(),
+					success=self.state.history.is_successful(),
+					final_result=final_llm_message_content,
+					error=agent_run_error,
+				)
+			)
 			if not self._force_exit_telemetry_logged:
 				try:
 					self._log_agent_event(max_steps=max_steps,
@@ -1022,9 +1367,16 @@ class Agent(Generic[Context]):
 		self,
 		actions: list[ActionModel],
 		check_for_new_elements: bool = True,
+		executed_before: int = 0,
 	) -> list[ActionResult]:
-		"""Execute multiple actions"""
+		"""Execute multiple actions
+
+		executed_before: number of actions of this step that already ran (e.g. while streaming), so even the
+		first action here has to be checked against the page the model saw.
+		"""
 		results = []
+		if self.settings.batch_actions:
+			actions = self._merge_batchable_actions(actions)
 
 		cached_selector_map = await self.browser_context.get_selector_map()
 		cached_path_hashes = {e.hash.branch_path_hash for e in cached_selector_map.values()}
@@ -1032,14 +1384,16 @@ class Agent(Generic[Context]):
 		await self.browser_context.remove_highlights()
 
 		for i, action in enumerate(actions):
-			if action.get_index() is not None and i != 0:
+			index = self._get_action_index(action)
+			if index is not None and (i != 0 or executed_before):
+				# cheap when the previous action did not change the page, get_state then reuses the cached state
 				new_state = await self.browser_context.get_state(cache_clickable_elements_hashes=False)
 				new_selector_map = new_state.selector_map
 
 				# Detect index change after previous action
-				orig_target = cached_selector_map.get(action.get_index())  # type: ignore
+				orig_target = cached_selector_map.get(index)
 				orig_target_hash = orig_target.hash.branch_path_hash if orig_target else None
-				new_target = new_selector_map.get(action.get_index())  # type: ignore
+				new_target = new_selector_map.get(index)
 				new_target_hash = new_target.hash.branch_path_hash if new_target else None
 				if orig_target_hash != new_target_hash:
 					msg = f'Element index changed after action {i} / {len(actions)}, because page changed.'
@@ -1065,6 +1419,7 @@ class Agent(Generic[Context]):
 					self.sensitive_data,
 					self.settings.available_file_paths,
 					context=self.context,
+					llm_cache=self.llm_cache,
 				)
 
 				results.append(result)
@@ -1073,7 +1428,7 @@ class Agent(Generic[Context]):
 				if results[-1].is_done or results[-1].error or i == len(actions) - 1:
 					break
 
-				await asyncio.sleep(self.browser_context.config.wait_between_actions)
+				self._action_settle_times.append(await self.browser_context.wait_between_actions())
 				# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
 
 			except asyncio.CancelledError:
@@ -1086,6 +1441,49 @@ class Agent(Generic[Context]):
 
 		return results
 
+	@staticmethod
+	def _get_action_index(action: ActionModel) -> int | None:
+		"""Index of the element an action targets, batched actions are checked with their first indexed action"""
+		batch = getattr(action, 'batch_actions', None)
+		if batch is None:
+			return action.get_index()
+		for batched_action in batch.actions:
+			for params in batched_action.values():
+				if isinstance(params, dict) and 'index' in params:
+					return params['index']
+		return None
+
+	def _merge_batchable_actions(self, actions: list[ActionModel]) -> list[ActionModel]:
+		"""Replace runs of consecutive batchable actions (form inputs) by one batch_actions action"""
+		if 'batch_actions' not in self.ActionModel.model_fields:
+			return actions
+		registered_actions = self.controller.registry.registry.actions
+
+		merged: list[ActionModel] = []
+		run: list[ActionModel] = []
+
+		def flush_run() -> None:
+			if len(run) > 1:
+				batched = [action.model_dump(exclude_unset=True) for action in run]
+				merged.append(self.ActionModel.model_validate({'batch_actions': {'actions': batched}}))
+			else:
+				merged.extend(run)
+			run.clear()
+
+		for action in actions:
+			action_data = action.model_dump(exclude_unset=True)
+			action_name = next(iter(action_data), None)
+			if len(action_data) == 1 and action_name in registered_actions and registered_actions[action_name].batchable:
+				run.append(action)
+				continue
+			flush_run()
+			merged.append(action)
+		flush_run()
+
+		if len(merged) < len(actions):
+			logger.debug(f'Merged {len(actions)} actions into {len(merged)}')
+		return merged
+
 	async def _validate_output(self) -> bool:
 		"""Validate the output of the last action is what the user wanted"""
 		system_msg = (
@@ -1153,16 +1551,23 @@ class Agent(Generic[Context]):
 		history: AgentHistoryList,
 		max_retries: int = 3,
 		skip_failures: bool = True,
-		delay_between_actions: float = 2.0,
+		delay_between_actions: float | None = None,
+		escalate_to_llm: bool = True,
 	) -> list[ActionResult]:
 		"""
 		Rerun a saved history of actions with error handling and retry logic.
 
+		Recorded elements are looked up in a fingerprint index of the current DOM, built once per step. Between
+		steps the replay waits until the page settled instead of sleeping a fixed delay. The LLM is only called
+		for steps whose recorded elements are still missing after max_retries attempts. The timing of every step
+		is kept in self.replay_timings.
+
 		Args:
 				history: The history to replay
 				max_retries: Maximum number of retries per action
 				skip_failures: Whether to skip failed actions or stop execution
-				delay_between_actions: Delay between actions in seconds
+				delay_between_actions: Fixed delay between steps in seconds, None waits until the page settled
+				escalate_to_llm: Let the LLM reach the recorded goal of a step whose elements cannot be matched
 
 		Returns:
 				List of action results
@@ -1173,10 +1578,13 @@ class Agent(Generic[Context]):
 			self.state.last_result = result
 
 		results = []
+		self.replay_timings = []
 
 		for i, history_item in enumerate(history.history):
 			goal = history_item.model_output.current_state.next_goal if history_item.model_output else ''
 			logger.info(f'Replaying step {i + 1}/{len(history.history)}: goal: {goal}')
+			timing = ReplayStepTiming(step_number=i + 1)
+			self.replay_timings.append(timing)
 
 			if (
 				not history_item.model_output
@@ -1185,56 +1593,112 @@ class Agent(Generic[Context]):
 			):
 				logger.warning(f'Step {i + 1}: No action to replay, skipping')
 				results.append(ActionResult(error='No action to replay'))
+				timing.error = 'No action to replay'
 				continue
 
-			retry_count = 0
-			while retry_count < max_retries:
+			while True:
+				timing.attempts += 1
 				try:
-					result = await self._execute_history_step(history_item, delay_between_actions)
+					if timing.escalated:
+						result = await self._escalate_history_step(goal, timing)
+					else:
+						result = await self._execute_history_step(history_item, delay_between_actions, timing)
 					results.extend(result)
 					break
 
 				except Exception as e:
-					retry_count += 1
-					if retry_count == max_retries:
-						error_msg = f'Step {i + 1} failed after {max_retries} attempts: {str(e)}'
+					if timing.attempts < max_retries:
+						logger.warning(f'Step {i + 1} failed (attempt {timing.attempts}/{max_retries}), retrying...')
+						timing.settle_seconds += await self._wait_for_replay_page(delay_between_actions)
+					elif isinstance(e, ReplayElementNotFoundError) and escalate_to_llm and not timing.escalated:
+						logger.info(f'Step {i + 1}: {str(e)}, asking the LLM to reach the step goal')
+						timing.escalated = True
+					else:
+						error_msg = f'Step {i + 1} failed after {timing.attempts} attempts: {str(e)}'
 						logger.error(error_msg)
+						timing.error = error_msg
 						if not skip_failures:
 							results.append(ActionResult(error=error_msg))
 							raise RuntimeError(error_msg)
-					else:
-						logger.warning(f'Step {i + 1} failed (attempt {retry_count}/{max_retries}), retrying...')
-						await asyncio.sleep(delay_between_actions)
+						break
+
+			logger.debug(
+				f'⏱️  Step {i + 1} replayed in {timing.total_seconds:.2f}s (state {timing.state_seconds:.2f}s, '
+				f'match {timing.match_seconds:.3f}s, actions {timing.action_seconds:.2f}s, settle {timing.settle_seconds:.2f}s)'
+			)
 
+		escalated = sum(timing.escalated for timing in self.replay_timings)
+		total_seconds = sum(timing.total_seconds for timing in self.replay_timings)
+		logger.info(f'⏱️  Replayed {len(history.history)} steps in {total_seconds:.2f}s, {escalated} escalated to the LLM')
 		return results
 
-	async def _execute_history_step(self, history_item: AgentHistory, delay: float) -> list[ActionResult]:
+	async def _execute_history_step(
+		self,
+		history_item: AgentHistory,
+		delay: float | None = None,
+		timing: ReplayStepTiming | None = None,
+	) -> list[ActionResult]:
 		"""Execute a single step from history with element validation"""
+		timing = timing or ReplayStepTiming(step_number=self.state.n_steps)
+
+		start = time.time()
 		state = await self.browser_context.get_state(cache_clickable_elements_hashes=False)
+		timing.state_seconds += time.time() - start
 		if not state or not history_item.model_output:
 			raise ValueError('Invalid state or model output')
+
+		start = time.time()
+		element_index = HistoryTreeProcessor.build_element_index(state.element_tree) if state.element_tree else {}
 		updated_actions = []
 		for i, action in enumerate(history_item.model_output.action):
 			updated_action = await self._update_action_indices(
 				history_item.state.interacted_element[i],
 				action,
 				state,
+				element_index,
 			)
 			updated_actions.append(updated_action)
 
 			if updated_action is None:
-				raise ValueError(f'Could not find matching element {i} in current page')
+				raise ReplayElementNotFoundError(f'Could not find matching element {i} in current page')
+		timing.match_seconds += time.time() - start
 
+		start = time.time()
 		result = await self.multi_act(updated_actions)
+		timing.action_seconds += time.time() - start
 
-		await asyncio.sleep(delay)
+		timing.settle_seconds += await self._wait_for_replay_page(delay)
 		return result
 
+	async def _escalate_history_step(self, goal: str, timing: ReplayStepTiming) -> list[ActionResult]:
+		"""Run a regular agent step towards the recorded goal of a step whose elements are gone"""
+		msg = 'You are replaying a recorded run, but the elements the recorded actions used are not on the page anymore.'
+		msg += f'\nChoose new actions for this goal of the recorded run: {goal or "continue the task"}'
+		self._message_manager._add_message_with_tokens(HumanMessage(content=msg))
+
+		start = time.time()
+		await self.step()
+		timing.action_seconds += time.time() - start
+
+		result = self.state.last_result or []
+		errors = [r.error for r in result if r.error]
+		if errors:
+			raise RuntimeError(f'LLM step failed: {errors[-1]}')
+		return result
+
+	async def _wait_for_replay_page(self, delay: float | None) -> float:
+		"""Wait before the next replayed step, a fixed delay or until the page settled, returns the seconds waited"""
+		if delay is not None:
+			await asyncio.sleep(delay)
+			return delay
+		return await self.browser_context.wait_between_actions()
+
 	async def _update_action_indices(
 		self,
 		historical_element: DOMHistoryElement | None,
 		action: ActionModel,  # Type this properly based on your action model
 		current_state: BrowserState,
+		element_index: dict[HashedDomElement, DOMElementNode] | None = None,
 	) -> ActionModel | None:
 		"""
 		Update action indices based on current page state.
@@ -1243,7 +1707,9 @@ class Agent(Generic[Context]):
 		if not historical_element or not current_state.element_tree:
 			return action
 
-		current_element = HistoryTreeProcessor.find_history_element_in_tree(historical_element, current_state.element_tree)
+		if element_index is None:
+			element_index = HistoryTreeProcessor.build_element_index(current_state.element_tree)
+		current_element = element_index.get(HistoryTreeProcessor._hash_dom_history_element(historical_element))
 
 		if not current_element or current_element.highlight_index is None:
 			return None
@@ -1469,8 +1935,8 @@ class Agent(Generic[Context]):
 		# Create new action model with current page's filtered actions
 		self.ActionModel = self.controller.registry.create_action_model(page=page)
 		# Update output model with the new actions
-		self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
+		self.AgentOutput = self._get_agent_output_model(self.ActionModel)
 
 		# Update done action model too
 		self.DoneActionModel = self.controller.registry.create_action_model(include_actions=['done'], page=page)
-		self.DoneAgentOutput = AgentOutput.type_with_custom_actions(self.DoneActionModel)
+		self.DoneAgentOutput = self._get_agent_output_model(self.DoneActionModel)
@@ -0,0 +1,106 @@
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# actions that do not target an element index and are safe to start before the rest of the model output arrived
+STREAMING_SAFE_ACTIONS = {'go_to_url', 'search_google', 'open_tab', 'scroll_down', 'scroll_up'}
+
+
+class StreamingActionParser:
+	"""
+	Incremental parser for a streamed AgentOutput JSON object.
+
+	Feed it text deltas as they arrive (raw model content or tool call argument chunks). Every time an
+	element of the top-level "action" array is complete it is decoded and returned, so the caller can
+	start executing it while the model is still generating the remaining actions. Text before the first
+	'{' (code fences, reasoning) is ignored.
+	"""
+
+	def __init__(self):
+		self.buffer = ''
+		self.actions: list[dict[str, Any]] = []
+		self._pos = 0
+		self._depth = 0
+		self._started = False
+		self._in_string = False
+		self._escape = False
+		self._string_start = 0
+		self._pending_key: str | None = None
+		self._current_key: str | None = None
+		self._action_depth: int | None = None
+		self._element_start: int | None = None
+		self.done = False
+
+	def feed(self, text: str) -> list[dict[str, Any]]:
+		"""Consume `text` and return the actions completed by it"""
+		if not text or self.done:
+			return []
+		self.buffer += text
+		completed = []
+
+		while self._pos < len(self.buffer):
+			i = self._pos
+			char = self.buffer[i]
+			self._pos += 1
+
+			if self._in_string:
+				if self._escape:
+					self._escape = False
+				elif char == '\\':
+					self._escape = True
+				elif char == '"':
+					self._in_string = False
+					if self._depth == 1:
+						# candidate key of the top-level object
+						try:
+							self._pending_key = json.loads(self.buffer[self._string_start : i + 1])
+						except ValueError:
+							self._pending_key = None
+				continue
+
+			if not self._started:
+				if char == '{':
+					self._started = True
+					self._depth = 1
+				continue
+
+			if char == '"':
+				self._in_string = True
+				self._string_start = i
+			elif char == ':' and self._depth == 1:
+				self._current_key = self._pending_key
+			elif char == ',' and self._depth == 1:
+				self._current_key = None
+				self._pending_key = None
+			elif char in '{[':
+				self._depth += 1
+				if char == '[' and self._depth == 2 and self._current_key == 'action':
+					self._action_depth = self._depth
+				elif char == '{' and self._action_depth is not None and self._depth == self._action_depth + 1:
+					self._element_start = i
+			elif char in '}]':
+				if char == '}' and self._element_start is not None and self._depth == self._action_depth + 1:
+					action = self._decode(self.buffer[self._element_start : i + 1])
+					self._element_start = None
+					if action is not None:
+						self.actions.append(action)
+						completed.append(action)
+				elif char == ']' and self._action_depth is not None and self._depth == self._action_depth:
+					self._action_depth = None
+				self._depth -= 1
+				if self._depth == 0:
+					self.done = True
+					break
+
+		return completed
+
+	@staticmethod
+	def _decode(raw: str) -> dict[str, Any] | None:
+		try:
+			action = json.loads(raw)
+		except ValueError as e:
+			logger.debug(f'Could not decode streamed action {raw[:100]}: {e}')
+			return None
+		return action if isinstance(action, dict) else None
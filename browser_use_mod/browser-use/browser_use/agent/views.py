@@ -66,6 +66,10 @@ class AgentSettings(BaseModel):
 		'aria-expanded',
 	]
 	max_actions_per_step: int = 10
+	stream_actions: bool = False  # start safe actions while the model output is still streaming
+	batch_actions: bool = False  # merge consecutive batchable actions (e.g. input_text) into one batch_actions call
+	pipeline_steps: bool = False  # prewarm browser work for the next actions while the model is thinking
+	pipeline_prewarm_elements: int = 20  # max number of element handles resolved ahead of time per step
 
 	tool_calling_method: ToolCallingMethod | None = 'auto'
 	page_extraction_llm: BaseChatModel | None = None
@@ -123,6 +127,10 @@ class StepMetadata(BaseModel):
 	step_end_time: float
 	input_tokens: int  # Approximate tokens from message manager for this step
 	step_number: int
+	pipelined_seconds: float = 0.0  # browser work done while waiting on the model (pipelined mode)
+	action_settle_seconds: list[float] = []  # time the page took to settle after each action but the last
+	blocked_requests: int = 0  # requests blocked by the resource blocking profile during this step
+	blocked_bytes_estimate: int = 0  # estimated download size of the blocked requests
 
 	@property
 	def duration_seconds(self) -> float:
@@ -130,6 +138,23 @@ class StepMetadata(BaseModel):
 		return self.step_end_time - self.step_start_time
 
 
+class ReplayStepTiming(BaseModel):
+	"""Timing of one step replayed by Agent.rerun_history"""
+
+	step_number: int
+	attempts: int = 0
+	state_seconds: float = 0.0  # browser state extraction, summed over attempts
+	match_seconds: float = 0.0  # locating the recorded elements in the current tree
+	action_seconds: float = 0.0
+	settle_seconds: float = 0.0  # waiting for the page to settle after the step
+	escalated: bool = False  # the recorded elements were not found and the LLM chose the actions
+	error: str | None = None
+
+	@property
+	def total_seconds(self) -> float:
+		return self.state_seconds + self.match_seconds + self.action_seconds + self.settle_seconds
+
+
 class AgentBrain(BaseModel):
 	"""Current state of the agent"""
 
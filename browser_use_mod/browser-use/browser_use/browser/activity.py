@@ -0,0 +1,58 @@
+"""
+Tracking of the network requests that can still change a page after an action.
+"""
+
+import time
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Request
+
+from browser_use.browser.resource_blocking import IGNORED_URL_PATTERNS
+
+# requests whose response can change the DOM, images and fonts only change pixels
+RELEVANT_RESOURCE_TYPES = frozenset({'document', 'script', 'stylesheet', 'xhr', 'fetch'})
+
+# requests pending for longer than this are long polls or streams that will not settle
+MAX_PENDING_SECONDS = 10.0
+
+
+class NetworkActivityTracker:
+	"""Follows the relevant in-flight requests of every page of a context through the context request events"""
+
+	def __init__(self):
+		self.pending: dict[Request, float] = {}
+		self.last_activity = time.monotonic()
+
+	def attach(self, context: PlaywrightBrowserContext) -> None:
+		context.on('request', self._on_request)
+		context.on('requestfinished', self._on_request_done)
+		context.on('requestfailed', self._on_request_done)
+
+	@staticmethod
+	def is_relevant(request: Request) -> bool:
+		if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+			return False
+		url = request.url.lower()
+		if url.startswith(('data:', 'blob:')):
+			return False
+		return not any(pattern in url for pattern in IGNORED_URL_PATTERNS)
+
+	def _on_request(self, request: Request) -> None:
+		if self.is_relevant(request):
+			self.last_activity = time.monotonic()
+			self.pending[request] = self.last_activity
+
+	def _on_request_done(self, request: Request) -> None:
+		if self.pending.pop(request, None) is not None:
+			self.last_activity = time.monotonic()
+
+	def has_pending(self) -> bool:
+		"""True while a relevant request is in flight, long polls and streams excluded"""
+		now = time.monotonic()
+		return any(now - started < MAX_PENDING_SECONDS for started in self.pending.values())
+
+	def idle_seconds(self) -> float:
+		"""Seconds since the last relevant request started or finished, 0 while one is in flight"""
+		if self.has_pending():
+			return 0.0
+		return time.monotonic() - self.last_activity
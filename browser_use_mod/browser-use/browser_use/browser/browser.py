@@ -86,6 +86,7 @@ class BrowserConfig(BaseModel):
 			This allows running multiple chrome browsers with same browser_binary_path but running on different ports.
 			Also, makes it possible to launch new user provided chrome browser without closing already opened chrome instances,
 			by providing non-default chrome debugging port.
+			For builtin browsers None picks a free port, as does a configured port that is already taken.
 
 		keep_alive: False
 			Keep the browser alive after the agent has finished running
@@ -122,6 +123,17 @@ class BrowserConfig(BaseModel):
 	new_context_config: BrowserContextConfig = Field(default_factory=BrowserContextConfig)
 
 
+def _is_port_in_use(port: int) -> bool:
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+		return s.connect_ex(('localhost', port)) == 0
+
+
+def _find_free_port() -> int:
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+		s.bind(('localhost', 0))
+		return s.getsockname()[1]
+
+
 # @singleton: TODO - think about id singleton makes sense here
 # @dev By default this is a singleton, but you can create multiple instances if you need to.
 class Browser:
@@ -140,6 +152,8 @@ class Browser:
 		self.config = config or BrowserConfig()
 		self.playwright: Playwright | None = None
 		self.playwright_browser: PlaywrightBrowser | None = None
+		# debugging port the builtin browser was actually launched with
+		self.remote_debugging_port: int | None = None
 
 	async def new_context(self, config: BrowserContextConfig | None = None) -> BrowserContext:
 		"""Create a browser context"""
@@ -313,8 +327,18 @@ class Browser:
 			screen_size = get_screen_resolution()
 			offset_x, offset_y = get_window_adjustments()
 
+		# several browsers per host (e.g. a BrowserPool) must not share a debugging port,
+		# so a missing or already taken port is replaced by a free one
+		debugging_port = self.config.chrome_remote_debugging_port
+		if debugging_port is None or _is_port_in_use(debugging_port):
+			free_port = _find_free_port()
+			if debugging_port is not None:
+				logger.debug(f'Remote debugging port {debugging_port} is taken, using {free_port} instead')
+			debugging_port = free_port
+		self.remote_debugging_port = debugging_port
+
 		chrome_args = {
-			f'--remote-debugging-port={self.config.chrome_remote_debugging_port}',
+			f'--remote-debugging-port={debugging_port}',
 			*CHROME_ARGS,
 			*(CHROME_DOCKER_ARGS if IN_DOCKER else []),
 			*(CHROME_HEADLESS_ARGS if self.config.headless else []),
@@ -325,12 +349,6 @@ class Browser:
 			*self.config.extra_browser_args,
 		}
 
-		# check if chrome remote debugging port is already taken,
-		# if so remove the remote-debugging-port arg to prevent conflicts
-		with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-			if s.connect_ex(('localhost', self.config.chrome_remote_debugging_port)) == 0:
-				chrome_args.remove(f'--remote-debugging-port={self.config.chrome_remote_debugging_port}')
-
 		browser_class = getattr(playwright, self.config.browser_class)
 		args = {
 			'chromium': list(chrome_args),
@@ -27,6 +27,15 @@ from playwright.async_api import (
 )
 from pydantic import BaseModel, ConfigDict, Field
 
+from browser_use.browser.activity import NetworkActivityTracker
+from browser_use.browser.http_cache import HttpCacheConfig, get_shared_http_cache
+from browser_use.browser.resource_blocking import (
+	IGNORED_URL_PATTERNS,
+	RESOURCE_BLOCKING_PROFILES,
+	ResourceBlocker,
+	ResourceBlockingProfileName,
+	ResourceBlockingStats,
+)
 from browser_use.browser.views import (
 	BrowserError,
 	BrowserState,
@@ -34,7 +43,7 @@ from browser_use.browser.views import (
 	URLNotAllowedError,
 )
 from browser_use.dom.clickable_element_processor.service import ClickableElementProcessor
-from browser_use.dom.service import DomService
+from browser_use.dom.service import DomService, dom_state_selector
 from browser_use.dom.views import DOMElementNode, SelectorMap
 from browser_use.utils import time_execution_async, time_execution_sync
 
@@ -53,6 +62,151 @@ BROWSER_NAVBAR_HEIGHT = {
 
 _GLOB_WARNING_SHOWN = False
 
+REMOVE_HIGHLIGHTS_JS = """
+try {
+	// Remove the highlight container and all its contents
+	const container = document.getElementById('playwright-highlight-container');
+	if (container) {
+		container.remove();
+	}
+
+	// Remove highlight attributes from elements
+	const highlightedElements = document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]');
+	highlightedElements.forEach(el => {
+		el.removeAttribute('browser-user-highlight-id');
+	});
+} catch (e) {
+	console.error('Failed to remove highlights:', e);
+}
+"""
+
+# Sets the text of stamped elements like a user paste would: native value setter (bypasses the value tracking of
+# frameworks like React) followed by input and change events. Returns 'ok', 'missing' or 'not-editable' per field.
+FILL_FIELDS_JS = """(fields) => {
+	const NON_TEXT_INPUTS = new Set(['checkbox', 'radio', 'file', 'submit', 'button', 'image', 'reset', 'range', 'color', 'hidden']);
+	const deepQuery = (root, selector) => {
+		const found = root.querySelector(selector);
+		if (found) return found;
+		for (const host of root.querySelectorAll('*')) {
+			if (host.shadowRoot) {
+				const inner = deepQuery(host.shadowRoot, selector);
+				if (inner) return inner;
+			}
+		}
+		return null;
+	};
+	return fields.map(({ selector, text }) => {
+		const el = deepQuery(document, selector);
+		if (!el) return 'missing';
+		if (el.disabled || el.readOnly) return 'not-editable';
+		let proto = null;
+		if (el instanceof HTMLTextAreaElement) proto = HTMLTextAreaElement.prototype;
+		else if (el instanceof HTMLInputElement && !NON_TEXT_INPUTS.has(el.type)) proto = HTMLInputElement.prototype;
+		// rich text editors keep their own model of the content, they get real typing
+		else return 'not-editable';
+
+		el.scrollIntoView({ block: 'nearest' });
+		el.focus();
+		Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+		el.dispatchEvent(new InputEvent('input', { bubbles: true, inputType: 'insertText', data: text }));
+		el.dispatchEvent(new Event('change', { bubbles: true }));
+		return 'ok';
+	});
+}"""
+
+# Counts DOM mutations of the page, except the ones made by the DOM extraction itself (highlights and index stamps).
+# Open shadow roots and same-origin frames are observed too, as buildDomTree walks them. Every window gets an
+# observer on first use that lives as long as its document. Cross-origin frames cannot be observed, they are counted.
+_PAGE_PROBE_JS = """
+	const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+	const OBSERVE_OPTIONS = { subtree: true, childList: true, attributes: true, characterData: true };
+	const isOwnMutation = (record) => {
+		if (record.type === 'attributes' && record.attributeName === 'data-browser-use-index') return true;
+		const target = record.target.nodeType === Node.ELEMENT_NODE ? record.target : record.target.parentElement;
+		if (target?.closest?.(`#${HIGHLIGHT_CONTAINER_ID}`)) return true;
+		const nodes = [...record.addedNodes, ...record.removedNodes];
+		return nodes.length > 0 && nodes.every((node) => node.id === HIGHLIGHT_CONTAINER_ID);
+	};
+	const installProbe = (win) => {
+		let probe = win.__browserUsePageProbe;
+		if (probe) return probe;
+		probe = { mutations: 0, lastMutation: win.performance.now(), unloading: false, shadowRoots: new WeakSet() };
+		// shadow trees are not part of the document subtree, each open shadow root is observed on its own
+		probe.observeShadowRoots = (root) => {
+			const walker = win.document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+			for (let node = walker.currentNode; node; node = walker.nextNode()) {
+				const shadowRoot = node.shadowRoot;
+				if (shadowRoot && !probe.shadowRoots.has(shadowRoot)) {
+					probe.shadowRoots.add(shadowRoot);
+					probe.observer.observe(shadowRoot, OBSERVE_OPTIONS);
+					probe.observeShadowRoots(shadowRoot);
+				}
+			}
+		};
+		probe.count = (records) => {
+			for (const record of records) {
+				if (isOwnMutation(record)) continue;
+				probe.mutations++;
+				probe.lastMutation = win.performance.now();
+				for (const node of record.addedNodes) {
+					if (node.nodeType === Node.ELEMENT_NODE) probe.observeShadowRoots(node);
+				}
+			}
+		};
+		probe.observer = new win.MutationObserver(probe.count);
+		probe.observer.observe(win.document, OBSERVE_OPTIONS);
+		probe.observeShadowRoots(win.document);
+		// a navigation that started but did not commit yet still shows the old document
+		win.addEventListener('beforeunload', () => { probe.unloading = true; });
+		win.__browserUsePageProbe = probe;
+		return probe;
+	};
+	const collect = (win, summary) => {
+		const probe = installProbe(win);
+		probe.count(probe.observer.takeRecords());
+		summary.windows.push(win.location.href, win.performance.timeOrigin, probe.mutations);
+		summary.unloading = summary.unloading || probe.unloading;
+		summary.idleMs = Math.min(summary.idleMs, win.performance.now() - probe.lastMutation);
+		for (const frame of win.document.querySelectorAll('iframe, frame')) {
+			let frameWindow = null;
+			try {
+				// null for cross-origin frames
+				frameWindow = frame.contentDocument ? frame.contentWindow : null;
+			} catch (e) {}
+			if (frameWindow) collect(frameWindow, summary);
+			else summary.opaqueFrames++;
+		}
+		return summary;
+	};
+	const summary = collect(window, { windows: [], unloading: false, idleMs: Infinity, opaqueFrames: 0 });
+"""
+
+# fingerprint of the page and its same-origin frames, changes with navigation, scrolling, resizing and DOM
+# mutations. Returned with the number of cross-origin frames, whose content the fingerprint does not cover.
+PAGE_CHANGE_PROBE_JS = (
+	'() => {'
+	+ _PAGE_PROBE_JS
+	+ """
+	const token = [
+		...summary.windows, summary.unloading,
+		window.scrollX, window.scrollY, window.innerWidth, window.innerHeight,
+	].join('|');
+	return [token, summary.opaqueFrames];
+}"""
+)
+
+# milliseconds since the last DOM mutation in the page or a same-origin frame, -1 while a navigation is pending
+PAGE_IDLE_PROBE_JS = (
+	'() => {'
+	+ _PAGE_PROBE_JS
+	+ """
+	return summary.unloading ? -1 : summary.idleMs;
+}"""
+)
+
+# how often the page is checked while waiting for it to settle after an action
+SETTLE_POLL_INTERVAL = 0.05
+
 
 class BrowserContextConfig(BaseModel):
 	"""
@@ -76,7 +230,14 @@ class BrowserContextConfig(BaseModel):
 			Maximum time to wait for page load before proceeding anyway
 
 		wait_between_actions: 1.0
-			Time to wait between multiple per step actions
+			Time to wait between multiple per step actions (the maximum when adaptive_wait_between_actions is on)
+
+		adaptive_wait_between_actions: True
+			Stop waiting between actions as soon as the page is quiet: no DOM mutations and no pending document, script,
+			stylesheet, xhr or fetch requests for settle_quiet_time seconds.
+
+		settle_quiet_time: 0.15
+			Quiet window used by adaptive_wait_between_actions.
 
 		window_width: 1280
 		window_height: 1100
@@ -135,6 +296,26 @@ class BrowserContextConfig(BaseModel):
 
 		force_new_context: False
 			Forces a new browser context to be created. Useful when running locally with branded browser (e.g Chrome, Edge) and setting a custom config.
+
+		resource_blocking_profile: None
+			Block or stub requests that are irrelevant for the task: 'text-only', 'no-media' or 'security-audit-full' (blocks nothing).
+			Note that playwright disables the HTTP cache of a context once request interception is enabled.
+
+		http_cache: None
+			Shared on-disk cache for static resources (scripts, stylesheets, fonts, images), reused by every context and
+			process pointing at the same cache_dir. See HttpCacheConfig for size caps, TTL and deploy invalidation.
+
+		reuse_unchanged_state: False
+			After the page load wait, get_state returns the cached state (with a fresh screenshot) instead of rebuilding
+			the DOM when no request is in flight and a cheap probe shows that the page, its open shadow roots and its
+			same-origin frames did not navigate, scroll, resize or mutate since the state was extracted.
+			The highlights removed before the last actions are not drawn again, so the fresh screenshot has no index
+			labels: only enable it for agents that do not use vision or with highlight_elements=False.
+
+		include_cross_origin_iframes: False
+			Extract the interactive elements of visible cross-origin iframes (ad and tracker frames excluded) inside the
+			frame and merge them into the page state. Frames are extracted in parallel, each gets a few seconds before
+			it is left out.
 	"""
 
 	model_config = ConfigDict(
@@ -151,6 +332,8 @@ class BrowserContextConfig(BaseModel):
 	wait_for_network_idle_page_load_time: float = 0.5
 	maximum_wait_page_load_time: float = 5
 	wait_between_actions: float = 0.5
+	adaptive_wait_between_actions: bool = True
+	settle_quiet_time: float = 0.15
 
 	disable_security: bool = False  # disable_security=True is dangerous as any malicious URL visited could embed an iframe for the user's bank, and use their cookies to steal money
 
@@ -185,6 +368,11 @@ class BrowserContextConfig(BaseModel):
 
 	force_new_context: bool = False
 
+	resource_blocking_profile: ResourceBlockingProfileName | None = None
+	http_cache: HttpCacheConfig | None = None
+	reuse_unchanged_state: bool = False
+	include_cross_origin_iframes: bool = False
+
 
 @dataclass
 class CachedStateClickableElementsHashes:
@@ -202,6 +390,12 @@ class BrowserSession:
 		self.cached_state = cached_state
 
 		self.cached_state_clickable_elements_hashes: CachedStateClickableElementsHashes | None = None
+		# page change token taken right before the cached state was extracted
+		self.cached_state_token: str | None = None
+		# element handles resolved for the cached state (ahead of time or by an earlier lookup), by highlight index
+		self.element_handles: dict[int, ElementHandle] = {}
+		# css selectors of elements of the cached state, by id() of the node
+		self.css_selectors: dict[int, str] = {}
 
 
 @dataclass
@@ -221,6 +415,9 @@ class BrowserContext:
 		state: BrowserContextState | None = None,
 	):
 		self.context_id = str(uuid.uuid4())
+		# number of DOM extractions, makes the element stamps of every state unique
+		self._dom_state_count = 0
+		self.network_activity = NetworkActivityTracker()
 
 		self.config = config or BrowserContextConfig(**(browser.config.model_dump() if browser.config else {}))
 		self.browser = browser
@@ -234,6 +431,8 @@ class BrowserContext:
 		self.agent_current_page: Page | None = None  # The tab the agent intends to interact with
 		self.human_current_page: Page | None = None  # The tab currently shown in the browser UI
 
+		self.resource_blocker: ResourceBlocker | None = None
+
 	async def __aenter__(self):
 		"""Async context manager entry"""
 		await self._initialize_session()
@@ -645,6 +844,17 @@ class BrowserContext:
 		if self.config.trace_path:
 			await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
+		self.network_activity.attach(context)
+
+		if self.config.http_cache:
+			# registered before resource blocking: playwright runs the last registered route first,
+			# so blocked requests never reach the cache
+			http_cache = get_shared_http_cache(self.config.http_cache)
+			await context.route('**/*', http_cache.handle_route)
+			context.on('response', http_cache.on_response)
+
+		await self._setup_resource_blocking(context)
+
 		# Resize the window for non-headless mode
 		if not self.browser.config.headless:
 			await self._resize_window(context)
@@ -740,6 +950,39 @@ class BrowserContext:
 		except Exception as e:
 			logger.debug(f'Failed to set viewport size for page: {e}')
 
+	async def _setup_resource_blocking(self, context: PlaywrightBrowserContext) -> None:
+		"""Install the request interception for the configured resource blocking profile"""
+		profile_name = self.config.resource_blocking_profile
+		if profile_name is None or self.resource_blocker is not None:
+			return
+		resource_blocker = ResourceBlocker(RESOURCE_BLOCKING_PROFILES[profile_name])
+		if not resource_blocker.blocks_anything:
+			# routing disables the http cache, not worth it for a profile that blocks nothing
+			return
+		self.resource_blocker = resource_blocker
+		await context.route('**/*', resource_blocker.handle_route)
+		logger.debug(f'🚫  Blocking resources with the {profile_name} profile')
+
+	async def set_resource_blocking_profile(self, profile_name: ResourceBlockingProfileName | None) -> None:
+		"""Switch the resource blocking profile, e.g. per task on a context that is reused across tasks"""
+		if profile_name is not None and profile_name not in RESOURCE_BLOCKING_PROFILES:
+			raise ValueError(
+				f'Unknown resource blocking profile {profile_name!r}, expected one of {sorted(RESOURCE_BLOCKING_PROFILES)}'
+			)
+		self.config.resource_blocking_profile = profile_name
+		if self.resource_blocker is not None:
+			if self.session is not None:
+				await self.session.context.unroute('**/*', self.resource_blocker.handle_route)
+			self.resource_blocker = None
+		if self.session is not None:
+			await self._setup_resource_blocking(self.session.context)
+
+	def take_resource_blocking_stats(self) -> ResourceBlockingStats | None:
+		"""Requests blocked since the last call, None if no resources are blocked"""
+		if self.resource_blocker is None:
+			return None
+		return self.resource_blocker.take_stats()
+
 	async def _wait_for_stable_network(self):
 		page = await self.get_agent_current_page()
 
@@ -765,46 +1008,6 @@ class BrowserContext:
 			'application/json',
 		}
 
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
 		async def on_request(request):
 			# Filter by resource type
 			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
@@ -909,6 +1112,36 @@ class BrowserContext:
 
 		logger.debug(f'⚖️  Network stabilized for {self.config.wait_for_network_idle_page_load_time} seconds')
 
+	async def wait_between_actions(self) -> float:
+		"""
+		Wait after an action until the page settled, at most config.wait_between_actions seconds.
+
+		Returns the seconds waited, which is how long the page kept reacting to the action when it settled earlier.
+		"""
+		max_wait = self.config.wait_between_actions
+		if not self.config.adaptive_wait_between_actions:
+			await asyncio.sleep(max_wait)
+			return max_wait
+
+		loop = asyncio.get_running_loop()
+		start = loop.time()
+		page = await self.get_agent_current_page()
+		while (elapsed := loop.time() - start) < max_wait:
+			await asyncio.sleep(min(SETTLE_POLL_INTERVAL, max_wait - elapsed))
+			if self.network_activity.idle_seconds() < self.config.settle_quiet_time:
+				continue
+			try:
+				dom_idle_ms = await page.evaluate(PAGE_IDLE_PROBE_JS)
+			except Exception:
+				# the page is navigating or was closed, keep waiting for the new document
+				continue
+			if dom_idle_ms >= self.config.settle_quiet_time * 1000:
+				break
+
+		settle_time = loop.time() - start
+		logger.debug(f'⏱️  Page settled after {settle_time:.2f}s (max {max_wait}s) on {page.url}')
+		return settle_time
+
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
 		Ensures page is fully loaded before continuing.
@@ -1171,33 +1404,30 @@ class BrowserContext:
 		cache_clickable_elements_hashes: bool
 			If True, cache the clickable elements hashes for the current state. This is used to calculate which elements are new to the llm (from last message) -> reduces token usage.
 		"""
-		await self._wait_for_page_and_frames_load()
 		session = await self.get_session()
+		# an action may have started a request or navigation that did not touch the DOM yet, compare only once
+		# the page loaded and no relevant request is in flight
+		await self._wait_for_page_and_frames_load()
+		page_change_token = None
+		if self.config.reuse_unchanged_state and not self.network_activity.has_pending():
+			# read before the extraction, so changes made while extracting make the state stale
+			page_change_token = await self._get_page_change_token()
+			if session.cached_state is not None and page_change_token is not None and session.cached_state_token == page_change_token:
+				return await self._reuse_cached_state(session, cache_clickable_elements_hashes)
+
+		previous_state = getattr(self, 'current_state', None)
 		updated_state = await self._get_updated_state()
+		if updated_state is previous_state:
+			# the extraction failed and returned the last good state, it must not be reused for this page
+			page_change_token = None
 
-		# Find out which elements are new
-		# Do this only if url has not changed
 		if cache_clickable_elements_hashes:
-			# if we are on the same url as the last state, we can use the cached hashes
-			if (
-				session.cached_state_clickable_elements_hashes
-				and session.cached_state_clickable_elements_hashes.url == updated_state.url
-			):
-				# Pointers, feel free to edit in place
-				updated_state_clickable_elements = ClickableElementProcessor.get_clickable_elements(updated_state.element_tree)
-
-				for dom_element in updated_state_clickable_elements:
-					dom_element.is_new = (
-						ClickableElementProcessor.hash_dom_element(dom_element)
-						not in session.cached_state_clickable_elements_hashes.hashes  # see which elements are new from the last state where we cached the hashes
-					)
-			# in any case, we need to cache the new hashes
-			session.cached_state_clickable_elements_hashes = CachedStateClickableElementsHashes(
-				url=updated_state.url,
-				hashes=ClickableElementProcessor.get_clickable_elements_hashes(updated_state.element_tree),
-			)
+			self._update_new_elements(session, updated_state)
 
 		session.cached_state = updated_state
+		session.cached_state_token = page_change_token
+		session.element_handles = {}
+		session.css_selectors = {}
 
 		# Save cookies if a file is specified
 		if self.config.cookies_file:
@@ -1205,6 +1435,54 @@ class BrowserContext:
 
 		return session.cached_state
 
+	@staticmethod
+	def _update_new_elements(session: BrowserSession, state: BrowserState) -> None:
+		# Find out which elements are new
+		# Do this only if url has not changed
+		# if we are on the same url as the last state, we can use the cached hashes
+		if session.cached_state_clickable_elements_hashes and session.cached_state_clickable_elements_hashes.url == state.url:
+			# Pointers, feel free to edit in place
+			updated_state_clickable_elements = ClickableElementProcessor.get_clickable_elements(state.element_tree)
+
+			for dom_element in updated_state_clickable_elements:
+				dom_element.is_new = (
+					ClickableElementProcessor.hash_dom_element(dom_element)
+					not in session.cached_state_clickable_elements_hashes.hashes  # see which elements are new from the last state where we cached the hashes
+				)
+		# in any case, we need to cache the new hashes
+		session.cached_state_clickable_elements_hashes = CachedStateClickableElementsHashes(
+			url=state.url,
+			hashes=ClickableElementProcessor.get_clickable_elements_hashes(state.element_tree),
+		)
+
+	async def _get_page_change_token(self) -> str | None:
+		"""
+		Cheap fingerprint of the agent's page: document, url, scroll position, viewport size and the number of DOM
+		mutations (shadow roots and same-origin frames included) seen by observers installed on first use.
+		None if the page cannot be probed, or when merged cross-origin frames could have changed unseen.
+		"""
+		try:
+			page = await self.get_agent_current_page()
+			token, opaque_frames = await page.evaluate(PAGE_CHANGE_PROBE_JS)
+		except Exception as e:
+			logger.debug(f'Page change probe failed: {type(e).__name__}: {e}')
+			return None
+		if opaque_frames and self.config.include_cross_origin_iframes:
+			return None
+		return f'{id(page)}|{token}'
+
+	async def _reuse_cached_state(self, session: BrowserSession, cache_clickable_elements_hashes: bool) -> BrowserState:
+		"""Return the cached state of an unchanged page, only the screenshot and tabs are refreshed"""
+		state = session.cached_state
+		assert state is not None
+		logger.debug('♻️  Page did not change since the last state, reusing it')
+		# typed text and other property changes are not DOM mutations, but they are visible
+		state.screenshot = await self.take_screenshot()
+		state.tabs = await self.get_tabs_info()
+		if cache_clickable_elements_hashes:
+			self._update_new_elements(session, state)
+		return state
+
 	async def _get_updated_state(self, focus_element: int = -1) -> BrowserState:
 		"""Update and return state."""
 		session = await self.get_session()
@@ -1221,10 +1499,14 @@ class BrowserContext:
 		try:
 			await self.remove_highlights()
 			dom_service = DomService(page)
+			self._dom_state_count += 1
+			dom_state_id = f'{self.context_id[:8]}-{self._dom_state_count}'
 			content = await dom_service.get_clickable_elements(
 				focus_element=focus_element,
 				viewport_expansion=self.config.viewport_expansion,
 				highlight_elements=self.config.highlight_elements,
+				state_id=dom_state_id,
+				include_cross_origin_iframes=self.config.include_cross_origin_iframes,
 			)
 
 			tabs_info = await self.get_tabs_info()
@@ -1269,6 +1551,7 @@ class BrowserContext:
 				screenshot=screenshot_b64,
 				pixels_above=pixels_above,
 				pixels_below=pixels_below,
+				dom_state_id=dom_state_id,
 			)
 
 			return self.current_state
@@ -1311,25 +1594,11 @@ class BrowserContext:
 		"""
 		try:
 			page = await self.get_agent_current_page()
-			await page.evaluate(
-				"""
-				try {
-					// Remove the highlight container and all its contents
-					const container = document.getElementById('playwright-highlight-container');
-					if (container) {
-						container.remove();
-					}
-
-					// Remove highlight attributes from elements
-					const highlightedElements = document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]');
-					highlightedElements.forEach(el => {
-						el.removeAttribute('browser-user-highlight-id');
-					});
-				} catch (e) {
-					console.error('Failed to remove highlights:', e);
-				}
-				"""
-			)
+			await page.evaluate(REMOVE_HIGHLIGHTS_JS)
+			if self.config.include_cross_origin_iframes:
+				# cross-origin iframes draw their highlights into their own document
+				frames = [frame for frame in page.frames if frame is not page.main_frame]
+				await asyncio.gather(*(frame.evaluate(REMOVE_HIGHLIGHTS_JS) for frame in frames), return_exceptions=True)
 		except Exception as e:
 			logger.debug(f'⚠  Failed to remove highlights (this is usually ok): {str(e)}')
 			# Don't raise the error since this is not critical functionality
@@ -1521,8 +1790,102 @@ class BrowserContext:
 
 		return not is_hidden and bbox is not None and bbox['width'] > 0 and bbox['height'] > 0
 
+	@time_execution_async('--prewarm_elements')
+	async def prewarm_elements(self, indexes: list[int]) -> int:
+		"""
+		Resolve element handles for the given indexes of the cached selector map ahead of time,
+		so a later get_locate_element does not have to query the page. Elements inside iframes are skipped.
+
+		Returns the number of resolved handles.
+		"""
+		session = await self.get_session()
+		if session.cached_state is None:
+			return 0
+		selector_map = session.cached_state.selector_map
+		page = await self.get_agent_current_page()
+
+		resolved = 0
+		for index in indexes:
+			element = selector_map.get(index)
+			if element is None or index in session.element_handles:
+				continue
+			if any(parent.tag_name == 'iframe' for parent in self._iter_parents(element)):
+				continue
+			try:
+				element_handle = await page.query_selector(self._state_css_selector(session, element))
+			except Exception as e:
+				logger.debug(f'Could not prewarm element {index}: {type(e).__name__}: {e}')
+				continue
+			# the state may have been refreshed while we were waiting on the page
+			if session.cached_state is None or session.cached_state.selector_map is not selector_map:
+				break
+			if element_handle:
+				session.element_handles[index] = element_handle
+				resolved += 1
+		return resolved
+
+	@staticmethod
+	def _iter_parents(element: DOMElementNode):
+		current = element.parent
+		while current is not None:
+			yield current
+			current = current.parent
+
+	@staticmethod
+	def _is_cached_element(session: BrowserSession, element: DOMElementNode) -> bool:
+		"""Whether the element belongs to the cached state, only those may use the per-state caches"""
+		index = element.highlight_index
+		return (
+			index is not None
+			and session.cached_state is not None
+			and session.cached_state.selector_map.get(index) is element
+		)
+
+	def _css_selector(self, session: BrowserSession, element: DOMElementNode, cached: bool) -> str:
+		"""Enhanced css selector of an element, memoized for the cached state"""
+		css_selector = session.css_selectors.get(id(element)) if cached else None
+		if css_selector is None:
+			css_selector = self._enhanced_css_selector_for_element(
+				element, include_dynamic_attributes=self.config.include_dynamic_attributes
+			)
+			if cached:
+				session.css_selectors[id(element)] = css_selector
+		return css_selector
+
+	def _state_css_selector(self, session: BrowserSession, element: DOMElementNode) -> str:
+		"""
+		Selector of an element of the cached state: the attribute stamped by the DOM extraction when available,
+		it is unique and does not depend on the page structure, otherwise the enhanced css selector.
+		"""
+		dom_state_id = session.cached_state.dom_state_id if session.cached_state else None
+		if dom_state_id and element.highlight_index is not None:
+			return dom_state_selector(dom_state_id, element.highlight_index)
+		return self._css_selector(session, element, cached=True)
+
+	async def _get_cached_element(self, session: BrowserSession, element: DOMElementNode) -> ElementHandle | None:
+		"""Return the resolved handle for an element of the cached state if it is still attached and visible"""
+		element_handle = session.element_handles.get(element.highlight_index)
+		if element_handle is None:
+			return None
+		try:
+			# detached or hidden elements go through a fresh lookup
+			if await self._is_visible(element_handle):
+				await element_handle.scroll_into_view_if_needed()
+				return element_handle
+		except Exception:
+			pass
+		del session.element_handles[element.highlight_index]
+		return None
+
 	@time_execution_async('--get_locate_element')
 	async def get_locate_element(self, element: DOMElementNode) -> ElementHandle | None:
+		session = await self.get_session()
+		cached = self._is_cached_element(session, element)
+		if cached:
+			element_handle = await self._get_cached_element(session, element)
+			if element_handle is not None:
+				return element_handle
+
 		current_frame = await self.get_agent_current_page()
 
 		# Start with the target element and collect all parents
@@ -1539,29 +1902,34 @@ class BrowserContext:
 		# Process all iframe parents in sequence
 		iframes = [item for item in parents if item.tag_name == 'iframe']
 		for parent in iframes:
-			css_selector = self._enhanced_css_selector_for_element(
-				parent,
-				include_dynamic_attributes=self.config.include_dynamic_attributes,
-			)
+			css_selector = self._css_selector(session, parent, cached)
 			current_frame = current_frame.frame_locator(css_selector)
 
-		css_selector = self._enhanced_css_selector_for_element(
-			element, include_dynamic_attributes=self.config.include_dynamic_attributes
-		)
+		# elements of the cached state are found by their stamp first, the css selector is the fallback
+		# for pages that rewrote the element (and dropped the attribute) since the extraction
+		css_selectors = [self._css_selector(session, element, cached)]
+		if cached and css_selectors[0] != (state_selector := self._state_css_selector(session, element)):
+			css_selectors.insert(0, state_selector)
 
 		try:
-			if isinstance(current_frame, FrameLocator):
-				element_handle = await current_frame.locator(css_selector).element_handle()
-				return element_handle
-			else:
-				# Try to scroll into view if hidden
+			element_handle = None
+			for css_selector in css_selectors:
+				if isinstance(current_frame, FrameLocator):
+					locator = current_frame.locator(css_selector)
+					if css_selector is not css_selectors[-1] and await locator.count() == 0:
+						continue
+					element_handle = await locator.element_handle()
+					break
 				element_handle = await current_frame.query_selector(css_selector)
 				if element_handle:
+					# Try to scroll into view if hidden
 					is_visible = await self._is_visible(element_handle)
 					if is_visible:
 						await element_handle.scroll_into_view_if_needed()
-					return element_handle
-				return None
+					break
+			if element_handle and cached:
+				session.element_handles[element.highlight_index] = element_handle
+			return element_handle
 		except Exception as e:
 			logger.error(f'❌  Failed to locate element: {str(e)}')
 			return None
@@ -1698,6 +2066,38 @@ class BrowserContext:
 			logger.debug(f'❌  Failed to input text into element: {repr(element_node)}. Error: {str(e)}')
 			raise BrowserError(f'Failed to input text into index {element_node.highlight_index}')
 
+	@time_execution_async('--fill_element_nodes')
+	async def _fill_element_nodes(self, fields: list[tuple[DOMElementNode, str]]) -> list[bool]:
+		"""
+		Set the text of several inputs and textareas of the cached state with one page-side script.
+
+		Elements are found by the index stamped during the last extraction. Returns per field whether it was filled,
+		elements inside iframes, without stamp, or that are not plain editable text fields are left for
+		_input_text_element_node.
+		"""
+		session = await self.get_session()
+		dom_state_id = session.cached_state.dom_state_id if session.cached_state else None
+		filled = [False] * len(fields)
+		batch = [
+			(i, {'selector': dom_state_selector(dom_state_id, element.highlight_index), 'text': text})
+			for i, (element, text) in enumerate(fields)
+			if dom_state_id
+			and self._is_cached_element(session, element)
+			and not any(parent.tag_name == 'iframe' for parent in self._iter_parents(element))
+		]
+		if not batch:
+			return filled
+
+		page = await self.get_agent_current_page()
+		try:
+			statuses = await page.evaluate(FILL_FIELDS_JS, [field for _, field in batch])
+		except Exception as e:
+			logger.debug(f'Batched input failed, falling back to single inputs: {type(e).__name__}: {e}')
+			return filled
+		for (i, _), status in zip(batch, statuses):
+			filled[i] = status == 'ok'
+		return filled
+
 	@time_execution_async('--click_element_node')
 	async def _click_element_node(self, element_node: DOMElementNode) -> str | None:
 		"""
@@ -1956,6 +2356,9 @@ class BrowserContext:
 			await page.close()
 
 		session.cached_state = None
+		session.cached_state_token = None
+		session.element_handles = {}
+		session.css_selectors = {}
 		self.state.target_id = None
 
 	async def _get_unique_filename(self, directory, filename):
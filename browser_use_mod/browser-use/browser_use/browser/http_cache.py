@@ -0,0 +1,265 @@
+"""
+Shared on-disk HTTP cache for static resources, used across contexts, sessions and browser processes.
+"""
+
+import asyncio
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright.async_api import Request, Response, Route
+from pydantic import BaseModel, ConfigDict, Field
+
+logger = logging.getLogger(__name__)
+
+# headers that describe the transfer rather than the resource, the body is stored decoded
+SKIPPED_RESPONSE_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie', 'date'}
+
+# response headers that identify a deployment of the site, a changed value invalidates the cached origin
+DEFAULT_DEPLOY_MARKER_HEADERS = ['x-deploy-id', 'x-build-id', 'x-release', 'x-app-version']
+
+
+class HttpCacheConfig(BaseModel):
+	"""Configuration for the shared HTTP cache."""
+
+	model_config = ConfigDict(validate_default=True, validate_assignment=True)
+
+	cache_dir: str = Field(default='/tmp/browser_use_http_cache', min_length=1)
+	max_size_bytes: int = Field(default=512 * 1024 * 1024, gt=0)
+	# larger responses are passed through without caching
+	max_entry_bytes: int = Field(default=10 * 1024 * 1024, gt=0)
+	# entries older than this are refetched, even without a deploy
+	ttl_seconds: float = Field(default=24 * 3600, gt=0)
+	# glob patterns of hosts to cache (e.g. ['staging.example.com', '*.cdn.example.com']), None caches every host
+	hosts: list[str] | None = None
+	resource_types: list[str] = Field(default_factory=lambda: ['script', 'stylesheet', 'font', 'image'])
+	deploy_marker_headers: list[str] = Field(default_factory=lambda: list(DEFAULT_DEPLOY_MARKER_HEADERS))
+
+
+class SharedHttpCache:
+	"""
+	Disk cache for static subresources, served through request interception.
+
+	Browser contexts start with an empty in-memory cache, so without this every run re-downloads the same
+	bundles. Entries are stored one file per URL, grouped per origin so a whole origin can be invalidated
+	at once (explicitly, or automatically when a document response carries a new deploy marker header).
+	Only plain GET responses with status 200 that are not no-store/private and do not vary on cookies are
+	cached. Entries are evicted least-recently-used once the directory grows past `max_size_bytes`.
+	"""
+
+	def __init__(self, config: HttpCacheConfig | None = None):
+		self.config = config or HttpCacheConfig()
+		self.cache_dir = Path(self.config.cache_dir)
+		self.cache_dir.mkdir(parents=True, exist_ok=True)
+		self.hits = 0
+		self.misses = 0
+		self._resource_types = set(self.config.resource_types)
+		self._deploy_markers: dict[str, str] = {}
+
+		# path -> (size, last access), loaded once and kept in sync on every write
+		self._index: dict[Path, tuple[int, float]] = {}
+		for path in self.cache_dir.glob('*/*.entry'):
+			stat = path.stat()
+			self._index[path] = (stat.st_size, stat.st_mtime)
+		self._total_size = sum(size for size, _ in self._index.values())
+
+	# Keys -------------------------------------------------------------------
+
+	@staticmethod
+	def _origin(url: str) -> str:
+		parsed = urlparse(url)
+		return f'{parsed.scheme}://{parsed.netloc}'
+
+	def _origin_dir(self, origin: str) -> Path:
+		return self.cache_dir / hashlib.sha256(origin.encode()).hexdigest()[:16]
+
+	def _path_for_url(self, url: str) -> Path:
+		# fragments never reach the server
+		url = url.split('#', 1)[0]
+		return self._origin_dir(self._origin(url)) / f'{hashlib.sha256(url.encode()).hexdigest()}.entry'
+
+	def is_cacheable_request(self, request: Request) -> bool:
+		if request.method != 'GET' or request.resource_type not in self._resource_types:
+			return False
+		if not request.url.startswith(('http://', 'https://')):
+			return False
+		if self.config.hosts is None:
+			return True
+		host = urlparse(request.url).hostname or ''
+		return any(fnmatch.fnmatch(host, pattern) for pattern in self.config.hosts)
+
+	def _is_cacheable_response(self, status: int, headers: dict[str, str], body: bytes) -> bool:
+		if status != 200 or len(body) > self.config.max_entry_bytes:
+			return False
+		cache_control = headers.get('cache-control', '').lower()
+		if 'no-store' in cache_control or 'private' in cache_control:
+			return False
+		return 'cookie' not in headers.get('vary', '').lower()
+
+	# Storage ----------------------------------------------------------------
+
+	@staticmethod
+	def _read_entry(path: Path) -> tuple[dict, bytes] | None:
+		try:
+			data = path.read_bytes()
+		except OSError:
+			return None
+		meta, _, body = data.partition(b'\n')
+		try:
+			return json.loads(meta), body
+		except ValueError:
+			return None
+
+	@staticmethod
+	def _write_entry(path: Path, meta: dict, body: bytes) -> int:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		# write to a temp file first so concurrent readers never see a half-written entry
+		tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+		tmp_path.write_bytes(json.dumps(meta).encode() + b'\n' + body)
+		os.replace(tmp_path, path)
+		return path.stat().st_size
+
+	async def get(self, url: str) -> tuple[int, dict[str, str], bytes] | None:
+		"""Return (status, headers, body) of a fresh cached response for `url`, or None"""
+		path = self._path_for_url(url)
+		entry = await asyncio.to_thread(self._read_entry, path) if path in self._index or path.exists() else None
+		if entry is None or time.time() - entry[0].get('stored_at', 0) > self.config.ttl_seconds:
+			self.misses += 1
+			return None
+
+		meta, body = entry
+		self.hits += 1
+		now = time.time()
+		try:
+			os.utime(path, (now, now))
+		except OSError:
+			pass
+		if path not in self._index:
+			# written by another process sharing the cache dir
+			size = path.stat().st_size
+			self._total_size += size
+			self._index[path] = (size, now)
+		else:
+			self._index[path] = (self._index[path][0], now)
+		return meta['status'], meta['headers'], body
+
+	async def put(self, url: str, status: int, headers: dict[str, str], body: bytes) -> None:
+		path = self._path_for_url(url)
+		stored_headers = {name: value for name, value in headers.items() if name.lower() not in SKIPPED_RESPONSE_HEADERS}
+		meta = {'url': url, 'status': status, 'headers': stored_headers, 'stored_at': time.time()}
+		size = await asyncio.to_thread(self._write_entry, path, meta, body)
+
+		old_size = self._index.get(path, (0, 0.0))[0]
+		self._index[path] = (size, time.time())
+		self._total_size += size - old_size
+		self._evict()
+
+	def _evict(self) -> None:
+		"""Drop least-recently-used entries until the cache fits in max_size_bytes"""
+		if self._total_size <= self.config.max_size_bytes:
+			return
+
+		for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+			if self._total_size <= self.config.max_size_bytes:
+				break
+			try:
+				path.unlink()
+			except FileNotFoundError:
+				pass
+			except OSError as e:
+				logger.debug(f'Failed to evict HTTP cache entry {path}: {e}')
+				continue
+			del self._index[path]
+			self._total_size -= size
+
+	def invalidate_origin(self, origin: str) -> int:
+		"""Drop every cached response of an origin (e.g. 'https://staging.example.com'), returns the number of entries"""
+		origin_dir = self._origin_dir(self._origin(origin) if '://' in origin else origin)
+		removed = [path for path in self._index if path.parent == origin_dir]
+		for path in removed:
+			self._total_size -= self._index.pop(path)[0]
+		shutil.rmtree(origin_dir, ignore_errors=True)
+		if removed:
+			logger.info(f'🧹  Invalidated {len(removed)} cached responses of {origin}')
+		return len(removed)
+
+	def clear(self) -> None:
+		for origin_dir in [path for path in self.cache_dir.iterdir() if path.is_dir()]:
+			shutil.rmtree(origin_dir, ignore_errors=True)
+		self._index.clear()
+		self._total_size = 0
+
+	# Browser hooks ----------------------------------------------------------
+
+	async def handle_route(self, route: Route, request: Request) -> None:
+		"""Route handler for a playwright BrowserContext"""
+		if not self.is_cacheable_request(request):
+			await route.fallback()
+			return
+
+		cached = await self.get(request.url)
+		if cached is not None:
+			status, headers, body = cached
+			await route.fulfill(status=status, headers=headers, body=body)
+			return
+
+		try:
+			response = await route.fetch()
+			body = await response.body()
+		except Exception as e:
+			logger.debug(f'HTTP cache could not fetch {request.url}: {type(e).__name__}: {e}')
+			await route.fallback()
+			return
+
+		if self._is_cacheable_response(response.status, response.headers, body):
+			try:
+				await self.put(request.url, response.status, response.headers, body)
+			except OSError as e:
+				logger.debug(f'Failed to store HTTP cache entry for {request.url}: {e}')
+		await route.fulfill(response=response, body=body)
+
+	def on_response(self, response: Response) -> None:
+		"""Invalidate an origin when one of its documents reports a new deployment"""
+		if response.request.resource_type != 'document':
+			return
+		headers = response.headers
+		marker = next((headers[name] for name in self.config.deploy_marker_headers if name in headers), None)
+		if marker is None:
+			return
+
+		origin = self._origin(response.url)
+		marker_path = self._origin_dir(origin) / 'deploy_marker'
+		previous = self._deploy_markers.get(origin)
+		if previous is None and marker_path.exists():
+			previous = marker_path.read_text(encoding='utf-8')
+		if previous != marker:
+			if previous is not None:
+				logger.info(f'🚀  {origin} was deployed ({previous} -> {marker})')
+				self.invalidate_origin(origin)
+			marker_path.parent.mkdir(parents=True, exist_ok=True)
+			marker_path.write_text(marker, encoding='utf-8')
+		self._deploy_markers[origin] = marker
+
+	def __len__(self) -> int:
+		return len(self._index)
+
+	@property
+	def total_size(self) -> int:
+		return self._total_size
+
+
+# shared by every context in the process so the size accounting covers all of them
+_http_caches: dict[str, SharedHttpCache] = {}
+
+
+def get_shared_http_cache(config: HttpCacheConfig) -> SharedHttpCache:
+	cache_dir = str(Path(config.cache_dir).resolve())
+	if cache_dir not in _http_caches:
+		_http_caches[cache_dir] = SharedHttpCache(config)
+	return _http_caches[cache_dir]
@@ -0,0 +1,107 @@
+"""
+Many isolated browser contexts on a small number of browser processes.
+"""
+
+import asyncio
+import logging
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolConfig(BaseModel):
+	"""Configuration for the shared browser pool."""
+
+	model_config = ConfigDict(validate_default=True, validate_assignment=True)
+
+	# contexts hosted by one browser process before a new process is launched
+	max_contexts_per_browser: int = Field(default=8, ge=1)
+	# maximum number of browser processes, once reached contexts go to the least loaded process anyway
+	max_browsers: int | None = Field(default=None, ge=1)
+	# number of idle browser processes kept running to absorb the next sessions
+	keep_idle_browsers: int = Field(default=1, ge=0)
+
+
+class BrowserPool:
+	"""
+	Hosts many isolated BrowserContexts (own cookies, storage and cache) on shared browser processes.
+
+	A new context is placed on the least loaded browser with free capacity. When every browser is full a new
+	browser process is launched on a dynamically allocated debugging port, so pools never fight over a port.
+	Only builtin browsers are sharded, cdp_url / wss_url / browser_binary_path configs share contexts with
+	the user's browser and should not be used here.
+	"""
+
+	def __init__(self, browser_config: BrowserConfig | None = None, config: BrowserPoolConfig | None = None):
+		self.browser_config = browser_config or BrowserConfig()
+		self.config = config or BrowserPoolConfig()
+		self.browsers: dict[Browser, set[BrowserContext]] = {}
+		self._owners: dict[BrowserContext, Browser] = {}
+		self._lock = asyncio.Lock()
+
+	async def new_context(self, config: BrowserContextConfig | None = None) -> BrowserContext:
+		"""Create an isolated context on the least loaded browser, launching a new browser if all are full"""
+		async with self._lock:
+			browser = self._pick_browser()
+			if browser is None:
+				browser = await self._launch_browser()
+			context = await browser.new_context(config or self.browser_config.new_context_config)
+			self.browsers[browser].add(context)
+			self._owners[context] = browser
+			return context
+
+	async def release_context(self, context: BrowserContext) -> None:
+		"""Close a context created by this pool and shut down browsers that are no longer needed"""
+		async with self._lock:
+			browser = self._owners.pop(context, None)
+			await context.close()
+			if browser is None:
+				return
+			self.browsers[browser].discard(context)
+
+			idle = [browser for browser, contexts in self.browsers.items() if not contexts]
+			for idle_browser in idle[self.config.keep_idle_browsers :]:
+				del self.browsers[idle_browser]
+				await idle_browser.close()
+
+	async def close(self) -> None:
+		"""Close every context and browser of the pool"""
+		async with self._lock:
+			for browser, contexts in list(self.browsers.items()):
+				for context in contexts:
+					await context.close()
+				await browser.close()
+			self.browsers.clear()
+			self._owners.clear()
+
+	@property
+	def context_counts(self) -> list[int]:
+		"""Number of contexts per browser process"""
+		return [len(contexts) for contexts in self.browsers.values()]
+
+	def _pick_browser(self) -> Browser | None:
+		if not self.browsers:
+			return None
+		browser, contexts = min(self.browsers.items(), key=lambda item: len(item[1]))
+		if len(contexts) < self.config.max_contexts_per_browser:
+			return browser
+		if self.config.max_browsers is not None and len(self.browsers) >= self.config.max_browsers:
+			logger.warning(
+				f'⚠️  All {len(self.browsers)} browsers host {self.config.max_contexts_per_browser}+ contexts, '
+				f'adding one more context to the least loaded browser'
+			)
+			return browser
+		return None
+
+	async def _launch_browser(self) -> Browser:
+		# every process gets its own free debugging port, see Browser._setup_builtin_browser
+		browser = Browser(config=self.browser_config.model_copy(update={'chrome_remote_debugging_port': None}))
+		# launch eagerly, contexts created concurrently on a fresh browser would otherwise each launch a process
+		await browser.get_playwright_browser()
+		self.browsers[browser] = set()
+		logger.info(f'🌎  Launched shared browser {len(self.browsers)} for up to {self.config.max_contexts_per_browser} contexts')
+		return browser
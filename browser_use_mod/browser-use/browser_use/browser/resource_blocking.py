@@ -0,0 +1,217 @@
+"""
+Request interception that blocks heavy or irrelevant resources according to a task profile.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Literal
+from urllib.parse import urlsplit
+
+from playwright.async_api import Request, Route
+
+logger = logging.getLogger(__name__)
+
+# URL substrings of requests that are not waited for when waiting for network idle. Too broad for blocking,
+# see BLOCKED_TRACKER_HOSTS.
+IGNORED_URL_PATTERNS = frozenset(
+	{
+		# Analytics and tracking
+		'analytics',
+		'tracking',
+		'telemetry',
+		'beacon',
+		'metrics',
+		# Ad-related
+		'doubleclick',
+		'adsystem',
+		'adserver',
+		'advertising',
+		# Social media widgets
+		'facebook.com/plugins',
+		'platform.twitter',
+		'linkedin.com/embed',
+		# Live chat and support
+		'livechat',
+		'zendesk',
+		'intercom',
+		'crisp.chat',
+		'hotjar',
+		# Push notifications
+		'push-notifications',
+		'onesignal',
+		'pushwoosh',
+		# Background sync/heartbeat
+		'heartbeat',
+		'ping',
+		'alive',
+		# WebRTC and streaming
+		'webrtc',
+		'rtmp://',
+		'wss://',
+		# Common CDNs for dynamic content
+		'cloudfront.net',
+		'fastly.net',
+	}
+)
+
+# ad, analytics and tracker hosts blocked by the lighter profiles, a request matches a host and its subdomains.
+# Only the hostname is compared: first party paths such as /shopping-cart or /api/tracking are never blocked,
+# and shared CDNs are left out because pages load their own code from them.
+BLOCKED_TRACKER_HOSTS = frozenset(
+	{
+		# Analytics
+		'google-analytics.com',
+		'analytics.google.com',
+		'googletagmanager.com',
+		'segment.io',
+		'segment.com',
+		'mixpanel.com',
+		'amplitude.com',
+		'heapanalytics.com',
+		'fullstory.com',
+		'hotjar.com',
+		'mouseflow.com',
+		'clarity.ms',
+		'newrelic.com',
+		'nr-data.net',
+		'sentry.io',
+		# Ads
+		'doubleclick.net',
+		'googlesyndication.com',
+		'googleadservices.com',
+		'adservice.google.com',
+		'amazon-adsystem.com',
+		'adnxs.com',
+		'criteo.com',
+		'taboola.com',
+		'outbrain.com',
+		'scorecardresearch.com',
+		'quantserve.com',
+		# Social widgets and pixels
+		'connect.facebook.net',
+		'platform.twitter.com',
+		'platform.linkedin.com',
+		'snap.licdn.com',
+		# Live chat and push notifications
+		'widget.intercom.io',
+		'js.intercomcdn.com',
+		'static.zdassets.com',
+		'client.crisp.chat',
+		'cdn.livechatinc.com',
+		'cdn.onesignal.com',
+		'pushwoosh.com',
+	}
+)
+
+ResourceBlockingProfileName = Literal['text-only', 'no-media', 'security-audit-full']
+
+# rough median transfer sizes per resource type, only used to estimate the bytes a blocked request saved
+ESTIMATED_RESOURCE_BYTES = {
+	'image': 40_000,
+	'media': 500_000,
+	'font': 30_000,
+	'script': 25_000,
+	'stylesheet': 10_000,
+	'xhr': 2_000,
+	'fetch': 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def is_blocked_host(hostname: str, blocked_hosts: frozenset[str]) -> bool:
+	"""True if hostname is one of blocked_hosts or a subdomain of one"""
+	hostname = hostname.lower().rstrip('.')
+	while hostname:
+		if hostname in blocked_hosts:
+			return True
+		_, _, hostname = hostname.partition('.')
+	return False
+
+
+@dataclass(frozen=True)
+class ResourceBlockingProfile:
+	name: str
+	blocked_resource_types: frozenset[str] = frozenset()
+	blocked_hosts: frozenset[str] = frozenset()
+	# matching scripts/stylesheets are answered with an empty 200 instead of a network error,
+	# pages that wait on a blocked tracker script's onload keep working
+	stub_resource_types: frozenset[str] = frozenset({'script', 'stylesheet'})
+
+	def should_block(self, resource_type: str, url: str) -> bool:
+		# pages and frames the agent navigates to always load
+		if resource_type == 'document':
+			return False
+		if resource_type in self.blocked_resource_types:
+			return True
+		if not self.blocked_hosts:
+			return False
+		return is_blocked_host(urlsplit(url).hostname or '', self.blocked_hosts)
+
+
+RESOURCE_BLOCKING_PROFILES: dict[str, ResourceBlockingProfile] = {
+	# text and structure only, no pixels or sound (vision still sees the layout, without images)
+	'text-only': ResourceBlockingProfile(
+		name='text-only',
+		blocked_resource_types=frozenset({'image', 'media', 'font', 'texttrack', 'manifest'}),
+		blocked_hosts=BLOCKED_TRACKER_HOSTS,
+	),
+	# everything except audio/video and third party noise
+	'no-media': ResourceBlockingProfile(
+		name='no-media',
+		blocked_resource_types=frozenset({'media', 'texttrack'}),
+		blocked_hosts=BLOCKED_TRACKER_HOSTS,
+	),
+	# security audits need to observe every request the page makes, third party ones included
+	'security-audit-full': ResourceBlockingProfile(name='security-audit-full'),
+}
+
+
+@dataclass
+class ResourceBlockingStats:
+	"""Requests blocked since the last report, bytes are estimated from the resource type"""
+
+	blocked_requests: int = 0
+	estimated_bytes_saved: int = 0
+	by_resource_type: dict[str, int] = field(default_factory=dict)
+
+
+class ResourceBlocker:
+	"""Route handler for a playwright BrowserContext that aborts or stubs requests matching a profile"""
+
+	def __init__(self, profile: ResourceBlockingProfile):
+		self.profile = profile
+		self._blocked: Counter[str] = Counter()
+
+	@property
+	def blocks_anything(self) -> bool:
+		return bool(self.profile.blocked_resource_types or self.profile.blocked_hosts)
+
+	async def handle_route(self, route: Route, request: Request) -> None:
+		resource_type = request.resource_type
+		if not self.profile.should_block(resource_type, request.url):
+			await route.fallback()
+			return
+
+		self._blocked[resource_type] += 1
+		try:
+			if resource_type in self.profile.stub_resource_types:
+				content_type = 'text/css' if resource_type == 'stylesheet' else 'application/javascript'
+				await route.fulfill(status=200, body='', content_type=content_type)
+			else:
+				await route.abort('blockedbyclient')
+		except Exception as e:
+			# the page may have navigated away in the meantime
+			logger.debug(f'Failed to block {request.url}: {type(e).__name__}: {e}')
+
+	def take_stats(self) -> ResourceBlockingStats:
+		"""Return the requests blocked since the last call and start counting from zero"""
+		blocked, self._blocked = self._blocked, Counter()
+		return ResourceBlockingStats(
+			blocked_requests=sum(blocked.values()),
+			estimated_bytes_saved=sum(
+				ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES) * count
+				for resource_type, count in blocked.items()
+			),
+			by_resource_type=dict(blocked),
+		)
@@ -26,6 +26,8 @@ class BrowserState(DOMState):
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
+	# id of the extraction that stamped the highlighted elements, see dom_state_selector
+	dom_state_id: str | None = None
 
 
 @dataclass
@@ -0,0 +1,4 @@
+from browser_use.controller.extraction.service import ContentExtractor, split_markdown
+from browser_use.controller.extraction.views import ExtractionConfig
+
+__all__ = ['ContentExtractor', 'ExtractionConfig', 'split_markdown']
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import logging
+import re
+
+import markdownify
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.prompts import PromptTemplate
+from playwright.async_api import Frame, Page
+
+from browser_use.agent.llm_cache.service import LLMResponseCache
+from browser_use.agent.llm_cache.views import LLMCacheConfig
+from browser_use.controller.extraction.views import ExtractionConfig
+from browser_use.dom.service import is_ad_frame_url
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_PROMPT = PromptTemplate(
+	input_variables=['goal', 'page'],
+	template='Your task is to extract the content of the page. You will be given a page and a goal and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format. Extraction goal: {goal}, Page: {page}',
+)
+
+CHUNK_PROMPT = PromptTemplate(
+	input_variables=['goal', 'page', 'part', 'parts'],
+	template='Your task is to extract the content of one part of a page. You will be given part {part} of {parts} of a page and a goal and you should extract all relevant information around this goal from this part. If the goal is vague, summarize the part. If the part contains nothing relevant, respond with an empty json object. Respond in json format. Extraction goal: {goal}, Page part: {page}',
+)
+
+REDUCE_PROMPT = PromptTemplate(
+	input_variables=['goal', 'extractions'],
+	template='Your task is to combine information extracted from consecutive parts of one page into a single answer. Merge lists, drop duplicates and empty results, keep the order of the page. Respond in json format. Extraction goal: {goal}, Extractions per part: {extractions}',
+)
+
+HEADING_PATTERN = re.compile(r'^(?=#{1,6} )', re.MULTILINE)
+
+
+def split_markdown(content: str, chunk_size: int) -> list[str]:
+	"""
+	Split markdown into chunks of at most `chunk_size` characters, cutting at headings.
+
+	Consecutive sections are packed into one chunk while they fit. Sections longer than a chunk are cut
+	at paragraph breaks, then at line breaks, and only as a last resort in the middle of a line.
+	"""
+	chunks: list[str] = []
+	current = ''
+	for section in HEADING_PATTERN.split(content):
+		if not section:
+			continue
+		for piece in _split_long(section, chunk_size):
+			if current and len(current) + len(piece) > chunk_size:
+				chunks.append(current)
+				current = ''
+			current += piece
+	if current:
+		chunks.append(current)
+	return chunks
+
+
+def _split_long(text: str, chunk_size: int, separators: tuple[str, ...] = ('\n\n', '\n')) -> list[str]:
+	if len(text) <= chunk_size:
+		return [text]
+	if not separators:
+		return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+	separator, *rest = separators
+	pieces: list[str] = []
+	current = ''
+	parts = text.split(separator)
+	for i, part in enumerate(parts):
+		if i < len(parts) - 1:
+			part += separator
+		if current and len(current) + len(part) > chunk_size:
+			pieces.append(current)
+			current = ''
+		if len(part) > chunk_size:
+			pieces.extend(_split_long(part, chunk_size, tuple(rest)))
+		else:
+			current += part
+	if current:
+		pieces.append(current)
+	return pieces
+
+
+class ContentExtractor:
+	"""
+	Map-reduce extraction of page content with an LLM.
+
+	Short pages are extracted with a single prompt. Long pages are split into chunks at markdown headings,
+	every chunk is extracted concurrently (bounded by `max_concurrency`) and the partial results are combined
+	by one more prompt. With a `cache_dir`, results are cached on disk per (content hash, goal, model), so extracting
+	the same page twice does not call the LLM again. The agent's own llm_cache, when given, is applied to every
+	single prompt. Cache files are read and written in worker threads, the cache directory is only scanned on first use.
+	"""
+
+	def __init__(self, config: ExtractionConfig | None = None):
+		self.config = config or ExtractionConfig()
+		self.cache: LLMResponseCache | None = None
+		self._cache_lock = asyncio.Lock()
+
+	async def _get_cache(self) -> LLMResponseCache | None:
+		if self.config.cache_dir is None:
+			return None
+		async with self._cache_lock:
+			if self.cache is None:
+				cache_config = LLMCacheConfig(cache_dir=self.config.cache_dir, max_size_bytes=self.config.cache_max_size_bytes)
+				self.cache = await asyncio.to_thread(LLMResponseCache, cache_config)
+		return self.cache
+
+	async def page_to_markdown(self, page: Page, strip: list[str] | None = None) -> str:
+		"""
+		Markdown of the page followed by the text of its iframes (cross-origin included).
+
+		Frames are fetched concurrently, each within `frame_timeout` and cut at `max_frame_html_chars`. Ad and tracker
+		frames are skipped. markdownify is pure python and takes seconds on large pages, so it runs in worker threads.
+		"""
+		frames = [
+			frame
+			for frame in page.frames
+			if frame.url != page.url and not frame.url.startswith('data:') and not is_ad_frame_url(frame.url)
+		]
+		if len(frames) > self.config.max_frames:
+			logger.debug(f'Extracting {self.config.max_frames} of {len(frames)} iframes')
+			frames = frames[: self.config.max_frames]
+
+		page_markdown, *frame_markdowns = await asyncio.gather(
+			self._page_to_markdown(page, strip),
+			*(self._frame_to_markdown(frame) for frame in frames),
+		)
+		content = page_markdown
+		# manually append iframe text into the content so it's readable by the LLM
+		for frame, frame_markdown in zip(frames, frame_markdowns):
+			if frame_markdown is not None:
+				content += f'\n\nIFRAME {frame.url}:\n{frame_markdown}'
+		return content
+
+	async def _frame_to_markdown(self, frame: Frame) -> str | None:
+		try:
+			html = await asyncio.wait_for(frame.content(), timeout=self.config.frame_timeout)
+		except Exception as e:
+			logger.debug(f'Skipping iframe {frame.url}: {type(e).__name__}: {e}')
+			return None
+		return await asyncio.to_thread(markdownify.markdownify, html[: self.config.max_frame_html_chars])
+
+	@staticmethod
+	async def _page_to_markdown(page: Page, strip: list[str] | None) -> str:
+		html = await page.content()
+		return await asyncio.to_thread(markdownify.markdownify, html, strip=strip or [])
+
+	@staticmethod
+	def _model_name(llm: BaseChatModel) -> str:
+		return str(getattr(llm, 'model_name', None) or getattr(llm, 'model', None))
+
+	def _result_key(self, cache: LLMResponseCache, content: str, goal: str, llm: BaseChatModel) -> str:
+		content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+		return cache.make_key(self._model_name(llm), f'{content_hash}\n{goal}', namespace='extract_content_result')
+
+	async def extract(
+		self,
+		content: str,
+		goal: str,
+		llm: BaseChatModel,
+		llm_cache: LLMResponseCache | None = None,
+	) -> str:
+		"""Extract the information relevant to `goal` from the markdown `content`"""
+		cache = await self._get_cache()
+		result_key = self._result_key(cache, content, goal, llm) if cache is not None else None
+		if result_key and (cached := await asyncio.to_thread(cache.get, result_key)) is not None:
+			logger.debug('Extraction served from cache')
+			return cached
+
+		chunks = split_markdown(content, self.config.chunk_size)
+		if len(chunks) <= 1:
+			extracted = await self._ask(llm, EXTRACTION_PROMPT.format(goal=goal, page=content), llm_cache)
+		else:
+			logger.info(f'📄  Extracting {len(content)} characters in {len(chunks)} chunks')
+			semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+			async def extract_chunk(part: int, chunk: str) -> str:
+				async with semaphore:
+					prompt = CHUNK_PROMPT.format(goal=goal, page=chunk, part=part, parts=len(chunks))
+					return await self._ask(llm, prompt, llm_cache)
+
+			partials = await asyncio.gather(*(extract_chunk(part, chunk) for part, chunk in enumerate(chunks, start=1)))
+			extractions = '\n\n'.join(f'Part {part}: {partial}' for part, partial in enumerate(partials, start=1))
+			extracted = await self._ask(llm, REDUCE_PROMPT.format(goal=goal, extractions=extractions), llm_cache)
+
+		if result_key:
+			await asyncio.to_thread(cache.set, result_key, extracted)
+		return extracted
+
+	async def _ask(self, llm: BaseChatModel, prompt: str, llm_cache: LLMResponseCache | None) -> str:
+		cache_key = None
+		if llm_cache is not None:
+			cache_key = llm_cache.make_key(self._model_name(llm), prompt, namespace='extract_content')
+			cached = await asyncio.to_thread(llm_cache.get, cache_key)
+			if cached is not None:
+				return cached
+		output = await llm.ainvoke(prompt)
+		extracted = output.content
+		if cache_key is not None:
+			await asyncio.to_thread(llm_cache.set, cache_key, extracted)
+		return extracted
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ExtractionConfig(BaseModel):
+	"""Configuration for the extract_content action."""
+
+	model_config = ConfigDict(validate_default=True, validate_assignment=True)
+
+	# markdown up to this many characters is extracted in one prompt, longer pages are split into chunks of this size
+	chunk_size: int = Field(default=20_000, gt=0)
+	# chunk prompts running at the same time
+	max_concurrency: int = Field(default=4, ge=1)
+	# directory of the on-disk cache of extraction results per (page content, goal, model), None disables the cache.
+	# Use a private directory, cached results contain page content.
+	cache_dir: str | None = None
+	cache_max_size_bytes: int = Field(default=64 * 1024 * 1024, gt=0)
+	# seconds to wait for the html of one iframe before leaving it out
+	frame_timeout: float = Field(default=5.0, gt=0)
+	# iframe html is cut after this many characters before it is converted to markdown
+	max_frame_html_chars: int = Field(default=500_000, gt=0)
+	max_frames: int = Field(default=20, ge=0)
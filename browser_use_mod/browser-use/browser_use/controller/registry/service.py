@@ -6,6 +6,7 @@ from typing import Any, Generic, Optional, TypeVar
 from langchain_core.language_models.chat_models import BaseChatModel
 from pydantic import BaseModel, Field, create_model
 
+from browser_use.agent.llm_cache.service import LLMResponseCache
 from browser_use.browser.context import BrowserContext
 from browser_use.controller.registry.views import (
 	ActionModel,
@@ -29,6 +30,10 @@ class Registry(Generic[Context]):
 		self.registry = ActionRegistry()
 		self.telemetry = ProductTelemetry()
 		self.exclude_actions = exclude_actions if exclude_actions is not None else []
+		# action models keyed by the identity of the included actions, the actions are kept in the value so ids stay valid
+		self._action_model_cache: dict[tuple[int, ...], tuple[tuple[RegisteredAction, ...], type[ActionModel]]] = {}
+		# action sets already reported to telemetry
+		self._reported_action_sets: set[frozenset[str]] = set()
 
 	# @time_execution_sync('--create_param_model')
 	def _create_param_model(self, function: Callable) -> type[BaseModel]:
@@ -37,7 +42,7 @@ class Registry(Generic[Context]):
 		params = {
 			name: (param.annotation, ... if param.default == param.empty else param.default)
 			for name, param in sig.parameters.items()
-			if name != 'browser' and name != 'page_extraction_llm' and name != 'available_file_paths'
+			if name != 'browser' and name != 'page_extraction_llm' and name != 'available_file_paths' and name != 'llm_cache'
 		}
 		# TODO: make the types here work
 		return create_model(
@@ -52,6 +57,7 @@ class Registry(Generic[Context]):
 		param_model: type[BaseModel] | None = None,
 		domains: list[str] | None = None,
 		page_filter: Callable[[Any], bool] | None = None,
+		batchable: bool = False,
 	):
 		"""Decorator for registering actions"""
 
@@ -84,6 +90,7 @@ class Registry(Generic[Context]):
 				param_model=actual_param_model,
 				domains=domains,
 				page_filter=page_filter,
+				batchable=batchable,
 			)
 			self.registry.actions[func.__name__] = action
 			return func
@@ -101,6 +108,7 @@ class Registry(Generic[Context]):
 		available_file_paths: list[str] | None = None,
 		#
 		context: Context | None = None,
+		llm_cache: LLMResponseCache | None = None,
 	) -> Any:
 		"""Execute a registered action"""
 		if action_name not in self.registry.actions:
@@ -141,7 +149,10 @@ class Registry(Generic[Context]):
 				extra_args['page_extraction_llm'] = page_extraction_llm
 			if 'available_file_paths' in parameter_names:
 				extra_args['available_file_paths'] = available_file_paths
-			if action_name == 'input_text' and sensitive_data:
+			if 'llm_cache' in parameter_names:
+				# optional, actions fall back to calling the LLM directly when no cache is configured
+				extra_args['llm_cache'] = llm_cache
+			if 'has_sensitive_data' in parameter_names and sensitive_data:
 				extra_args['has_sensitive_data'] = True
 			if is_pydantic:
 				return await action.function(validated_params, **extra_args)
@@ -210,14 +221,15 @@ class Registry(Generic[Context]):
 					available_actions[name] = action
 				continue
 
-			# Check page_filter if present
-			domain_is_allowed = self.registry._match_domains(action.domains, page.url)
-			page_is_allowed = self.registry._match_page_filter(action.page_filter, page)
-
 			# Include action if both filters match (or if either is not present)
-			if domain_is_allowed and page_is_allowed:
+			if self.registry.matches_page(action, page):
 				available_actions[name] = action
 
+		# the model only depends on the set of available actions, which rarely changes between steps
+		key = tuple(id(action) for action in available_actions.values())
+		if key in self._action_model_cache:
+			return self._action_model_cache[key][1]
+
 		fields = {
 			name: (
 				Optional[action.param_model],
@@ -226,16 +238,20 @@ class Registry(Generic[Context]):
 			for name, action in available_actions.items()
 		}
 
-		self.telemetry.capture(
-			ControllerRegisteredFunctionsTelemetryEvent(
-				registered_functions=[
-					RegisteredFunction(name=name, params=action.param_model.model_json_schema())
-					for name, action in available_actions.items()
-				]
+		action_set = frozenset(available_actions)
+		if action_set not in self._reported_action_sets:
+			self._reported_action_sets.add(action_set)
+			self.telemetry.capture(
+				ControllerRegisteredFunctionsTelemetryEvent(
+					registered_functions=[
+						RegisteredFunction(name=name, params=action.param_schema()) for name, action in available_actions.items()
+					]
+				)
 			)
-		)
 
-		return create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		model = create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		self._action_model_cache[key] = (tuple(available_actions.values()), model)
+		return model
 
 	def get_prompt_description(self, page=None) -> str:
 		"""Get a description of all actions for the prompt
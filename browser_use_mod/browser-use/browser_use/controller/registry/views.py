@@ -1,7 +1,10 @@
+import fnmatch
 from collections.abc import Callable
+from functools import lru_cache
+from urllib.parse import urlparse
 
 from playwright.async_api import Page
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 
 class RegisteredAction(BaseModel):
@@ -16,20 +19,37 @@ class RegisteredAction(BaseModel):
 	domains: list[str] | None = None  # e.g. ['*.google.com', 'www.bing.com', 'yahoo.*]
 	page_filter: Callable[[Page], bool] | None = None
 
+	# non-navigating element interaction, consecutive batchable actions are merged into one batch_actions call
+	batchable: bool = False
+
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
+	# generated once per registration, the param model never changes afterwards
+	_param_schema: dict | None = PrivateAttr(default=None)
+	_prompt_description: str | None = PrivateAttr(default=None)
+
+	def param_schema(self) -> dict:
+		"""Get the JSON schema of the action parameters"""
+		if self._param_schema is None:
+			self._param_schema = self.param_model.model_json_schema()
+		return self._param_schema
+
 	def prompt_description(self) -> str:
 		"""Get a description of the action for the prompt"""
+		if self._prompt_description is not None:
+			return self._prompt_description
+
 		skip_keys = ['title']
 		s = f'{self.description}: \n'
 		s += '{' + str(self.name) + ': '
 		s += str(
 			{
 				k: {sub_k: sub_v for sub_k, sub_v in v.items() if sub_k not in skip_keys}
-				for k, v in self.param_model.model_json_schema()['properties'].items()
+				for k, v in self.param_schema()['properties'].items()
 			}
 		)
 		s += '}'
+		self._prompt_description = s
 		return s
 
 
@@ -65,11 +85,21 @@ class ActionModel(BaseModel):
 			action_params.index = index
 
 
+@lru_cache(maxsize=1024)
+def _match_domain_patterns(domains: tuple[str, ...], domain: str) -> bool:
+	return any(fnmatch.fnmatch(domain, domain_pattern) for domain_pattern in domains)  # Perform glob *.matching.*
+
+
 class ActionRegistry(BaseModel):
 	"""Model representing the action registry"""
 
 	actions: dict[str, RegisteredAction] = {}
 
+	# prompt descriptions keyed by the identity of the matching actions, the actions are kept in the value so ids stay valid
+	_prompt_description_cache: dict[tuple[int, ...], tuple[tuple[RegisteredAction, ...], str]] = PrivateAttr(
+		default_factory=dict
+	)
+
 	@staticmethod
 	def _match_domains(domains: list[str] | None, url: str) -> bool:
 		"""
@@ -86,9 +116,6 @@ class ActionRegistry(BaseModel):
 		if domains is None or not url:
 			return True
 
-		import fnmatch
-		from urllib.parse import urlparse
-
 		# Parse the URL to get the domain
 		try:
 			parsed_url = urlparse(url)
@@ -100,10 +127,7 @@ class ActionRegistry(BaseModel):
 			if ':' in domain:
 				domain = domain.split(':')[0]
 
-			for domain_pattern in domains:
-				if fnmatch.fnmatch(domain, domain_pattern):  # Perform glob *.matching.*
-					return True
-			return False
+			return _match_domain_patterns(tuple(domains), domain)
 		except Exception:
 			return False
 
@@ -127,23 +151,23 @@ class ActionRegistry(BaseModel):
 		"""
 		if page is None:
 			# For system prompt (no page provided), include only actions with no filters
-			return '\n'.join(
-				action.prompt_description()
+			actions = tuple(
+				action for action in self.actions.values() if action.page_filter is None and action.domains is None
+			)
+		else:
+			# only include filtered actions for the current page
+			# actions with no filters are skipped, they are already included in the system prompt
+			actions = tuple(
+				action
 				for action in self.actions.values()
-				if action.page_filter is None and action.domains is None
+				if (action.domains or action.page_filter) and self.matches_page(action, page)
 			)
 
-		# only include filtered actions for the current page
-		filtered_actions = []
-		for action in self.actions.values():
-			if not (action.domains or action.page_filter):
-				# skip actions with no filters, they are already included in the system prompt
-				continue
-
-			domain_is_allowed = self._match_domains(action.domains, page.url)
-			page_is_allowed = self._match_page_filter(action.page_filter, page)
-
-			if domain_is_allowed and page_is_allowed:
-				filtered_actions.append(action)
+		key = tuple(id(action) for action in actions)
+		if key not in self._prompt_description_cache:
+			self._prompt_description_cache[key] = (actions, '\n'.join(action.prompt_description() for action in actions))
+		return self._prompt_description_cache[key][1]
 
-		return '\n'.join(action.prompt_description() for action in filtered_actions)
+	def matches_page(self, action: RegisteredAction, page: Page) -> bool:
+		"""Check the domain and page filters of an action against a page"""
+		return self._match_domains(action.domains, page.url) and self._match_page_filter(action.page_filter, page)
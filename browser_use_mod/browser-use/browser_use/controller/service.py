@@ -6,16 +6,19 @@ import re
 from typing import Generic, TypeVar, cast
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.prompts import PromptTemplate
 from playwright.async_api import ElementHandle, Page
 
 # from lmnr.sdk.laminar import Laminar
 from pydantic import BaseModel
 
+from browser_use.agent.llm_cache.service import LLMResponseCache
 from browser_use.agent.views import ActionModel, ActionResult
 from browser_use.browser.context import BrowserContext
+from browser_use.controller.extraction.service import ContentExtractor
+from browser_use.controller.extraction.views import ExtractionConfig
 from browser_use.controller.registry.service import Registry
 from browser_use.controller.views import (
+	BatchActionsAction,
 	ClickElementAction,
 	CloseTabAction,
 	DoneAction,
@@ -30,6 +33,7 @@ from browser_use.controller.views import (
 	SendKeysAction,
 	SwitchTabAction,
 )
+from browser_use.exceptions import LLMCacheMissError
 from browser_use.utils import time_execution_sync
 
 logger = logging.getLogger(__name__)
@@ -43,8 +47,10 @@ class Controller(Generic[Context]):
 		self,
 		exclude_actions: list[str] = [],
 		output_model: type[BaseModel] | None = None,
+		extraction_config: ExtractionConfig | None = None,
 	):
 		self.registry = Registry[Context](exclude_actions)
+		self.content_extractor = ContentExtractor(extraction_config)
 
 		"""Register all default browser actions"""
 
@@ -155,6 +161,7 @@ class Controller(Generic[Context]):
 		@self.registry.action(
 			'Input text into a input interactive element',
 			param_model=InputTextAction,
+			batchable=True,
 		)
 		async def input_text(params: InputTextAction, browser: BrowserContext, has_sensitive_data: bool = False):
 			if params.index not in await browser.get_selector_map():
@@ -221,30 +228,27 @@ class Controller(Generic[Context]):
 			'Extract page content to retrieve specific information from the page, e.g. all company names, a specific description, all information about, links with companies in structured format or simply links',
 		)
 		async def extract_content(
-			goal: str, should_strip_link_urls: bool, browser: BrowserContext, page_extraction_llm: BaseChatModel
+			goal: str,
+			should_strip_link_urls: bool,
+			browser: BrowserContext,
+			page_extraction_llm: BaseChatModel,
+			llm_cache: LLMResponseCache | None = None,
 		):
 			page = await browser.get_current_page()
-			import markdownify
 
 			strip = []
 			if should_strip_link_urls:
 				strip = ['a', 'img']
 
-			content = markdownify.markdownify(await page.content(), strip=strip)
-
-			# manually append iframe text into the content so it's readable by the LLM (includes cross-origin iframes)
-			for iframe in page.frames:
-				if iframe.url != page.url and not iframe.url.startswith('data:'):
-					content += f'\n\nIFRAME {iframe.url}:\n'
-					content += markdownify.markdownify(await iframe.content())
+			content = await self.content_extractor.page_to_markdown(page, strip=strip)
 
-			prompt = 'Your task is to extract the content of the page. You will be given a page and a goal and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format. Extraction goal: {goal}, Page: {page}'
-			template = PromptTemplate(input_variables=['goal', 'page'], template=prompt)
 			try:
-				output = await page_extraction_llm.ainvoke(template.format(goal=goal, page=content))
-				msg = f'📄  Extracted from page\n: {output.content}\n'
+				extracted = await self.content_extractor.extract(content, goal, page_extraction_llm, llm_cache=llm_cache)
+				msg = f'📄  Extracted from page\n: {extracted}\n'
 				logger.info(msg)
 				return ActionResult(extracted_content=msg, include_in_memory=True)
+			except LLMCacheMissError:
+				raise
 			except Exception as e:
 				logger.debug(f'Error extracting content: {e}')
 				msg = f'📄  Extracted from page\n: {content}\n'
@@ -319,6 +323,54 @@ class Controller(Generic[Context]):
 			logger.info(msg)
 			return ActionResult(extracted_content=msg, include_in_memory=True)
 
+		@self.registry.action(
+			'Run several input_text actions at once, e.g. to fill a whole form: '
+			"{'actions': [{'input_text': {'index': 3, 'text': 'Jane'}}, {'input_text': {'index': 4, 'text': 'Doe'}}]}",
+			param_model=BatchActionsAction,
+		)
+		async def batch_actions(params: BatchActionsAction, browser: BrowserContext, has_sensitive_data: bool = False):
+			"""
+			Consecutive input_text actions are filled by one page-side script, fields it cannot handle
+			(iframes, unusual widgets) go through the regular input path. Keys are pressed in between, in order.
+			"""
+			messages = []
+
+			async def flush_inputs(inputs: list[InputTextAction]) -> None:
+				selector_map = await browser.get_selector_map()
+				for params in inputs:
+					if params.index not in selector_map:
+						raise Exception(f'Element index {params.index} does not exist - retry or use alternative actions')
+				element_nodes = [selector_map[params.index] for params in inputs]
+				filled = await browser._fill_element_nodes([(node, params.text) for node, params in zip(element_nodes, inputs)])
+				for element_node, params, was_filled in zip(element_nodes, inputs, filled):
+					if not was_filled:
+						await browser._input_text_element_node(element_node, params.text)
+					messages.append(
+						f'⌨️  Input sensitive data into index {params.index}'
+						if has_sensitive_data
+						else f'⌨️  Input {params.text} into index {params.index}'
+					)
+				inputs.clear()
+
+			pending_inputs: list[InputTextAction] = []
+			for action in params.actions:
+				if len(action) != 1:
+					raise ValueError(f'Each batched action needs exactly one action name, got {list(action)}')
+				action_name, action_params = next(iter(action.items()))
+				if action_name == 'input_text':
+					pending_inputs.append(InputTextAction(**action_params))
+				elif action_name == 'send_keys':
+					await flush_inputs(pending_inputs)
+					result = await send_keys(SendKeysAction(**action_params), browser)
+					messages.append(result.extracted_content)
+				else:
+					raise ValueError(f'Action {action_name} cannot be batched, only input_text and send_keys')
+			await flush_inputs(pending_inputs)
+
+			msg = '\n'.join(messages)
+			logger.info(f'📦  Batched {len(params.actions)} actions')
+			return ActionResult(extracted_content=msg, include_in_memory=True)
+
 		@self.registry.action(
 			description='If you dont find something which you want to interact with, scroll to it',
 		)
@@ -839,6 +891,7 @@ class Controller(Generic[Context]):
 		available_file_paths: list[str] | None = None,
 		#
 		context: Context | None = None,
+		llm_cache: LLMResponseCache | None = None,
 	) -> ActionResult:
 		"""Execute an action"""
 
@@ -861,6 +914,7 @@ class Controller(Generic[Context]):
 						sensitive_data=sensitive_data,
 						available_file_paths=available_file_paths,
 						context=context,
+						llm_cache=llm_cache,
 					)
 
 					# Laminar.set_span_output(result)
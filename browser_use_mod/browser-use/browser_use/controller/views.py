@@ -21,6 +21,11 @@ class InputTextAction(BaseModel):
 	xpath: str | None = None
 
 
+class BatchActionsAction(BaseModel):
+	# e.g. [{'input_text': {'index': 3, 'text': 'jane@example.com'}}, {'send_keys': {'keys': 'Enter'}}]
+	actions: list[dict[str, dict]]
+
+
 class DoneAction(BaseModel):
 	text: str
 	success: bool
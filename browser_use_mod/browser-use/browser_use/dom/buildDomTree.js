@@ -4,10 +4,17 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    stateId: null,
+    highlightIndexOffset: 0,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
-  let highlightIndex = 0; // Reset highlight index
+  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode, stateId } = args;
+  // cross-origin iframes are extracted separately and continue the numbering of the page
+  let highlightIndex = args.highlightIndexOffset || 0; // Reset highlight index
+
+  // Highlighted elements are stamped with "<stateId>-<highlightIndex>" so they can be found again with a
+  // single attribute selector. The attribute is never reported back, it would change on every extraction.
+  const STATE_ATTRIBUTE = "data-browser-use-index";
 
   // Add timing stack to handle recursion
   const TIMING_STACK = {
@@ -1174,6 +1181,9 @@
       // regardless of viewport status
       if (nodeData.isInViewport || viewportExpansion === -1) {
         nodeData.highlightIndex = highlightIndex++;
+        if (stateId) {
+          node.setAttribute(STATE_ATTRIBUTE, `${stateId}-${nodeData.highlightIndex}`);
+        }
 
         if (doHighlightElements) {
           if (focusHighlightIndex >= 0) {
@@ -1306,6 +1316,7 @@
     if (isInteractiveCandidate(node) || node.tagName.toLowerCase() === 'iframe' || node.tagName.toLowerCase() === 'body') {
       const attributeNames = node.getAttributeNames?.() || [];
       for (const name of attributeNames) {
+        if (name === STATE_ATTRIBUTE) continue;
         nodeData.attributes[name] = node.getAttribute(name);
       }
     }
@@ -33,20 +33,34 @@ class HistoryTreeProcessor:
 	@staticmethod
 	def find_history_element_in_tree(dom_history_element: DOMHistoryElement, tree: DOMElementNode) -> DOMElementNode | None:
 		hashed_dom_history_element = HistoryTreeProcessor._hash_dom_history_element(dom_history_element)
+		return HistoryTreeProcessor.build_element_index(tree).get(hashed_dom_history_element)
 
-		def process_node(node: DOMElementNode):
+	@staticmethod
+	def build_element_index(tree: DOMElementNode) -> dict[HashedDomElement, DOMElementNode]:
+		"""
+		Index the highlighted elements of a tree by their hash, in a single pass.
+
+		Build it once per browser state and look up every history element in O(1) instead of scanning and
+		rehashing the whole tree per element. The first element in document order wins on collisions, as in
+		a linear search.
+		"""
+		index: dict[HashedDomElement, DOMElementNode] = {}
+		# (node, branch path of its tag names below the root), the same path _get_parent_branch_path builds
+		stack: list[tuple[DOMElementNode, list[str]]] = [(tree, [])]
+		while stack:
+			node, branch_path = stack.pop()
 			if node.highlight_index is not None:
-				hashed_node = HistoryTreeProcessor._hash_dom_element(node)
-				if hashed_node == hashed_dom_history_element:
-					return node
-			for child in node.children:
+				hashed_node = HashedDomElement(
+					HistoryTreeProcessor._parent_branch_path_hash(branch_path),
+					HistoryTreeProcessor._attributes_hash(node.attributes),
+					HistoryTreeProcessor._xpath_hash(node.xpath),
+				)
+				index.setdefault(hashed_node, node)
+			# reversed so children are visited in document order
+			for child in reversed(node.children):
 				if isinstance(child, DOMElementNode):
-					result = process_node(child)
-					if result is not None:
-						return result
-			return None
-
-		return process_node(tree)
+					stack.append((child, branch_path + [child.tag_name]))
+		return index
 
 	@staticmethod
 	def compare_history_element_and_dom_element(dom_history_element: DOMHistoryElement, dom_element: DOMElementNode) -> bool:
@@ -1,12 +1,14 @@
+import asyncio
 import json
 import logging
+import re
 from dataclasses import dataclass
 from importlib import resources
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 if TYPE_CHECKING:
-	from playwright.async_api import Page
+	from playwright.async_api import Frame, Page
 
 from browser_use.dom.views import (
 	DOMBaseNode,
@@ -26,6 +28,71 @@ class ViewportInfo:
 	height: int
 
 
+DOM_STATE_ATTRIBUTE = 'data-browser-use-index'
+
+# ad network and tracker hosts, their iframes never contain content for the agent
+AD_FRAME_HOST_PATTERN = re.compile(
+	r'(?:^|\.)(?:doubleclick\.net|adroll\.com|googletagmanager\.com|googlesyndication\.com|googleadservices\.com'
+	r'|adservice\.google\.com|amazon-adsystem\.com|adnxs\.com|criteo\.com|taboola\.com|outbrain\.com'
+	r'|rubiconproject\.com|pubmatic\.com|casalemedia\.com|hotjar\.com)(?::\d+)?$'
+)
+
+# seconds to wait for the DOM of one cross-origin iframe before leaving it out of the state
+CROSS_ORIGIN_IFRAME_TIMEOUT = 3.0
+
+# Moves the highlight indexes of a frame extracted with index offset 0 by offset: the index stamps of the elements
+# (also in open shadow roots and same-origin frames, which buildDomTree.js walks) and the highlight labels.
+SHIFT_FRAME_INDEXES_JS = """({ stateId, offset }) => {
+	const prefix = `${stateId}-`;
+	const restamp = (root) => {
+		if (stateId) {
+			for (const el of root.querySelectorAll(`[data-browser-use-index^="${prefix}"]`)) {
+				const index = Number(el.getAttribute('data-browser-use-index').slice(prefix.length));
+				el.setAttribute('data-browser-use-index', `${prefix}${index + offset}`);
+			}
+		}
+		for (const el of root.querySelectorAll('*')) {
+			if (el.shadowRoot) restamp(el.shadowRoot);
+			if (el instanceof HTMLIFrameElement) {
+				try {
+					if (el.contentDocument) restamp(el.contentDocument);
+				} catch (e) {}
+			}
+		}
+	};
+	restamp(document);
+	for (const label of document.querySelectorAll('.playwright-highlight-label')) {
+		label.textContent = Number(label.textContent) + offset;
+	}
+}"""
+
+# same xpath as getXPathTree in buildDomTree.js, used to find the iframe element of a frame in the page tree
+IFRAME_XPATH_JS = """(element) => {
+	const segments = [];
+	let current = element;
+	while (current && current.nodeType === Node.ELEMENT_NODE) {
+		if (current.parentNode instanceof ShadowRoot || current.parentNode instanceof HTMLIFrameElement) break;
+		const tagName = current.nodeName.toLowerCase();
+		const siblings = current.parentElement
+			? Array.from(current.parentElement.children).filter((sib) => sib.nodeName.toLowerCase() === tagName)
+			: [];
+		const position = siblings.length > 1 ? siblings.indexOf(current) + 1 : 0;
+		segments.unshift(position > 0 ? `${tagName}[${position}]` : tagName);
+		current = current.parentNode;
+	}
+	return segments.join('/');
+}"""
+
+
+def is_ad_frame_url(url: str) -> bool:
+	return bool(AD_FRAME_HOST_PATTERN.search(urlparse(url).netloc))
+
+
+def dom_state_selector(state_id: str, highlight_index: int) -> str:
+	"""CSS selector of the element stamped with `highlight_index` by the extraction `state_id`"""
+	return f'[{DOM_STATE_ATTRIBUTE}="{state_id}-{highlight_index}"]'
+
+
 class DomService:
 	def __init__(self, page: 'Page'):
 		self.page = page
@@ -40,27 +107,41 @@ class DomService:
 		highlight_elements: bool = True,
 		focus_element: int = -1,
 		viewport_expansion: int = 0,
+		state_id: str | None = None,
+		include_cross_origin_iframes: bool = False,
 	) -> DOMState:
-		element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
+		"""
+		Extract the interactive elements of the page.
+
+		With a `state_id` every highlighted element is stamped with a `data-browser-use-index="<state_id>-<index>"`
+		attribute, see `dom_state_selector`. With `include_cross_origin_iframes` the DOM of visible, non-ad
+		cross-origin iframes is extracted in the frame itself and merged below its iframe element.
+		"""
+		element_tree, selector_map = await self._build_dom_tree(
+			highlight_elements, focus_element, viewport_expansion, state_id, include_cross_origin_iframes
+		)
 		return DOMState(element_tree=element_tree, selector_map=selector_map)
 
 	@time_execution_async('--get_cross_origin_iframes')
 	async def get_cross_origin_iframes(self) -> list[str]:
-		# invisible cross-origin iframes are used for ads and tracking, dont open those
-		hidden_frame_urls = await self.page.locator('iframe').filter(visible=False).evaluate_all('e => e.map(e => e.src)')
+		return [frame.url for frame in await self._get_cross_origin_frames()]
 
-		is_ad_url = lambda url: any(
-			domain in urlparse(url).netloc for domain in ('doubleclick.net', 'adroll.com', 'googletagmanager.com')
-		)
-
-		return [
-			frame.url
-			for frame in self.page.frames
-			if urlparse(frame.url).netloc  # exclude data:urls and about:blank
-			and urlparse(frame.url).netloc != urlparse(self.page.url).netloc  # exclude same-origin iframes
-			and frame.url not in hidden_frame_urls  # exclude hidden frames
-			and not is_ad_url(frame.url)  # exclude most common ad network tracker frame URLs
-		]
+	async def _get_cross_origin_frames(self) -> list['Frame']:
+		# invisible cross-origin iframes are used for ads and tracking, dont open those
+		hidden_frame_urls = set(await self.page.locator('iframe').filter(visible=False).evaluate_all('e => e.map(e => e.src)'))
+		page_netloc = urlparse(self.page.url).netloc
+
+		frames = []
+		for frame in self.page.frames:
+			netloc = urlparse(frame.url).netloc
+			if (
+				netloc  # exclude data:urls and about:blank
+				and netloc != page_netloc  # exclude same-origin iframes
+				and frame.url not in hidden_frame_urls  # exclude hidden frames
+				and not AD_FRAME_HOST_PATTERN.search(netloc)  # exclude ad network and tracker frames
+			):
+				frames.append(frame)
+		return frames
 
 	@time_execution_async('--build_dom_tree')
 	async def _build_dom_tree(
@@ -68,6 +149,8 @@ class DomService:
 		highlight_elements: bool,
 		focus_element: int,
 		viewport_expansion: int,
+		state_id: str | None = None,
+		include_cross_origin_iframes: bool = False,
 	) -> tuple[DOMElementNode, SelectorMap]:
 		if await self.page.evaluate('1+1') != 2:
 			raise ValueError('The page cannot evaluate javascript code properly')
@@ -95,6 +178,7 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'stateId': state_id,
 		}
 
 		try:
@@ -111,7 +195,80 @@ class DomService:
 				json.dumps(eval_page['perfMetrics'], indent=2),
 			)
 
-		return await self._construct_dom_tree(eval_page)
+		element_tree, selector_map = await self._construct_dom_tree(eval_page)
+		if include_cross_origin_iframes:
+			await self._merge_cross_origin_iframes(element_tree, selector_map, args)
+		return element_tree, selector_map
+
+	@time_execution_async('--merge_cross_origin_iframes')
+	async def _merge_cross_origin_iframes(self, element_tree: DOMElementNode, selector_map: SelectorMap, args: dict) -> None:
+		"""
+		Run the DOM script inside every cross-origin iframe of the page and attach the result below the iframe element.
+
+		The script cannot look into cross-origin documents, so these iframes are leaves of the page tree. Frames are
+		extracted in parallel, each numbered from 0, and renumbered afterwards to continue the numbering of the page.
+		Nested frames of cross-origin frames are not included.
+		"""
+		frames = [frame for frame in await self._get_cross_origin_frames() if frame.parent_frame is self.page.main_frame]
+		if not frames:
+			return
+
+		iframe_nodes: dict[str, DOMElementNode] = {}
+		stack = [element_tree]
+		while stack:
+			node = stack.pop()
+			if node.tag_name == 'iframe':
+				iframe_nodes.setdefault(node.xpath, node)
+				continue
+			stack.extend(child for child in node.children if isinstance(child, DOMElementNode))
+
+		frame_args = {**args, 'highlightIndexOffset': 0}
+		if args.get('focusHighlightIndex', -1) != -1:
+			# the focused index refers to the final numbering, which the frames dont know yet
+			frame_args['doHighlightElements'] = False
+
+		async def extract_frame(frame: 'Frame') -> tuple[DOMElementNode, DOMElementNode, SelectorMap] | None:
+			try:
+				frame_element = await frame.frame_element()
+				iframe_node = iframe_nodes.get(await frame_element.evaluate(IFRAME_XPATH_JS))
+				if iframe_node is None or iframe_node.children:
+					return None
+				eval_frame = await asyncio.wait_for(frame.evaluate(self.js_code, frame_args), timeout=CROSS_ORIGIN_IFRAME_TIMEOUT)
+				frame_tree, frame_selector_map = await self._construct_dom_tree(eval_frame)
+			except Exception as e:
+				logger.debug(f'Skipping cross-origin iframe {frame.url}: {type(e).__name__}: {e}')
+				return None
+			return iframe_node, frame_tree, frame_selector_map
+
+		extracted = await asyncio.gather(*(extract_frame(frame) for frame in frames))
+
+		shifts = []
+		next_index = max(selector_map, default=-1) + 1
+		for frame, frame_result in zip(frames, extracted):
+			if frame_result is None:
+				continue
+			iframe_node, frame_tree, frame_selector_map = frame_result
+			if iframe_node.children:
+				# another frame was matched to the same iframe element
+				continue
+			for index, node in frame_selector_map.items():
+				node.highlight_index = index + next_index
+				selector_map[node.highlight_index] = node
+			frame_tree.parent = iframe_node
+			iframe_node.children.append(frame_tree)
+			if frame_selector_map and next_index:
+				shifts.append(self._shift_frame_indexes(frame, args.get('stateId'), next_index))
+			next_index = max(selector_map, default=-1) + 1
+		await asyncio.gather(*shifts)
+
+	async def _shift_frame_indexes(self, frame: 'Frame', state_id: str | None, offset: int) -> None:
+		try:
+			await asyncio.wait_for(
+				frame.evaluate(SHIFT_FRAME_INDEXES_JS, {'stateId': state_id, 'offset': offset}),
+				timeout=CROSS_ORIGIN_IFRAME_TIMEOUT,
+			)
+		except Exception as e:
+			logger.debug(f'Could not renumber cross-origin iframe {frame.url}: {type(e).__name__}: {e}')
 
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
@@ -3,3 +3,28 @@ class LLMException(Exception):
 		self.status_code = status_code
 		self.message = message
 		super().__init__(f'Error {status_code}: {message}')
+
+
+class LLMCacheMissError(Exception):
+	"""Raised in strict replay mode when an LLM call has no cached response"""
+
+	def __init__(self, key: str):
+		self.key = key
+		super().__init__(f'No cached LLM response for key {key} (replay mode)')
+
+
+class ReplayElementNotFoundError(ValueError):
+	"""Raised when a replayed history step targets an element that is not on the current page"""
+
+
+class StreamedActionsError(Exception):
+	"""
+	Raised when the model output failed after some streamed actions already ran.
+
+	results holds the results of those actions so the step can record them, error is the original failure.
+	"""
+
+	def __init__(self, error: Exception, results: list):
+		self.error = error
+		self.results = results
+		super().__init__(str(error))
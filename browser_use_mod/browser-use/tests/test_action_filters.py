@@ -303,3 +303,41 @@ class TestActionFilters:
 		assert 'domain_filter_action' in non_matching_page_model.model_fields
 		assert 'page_filter_action' not in non_matching_page_model.model_fields
 		assert 'both_filters_action' not in non_matching_page_model.model_fields
+
+	@pytest.mark.asyncio
+	async def test_action_models_are_memoized_per_action_set(self):
+		"""Test that the same set of matching actions reuses the model, prompt and telemetry event"""
+		registry = Registry()
+		registry.telemetry = MagicMock()
+
+		@registry.action(description='No filter action')
+		def no_filter_action():
+			pass
+
+		@registry.action(description='Domain filter action', domains=['example.com'])
+		def domain_filter_action():
+			pass
+
+		mock_page = MagicMock(spec=Page)
+		mock_page.url = 'https://example.com/a'
+		first_model = registry.create_action_model(page=mock_page)
+		first_description = registry.get_prompt_description(mock_page)
+
+		# a different url with the same matching actions gives the same model
+		mock_page.url = 'https://example.com/b'
+		assert registry.create_action_model(page=mock_page) is first_model
+		assert registry.get_prompt_description(mock_page) is first_description
+		assert registry.telemetry.capture.call_count == 1
+
+		mock_page.url = 'https://other.com'
+		other_model = registry.create_action_model(page=mock_page)
+		assert other_model is not first_model
+		assert 'domain_filter_action' not in other_model.model_fields
+		assert registry.telemetry.capture.call_count == 2
+
+		# registering a new action invalidates the cached models
+		@registry.action(description='Late action')
+		def late_action():
+			pass
+
+		assert 'late_action' in registry.create_action_model(page=mock_page).model_fields
@@ -0,0 +1,26 @@
+from browser_use.agent.events import ActionResultEvent, StepStartedEvent
+from browser_use.agent.service import Agent
+
+
+async def test_event_hooks_run_in_order_and_failures_are_isolated():
+	received = []
+
+	def failing_hook(event):
+		raise RuntimeError('broken hook')
+
+	async def async_hook(event):
+		received.append(('async', event.type))
+
+	agent = Agent.__new__(Agent)
+	agent.event_hooks = [lambda event: received.append(('sync', event.type)), failing_hook]
+	agent.add_event_hook(async_hook)
+
+	await agent._emit_event(StepStartedEvent(step_number=1))
+	await agent._emit_event(ActionResultEvent(step_number=1, extracted_content='clicked', is_done=True, success=True))
+
+	assert received == [
+		('sync', 'step_started'),
+		('async', 'step_started'),
+		('sync', 'action_result'),
+		('async', 'action_result'),
+	]
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentSettings
+from browser_use.controller.service import Controller
+
+
+class FakeKeyboard:
+	def __init__(self):
+		self.pressed = []
+
+	async def press(self, keys):
+		self.pressed.append(keys)
+
+
+class FakeBrowser:
+	"""The parts of BrowserContext used by batch_actions, the page-side fill succeeds for index 1 only"""
+
+	def __init__(self):
+		self.page = SimpleNamespace(keyboard=FakeKeyboard())
+		self.selector_map = {1: SimpleNamespace(highlight_index=1), 2: SimpleNamespace(highlight_index=2)}
+		self._input_text_element_node = AsyncMock()
+
+	async def get_selector_map(self):
+		return self.selector_map
+
+	async def get_current_page(self):
+		return self.page
+
+	async def _fill_element_nodes(self, fields):
+		return [node.highlight_index == 1 for node, _ in fields]
+
+
+async def test_batch_actions_fill_once_and_fall_back():
+	controller = Controller()
+	browser = FakeBrowser()
+	actions = [
+		{'input_text': {'index': 1, 'text': 'jane'}},
+		{'input_text': {'index': 2, 'text': 'secret'}},
+		{'send_keys': {'keys': 'Enter'}},
+	]
+
+	result = await controller.registry.execute_action('batch_actions', {'actions': actions}, browser=browser)
+	assert browser.page.keyboard.pressed == ['Enter']
+	# only the field the page-side script could not fill goes through the regular input path
+	browser._input_text_element_node.assert_awaited_once_with(browser.selector_map[2], 'secret')
+	assert result.extracted_content.splitlines() == [
+		'⌨️  Input jane into index 1',
+		'⌨️  Input secret into index 2',
+		'⌨️  Sent keys: Enter',
+	]
+
+
+def test_agent_merges_consecutive_batchable_actions():
+	controller = Controller()
+	agent = Agent.__new__(Agent)
+	agent.controller = controller
+	agent.ActionModel = controller.registry.create_action_model()
+	actions = [
+		agent.ActionModel(click_element_by_index={'index': 0}),
+		agent.ActionModel(input_text={'index': 1, 'text': 'jane'}),
+		agent.ActionModel(input_text={'index': 2, 'text': 'doe'}),
+		agent.ActionModel(send_keys={'keys': 'Enter'}),
+		agent.ActionModel(click_element_by_index={'index': 3}),
+		agent.ActionModel(input_text={'index': 4, 'text': 'alone'}),
+	]
+
+	merged = agent._merge_batchable_actions(actions)
+	assert len(merged) == 5
+	# key presses may submit the form, they stay separate actions
+	assert merged[0] is actions[0] and merged[2:] == actions[3:]
+	assert [next(iter(action)) for action in merged[1].batch_actions.actions] == ['input_text', 'input_text']
+	assert agent._get_action_index(merged[1]) == 1
+
+
+def test_batching_is_opt_in():
+	assert AgentSettings().batch_actions is False
+
+	llm = FakeListChatModel(responses=['unused'])
+	object.__setattr__(llm, '_verified_api_keys', True)
+
+	def new_agent(**kwargs):
+		return Agent(
+			task='fill the form', llm=llm, controller=Controller(), browser=Mock(), browser_context=Mock(),
+			tool_calling_method='raw', enable_memory=False, **kwargs,
+		)
+
+	# without batching the model cannot call batch_actions directly either
+	agent = new_agent()
+	assert 'batch_actions' not in agent.ActionModel.model_fields
+	assert 'batch_actions' not in agent.unfiltered_actions
+	assert 'batch_actions' in new_agent(batch_actions=True).ActionModel.model_fields
@@ -0,0 +1,78 @@
+import pytest
+
+from browser_use.browser import pool as pool_module
+from browser_use.browser.browser import BrowserConfig
+from browser_use.browser.pool import BrowserPool, BrowserPoolConfig
+
+
+class FakeContext:
+	def __init__(self):
+		self.closed = False
+
+	async def close(self):
+		self.closed = True
+
+
+class FakeBrowser:
+	"""Stand-in for Browser that does not launch a process"""
+
+	def __init__(self, config: BrowserConfig):
+		self.config = config
+		self.launched = False
+		self.closed = False
+
+	async def get_playwright_browser(self):
+		self.launched = True
+
+	async def new_context(self, config=None):
+		return FakeContext()
+
+	async def close(self):
+		self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_browser(monkeypatch):
+	monkeypatch.setattr(pool_module, 'Browser', FakeBrowser)
+
+
+async def test_contexts_are_sharded_across_browsers():
+	pool = BrowserPool(BrowserConfig(headless=True), BrowserPoolConfig(max_contexts_per_browser=2))
+	contexts = [await pool.new_context() for _ in range(5)]
+
+	assert sorted(pool.context_counts) == [1, 2, 2]
+	for browser in pool.browsers:
+		assert browser.launched
+		# each process picks its own debugging port
+		assert browser.config.chrome_remote_debugging_port is None
+		assert browser.config.headless
+
+	await pool.release_context(contexts[0])
+	assert contexts[0].closed
+	assert sum(pool.context_counts) == 4
+
+
+async def test_idle_browsers_are_closed():
+	pool = BrowserPool(config=BrowserPoolConfig(max_contexts_per_browser=1, keep_idle_browsers=1))
+	first, second = await pool.new_context(), await pool.new_context()
+	browsers = list(pool.browsers)
+
+	await pool.release_context(first)
+	await pool.release_context(second)
+
+	# one warm browser is kept for the next session
+	assert len(pool.browsers) == 1
+	assert sum(browser.closed for browser in browsers) == 1
+
+	await pool.new_context()
+	assert len(pool.browsers) == 1
+
+
+async def test_max_browsers_overflows_to_least_loaded():
+	pool = BrowserPool(config=BrowserPoolConfig(max_contexts_per_browser=1, max_browsers=2))
+	for _ in range(3):
+		await pool.new_context()
+	assert sorted(pool.context_counts) == [1, 2]
+
+	await pool.close()
+	assert pool.browsers == {}
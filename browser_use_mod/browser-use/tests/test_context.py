@@ -1,5 +1,6 @@
 import base64
-from unittest.mock import Mock
+import time
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
@@ -361,3 +362,159 @@ async def test_remove_highlights_failure():
 		await context.remove_highlights()
 	except Exception as e:
 		pytest.fail(f'remove_highlights raised an exception: {e}')
+
+
+@pytest.mark.asyncio
+async def test_cached_element_handles():
+	"""
+	Test that prewarm_elements resolves handles for the cached selector map by their state stamp, that
+	get_locate_element reuses them for the whole state, and falls back to a fresh lookup when a handle went away.
+	"""
+
+	class DummyHandle:
+		def __init__(self, visible=True):
+			self.visible = visible
+			self.scrolled = False
+
+		async def is_hidden(self):
+			return not self.visible
+
+		async def bounding_box(self):
+			return {'x': 0, 'y': 0, 'width': 10, 'height': 10} if self.visible else None
+
+		async def scroll_into_view_if_needed(self):
+			self.scrolled = True
+
+	class DummyPage:
+		def __init__(self):
+			self.selectors = []
+			self.handle = DummyHandle()
+
+		async def query_selector(self, selector):
+			self.selectors.append(selector)
+			return self.handle
+
+	element = DOMElementNode(
+		tag_name='button',
+		xpath='html/body/button',
+		attributes={'id': 'go'},
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=1,
+	)
+	dummy_page = DummyPage()
+	dummy_session = type('DummySession', (), {})()
+	dummy_session.cached_state = Mock(selector_map={1: element}, dom_state_id='abc-3')
+	dummy_session.element_handles = {}
+	dummy_session.css_selectors = {}
+	dummy_session.context = None
+	context = BrowserContext(browser=Mock(), config=BrowserContextConfig())
+	context.session = dummy_session
+	context.get_agent_current_page = AsyncMock(return_value=dummy_page)
+
+	assert await context.prewarm_elements([1, 2]) == 1
+	assert dummy_page.selectors == ['[data-browser-use-index="abc-3-1"]']
+
+	prewarmed = dummy_page.handle
+	dummy_page.handle = DummyHandle()
+	# the resolved handle is reused without querying the page again
+	assert await context.get_locate_element(element) is prewarmed
+	assert await context.get_locate_element(element) is prewarmed
+	assert prewarmed.scrolled
+	assert len(dummy_page.selectors) == 1
+
+	# a handle that went away falls back to a fresh lookup by the stamp
+	prewarmed.visible = False
+	assert await context.get_locate_element(element) is dummy_page.handle
+	assert dummy_page.selectors[-1] == '[data-browser-use-index="abc-3-1"]'
+	assert dummy_session.element_handles[1] is dummy_page.handle
+
+	# elements that are not part of the cached state are located by their css selector
+	other = DOMElementNode(
+		tag_name='button', xpath='html/body/button', attributes={}, children=[], is_visible=True, parent=None, highlight_index=1
+	)
+	await context.get_locate_element(other)
+	assert dummy_page.selectors[-1] == 'html > body > button'
+	assert id(other) not in dummy_session.css_selectors
+
+
+@pytest.mark.asyncio
+async def test_get_state_reuses_unchanged_page():
+	"""
+	Test that get_state only rebuilds the state when the page change token moved, and refreshes the screenshot
+	of a reused state.
+	"""
+	dummy_session = type('DummySession', (), {})()
+	dummy_session.cached_state = None
+	dummy_session.cached_state_token = None
+	dummy_session.cached_state_clickable_elements_hashes = None
+	dummy_session.element_handles = {}
+	dummy_session.css_selectors = {}
+	dummy_session.context = None
+	context = BrowserContext(browser=Mock(), config=BrowserContextConfig(reuse_unchanged_state=True))
+	context.session = dummy_session
+
+	token = {'value': 'page-1'}
+
+	async def get_page_change_token():
+		return token['value']
+
+	context._get_page_change_token = get_page_change_token
+	context._wait_for_page_and_frames_load = AsyncMock()
+	context._get_updated_state = AsyncMock(side_effect=lambda: Mock(selector_map={}, screenshot='old'))
+	context.take_screenshot = AsyncMock(return_value='new')
+	context.get_tabs_info = AsyncMock(return_value=[])
+
+	first = await context.get_state(cache_clickable_elements_hashes=False)
+	second = await context.get_state(cache_clickable_elements_hashes=False)
+	assert second is first
+	assert second.screenshot == 'new'
+	assert context._get_updated_state.await_count == 1
+	# the token is only compared once the page loaded
+	assert context._wait_for_page_and_frames_load.await_count == 2
+
+	# a request started by the last action may still change the page
+	context.network_activity.pending[Mock()] = time.monotonic()
+	assert await context.get_state(cache_clickable_elements_hashes=False) is not first
+	assert context._get_updated_state.await_count == 2
+	context.network_activity.pending.clear()
+	first = await context.get_state(cache_clickable_elements_hashes=False)
+	assert context._get_updated_state.await_count == 3
+	assert await context.get_state(cache_clickable_elements_hashes=False) is first
+
+	token['value'] = 'page-2'
+	third = await context.get_state(cache_clickable_elements_hashes=False)
+	assert third is not first
+	assert context._get_updated_state.await_count == 4
+
+	# a failed extraction falls back to the last good state, which is not kept for the new page
+	token['value'] = 'page-3'
+	context.current_state = third
+	context._get_updated_state = AsyncMock(return_value=third)
+	assert await context.get_state(cache_clickable_elements_hashes=False) is third
+	assert dummy_session.cached_state_token is None
+	await context.get_state(cache_clickable_elements_hashes=False)
+	assert context._get_updated_state.await_count == 2
+
+	context.config.reuse_unchanged_state = False
+	context._get_updated_state = AsyncMock(side_effect=lambda: Mock(selector_map={}, screenshot='old'))
+	assert await context.get_state(cache_clickable_elements_hashes=False) is not third
+
+
+def test_state_reuse_is_opt_in():
+	"""A reused state gets a screenshot without highlight labels"""
+	assert BrowserContextConfig().reuse_unchanged_state is False
+
+
+@pytest.mark.asyncio
+async def test_page_change_token_ignores_pages_with_unobservable_frames():
+	"""Cross-origin frames cannot be observed, their merged content could be stale"""
+	page = Mock()
+	page.evaluate = AsyncMock(return_value=['https://example.com/|1|0|false|0|0|1280|720', 1])
+	context = BrowserContext(browser=Mock(), config=BrowserContextConfig(include_cross_origin_iframes=True))
+	context.get_agent_current_page = AsyncMock(return_value=page)
+	assert await context._get_page_change_token() is None
+
+	context.config.include_cross_origin_iframes = False
+	assert await context._get_page_change_token() == f'{id(page)}|https://example.com/|1|0|false|0|0|1280|720'
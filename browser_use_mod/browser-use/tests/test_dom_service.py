@@ -0,0 +1,73 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from browser_use.dom.service import DomService, is_ad_frame_url
+from browser_use.dom.views import DOMElementNode
+
+
+def test_is_ad_frame_url():
+	assert is_ad_frame_url('https://securepubads.g.doubleclick.net/tag')
+	assert is_ad_frame_url('https://www.googletagmanager.com:443/ns.html')
+	assert not is_ad_frame_url('https://www.youtube.com/embed/abc')
+	assert not is_ad_frame_url('https://notdoubleclick.net')
+
+
+async def test_merge_cross_origin_iframes():
+	"""Cross-origin iframes are extracted in parallel and renumbered to continue the page's highlight numbering"""
+
+	class FakeFrameElement:
+		def __init__(self, xpath):
+			self.xpath = xpath
+
+		async def evaluate(self, script):
+			return self.xpath
+
+	class FakeFrame:
+		def __init__(self, page, xpath, buttons):
+			self.url = f'https://widget.example.org/{xpath}'
+			self.parent_frame = page.main_frame
+			self.xpath = xpath
+			self.buttons = buttons
+			self.calls = []
+
+		async def frame_element(self):
+			return FakeFrameElement(self.xpath)
+
+		async def evaluate(self, script, args):
+			self.calls.append(args)
+			if 'offset' in args:
+				return None
+			# both frames are evaluated before either extraction finishes
+			await asyncio.sleep(0)
+			nodes = {
+				str(i + 2): {'tagName': 'button', 'xpath': f'html/body/button[{i + 1}]', 'highlightIndex': i}
+				for i in range(self.buttons)
+			}
+			nodes['1'] = {'tagName': 'body', 'xpath': 'html/body', 'children': list(nodes), 'isVisible': True}
+			return {'rootId': '1', 'map': nodes}
+
+	page = Mock(url='https://example.com', main_frame=object())
+	first = FakeFrame(page, 'html/body/iframe[1]', buttons=2)
+	second = FakeFrame(page, 'html/body/iframe[2]', buttons=1)
+	page.frames = [page.main_frame, first, second]
+	dom_service = DomService(page)
+	dom_service._get_cross_origin_frames = AsyncMock(return_value=[first, second])
+
+	iframes = [
+		DOMElementNode(tag_name='iframe', xpath=f'html/body/iframe[{i}]', attributes={}, children=[], is_visible=True, parent=None)
+		for i in (1, 2)
+	]
+	link = DOMElementNode(
+		tag_name='a', xpath='html/body/a', attributes={}, children=[], is_visible=True, parent=None, highlight_index=0
+	)
+	root = DOMElementNode(tag_name='body', xpath='html/body', attributes={}, children=[link, *iframes], is_visible=True, parent=None)
+	selector_map = {0: link}
+
+	await dom_service._merge_cross_origin_iframes(root, selector_map, {'stateId': 'abc', 'focusHighlightIndex': -1})
+	assert first.calls[0] == second.calls[0] == {'stateId': 'abc', 'focusHighlightIndex': -1, 'highlightIndexOffset': 0}
+	assert sorted(selector_map) == [0, 1, 2, 3]
+	assert [selector_map[i].parent.parent for i in (1, 2, 3)] == [iframes[0], iframes[0], iframes[1]]
+	assert all(node.highlight_index == i for i, node in selector_map.items())
+	# the index stamps in the frames are moved to the final numbering
+	assert first.calls[1] == {'stateId': 'abc', 'offset': 1}
+	assert second.calls[1] == {'stateId': 'abc', 'offset': 3}
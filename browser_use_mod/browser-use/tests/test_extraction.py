@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+from browser_use.controller.extraction.service import ContentExtractor, split_markdown
+from browser_use.controller.extraction.views import ExtractionConfig
+
+
+class FakeLLM:
+	"""Stand-in for the page extraction model, answers with the first line of the prompted page part"""
+
+	model_name = 'fake-extractor'
+
+	def __init__(self):
+		self.prompts: list[str] = []
+		self.running = 0
+		self.max_running = 0
+
+	async def ainvoke(self, prompt: str):
+		self.prompts.append(prompt)
+		self.running += 1
+		self.max_running = max(self.max_running, self.running)
+		await asyncio.sleep(0.01)
+		self.running -= 1
+		return SimpleNamespace(content=f'answer {len(self.prompts)}')
+
+
+def test_split_markdown_cuts_at_headings():
+	content = '# One\nfirst\n\n## Two\nsecond\n\n# Three\n' + 'x' * 50
+	chunks = split_markdown(content, chunk_size=30)
+	assert ''.join(chunks) == content
+	assert chunks[0] == '# One\nfirst\n\n## Two\nsecond\n\n'
+	assert all(len(chunk) <= 30 for chunk in chunks)
+
+	assert split_markdown('short page', chunk_size=30) == ['short page']
+
+
+async def test_short_page_is_extracted_in_one_prompt(tmp_path):
+	llm = FakeLLM()
+	extractor = ContentExtractor(ExtractionConfig(cache_dir=str(tmp_path)))
+
+	assert await extractor.extract('# Title\nsome text', 'get the title', llm) == 'answer 1'
+	assert len(llm.prompts) == 1
+
+	# same content and goal come from the cache
+	assert await extractor.extract('# Title\nsome text', 'get the title', llm) == 'answer 1'
+	assert len(llm.prompts) == 1
+	await extractor.extract('# Title\nsome text', 'get the text', llm)
+	assert len(llm.prompts) == 2
+
+
+def test_result_cache_is_opt_in(tmp_path):
+	assert ExtractionConfig().cache_dir is None
+	extractor = ContentExtractor(ExtractionConfig(cache_dir=str(tmp_path / 'cache')))
+	# the cache directory is only scanned once an extraction needs it
+	assert extractor.cache is None
+	assert not (tmp_path / 'cache').exists()
+
+
+async def test_long_page_is_mapped_and_reduced(tmp_path):
+	llm = FakeLLM()
+	extractor = ContentExtractor(ExtractionConfig(chunk_size=20, max_concurrency=2, cache_dir=None))
+	content = ''.join(f'# Section {i}\nbody {i}\n' for i in range(6))
+
+	result = await extractor.extract(content, 'list sections', llm)
+	# one prompt per chunk plus the reduce prompt
+	assert len(llm.prompts) == len(split_markdown(content, 20)) + 1
+	assert result == f'answer {len(llm.prompts)}'
+	assert 'Extractions per part' in llm.prompts[-1]
+	assert llm.max_running <= 2
+
+
+class FakeFrame:
+	def __init__(self, url: str, html: str = '', delay: float = 0.0):
+		self.url = url
+		self.html = html
+		self.delay = delay
+		self.fetched = False
+
+	async def content(self) -> str:
+		self.fetched = True
+		await asyncio.sleep(self.delay)
+		return self.html
+
+
+async def test_page_to_markdown_fetches_frames_concurrently():
+	page = FakeFrame('https://example.com', '<h1>Page</h1>')
+	widget = FakeFrame('https://widget.example.org/embed', '<p>widget text</p>', delay=0.05)
+	slow = FakeFrame('https://slow.example.org', '<p>never</p>', delay=5)
+	ad = FakeFrame('https://securepubads.g.doubleclick.net/ad', '<p>ad</p>')
+	page.frames = [page, widget, slow, ad]
+	extractor = ContentExtractor(ExtractionConfig(cache_dir=None, frame_timeout=0.2))
+
+	content = await extractor.page_to_markdown(page)
+	assert content.startswith('Page\n====')
+	assert 'IFRAME https://widget.example.org/embed:\nwidget text' in content
+	assert 'never' not in content
+	assert not ad.fetched
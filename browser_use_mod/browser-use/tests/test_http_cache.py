@@ -0,0 +1,103 @@
+import pytest
+
+from browser_use.browser.http_cache import HttpCacheConfig, SharedHttpCache
+
+
+class FakeRequest:
+	def __init__(self, url: str, resource_type: str = 'script', method: str = 'GET'):
+		self.url = url
+		self.resource_type = resource_type
+		self.method = method
+
+
+class FakeResponse:
+	def __init__(self, url: str, body: bytes = b'console.log(1)', headers: dict | None = None, resource_type: str = 'script'):
+		self.url = url
+		self.status = 200
+		self.headers = {'content-type': 'application/javascript', 'content-encoding': 'gzip', **(headers or {})}
+		self.request = FakeRequest(url, resource_type)
+		self._body = body
+
+	async def body(self):
+		return self._body
+
+
+class FakeRoute:
+	def __init__(self, response: FakeResponse | None = None):
+		self.response = response
+		self.fetched = False
+		self.fulfilled = None
+		self.fell_back = False
+
+	async def fetch(self):
+		self.fetched = True
+		return self.response
+
+	async def fulfill(self, status=None, headers=None, body=None, response=None):
+		self.fulfilled = {'status': status or response.status, 'headers': headers, 'body': body}
+
+	async def fallback(self):
+		self.fell_back = True
+
+
+@pytest.fixture
+def cache(tmp_path):
+	return SharedHttpCache(HttpCacheConfig(cache_dir=str(tmp_path)))
+
+
+async def _load(cache: SharedHttpCache, url: str, resource_type: str = 'script', headers: dict | None = None) -> FakeRoute:
+	route = FakeRoute(FakeResponse(url, headers=headers))
+	await cache.handle_route(route, FakeRequest(url, resource_type))
+	return route
+
+
+async def test_second_load_is_served_from_disk(cache, tmp_path):
+	url = 'https://staging.example.com/app.js'
+	assert (await _load(cache, url)).fetched
+
+	route = await _load(cache, url)
+	assert not route.fetched
+	assert route.fulfilled['body'] == b'console.log(1)'
+	# the stored body is decoded, the transfer encoding must not be replayed
+	assert 'content-encoding' not in route.fulfilled['headers']
+
+	# another cache instance on the same directory (another process) sees the entry
+	assert await SharedHttpCache(HttpCacheConfig(cache_dir=str(tmp_path))).get(url) is not None
+
+
+async def test_uncacheable_requests_and_responses(cache):
+	assert (await _load(cache, 'https://example.com/', resource_type='document')).fell_back
+	await _load(cache, 'https://example.com/private.js', headers={'cache-control': 'private, max-age=60'})
+	assert await cache.get('https://example.com/private.js') is None
+
+
+async def test_host_filter(tmp_path):
+	cache = SharedHttpCache(HttpCacheConfig(cache_dir=str(tmp_path), hosts=['*.example.com']))
+	assert (await _load(cache, 'https://other.com/app.js')).fell_back
+	assert not (await _load(cache, 'https://staging.example.com/app.js')).fell_back
+
+
+async def test_deploy_marker_invalidates_origin(cache):
+	url = 'https://staging.example.com/app.js'
+	await _load(cache, url)
+	await _load(cache, 'https://cdn.example.net/lib.js')
+
+	document = 'https://staging.example.com/'
+	cache.on_response(FakeResponse(document, headers={'x-build-id': '41'}, resource_type='document'))
+	assert await cache.get(url) is not None
+
+	cache.on_response(FakeResponse(document, headers={'x-build-id': '42'}, resource_type='document'))
+	assert await cache.get(url) is None
+	assert await cache.get('https://cdn.example.net/lib.js') is not None
+
+
+async def test_size_cap_and_ttl(tmp_path):
+	cache = SharedHttpCache(HttpCacheConfig(cache_dir=str(tmp_path), max_size_bytes=1500))
+	for i in range(4):
+		await cache.put(f'https://example.com/{i}.js', 200, {}, b'x' * 500)
+	assert cache.total_size <= 1500
+	assert await cache.get('https://example.com/0.js') is None
+	assert await cache.get('https://example.com/3.js') is not None
+
+	cache.config.ttl_seconds = 0.000001
+	assert await cache.get('https://example.com/3.js') is None
@@ -0,0 +1,145 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from browser_use.agent.llm_cache.service import LLMResponseCache
+from browser_use.agent.llm_cache.views import LLMCacheConfig
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentOutput, AgentSettings, AgentState
+from browser_use.controller.service import Controller
+from browser_use.exceptions import LLMCacheMissError
+
+
+@pytest.fixture
+def cache(tmp_path):
+	return LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path)))
+
+
+def _state_message(time_str: str, screenshot: str) -> HumanMessage:
+	return HumanMessage(
+		content=[
+			{'type': 'text', 'text': f'Current url: https://example.com\nCurrent date and time: {time_str}'},
+			{'type': 'image_url', 'image_url': {'url': f'data:image/png;base64,{screenshot}'}},
+		]
+	)
+
+
+class TestLLMResponseCache:
+	def test_key_ignores_volatile_prompt_parts(self, cache):
+		"""Timestamps, screenshots and tool call ids should not change the key"""
+		messages_a = [
+			SystemMessage(content='system'),
+			AIMessage(content='', tool_calls=[{'name': 'AgentOutput', 'args': {'a': 1}, 'id': '1', 'type': 'tool_call'}]),
+			_state_message('2024-01-01 10:00', 'AAAA'),
+		]
+		messages_b = [
+			SystemMessage(content='system  '),
+			AIMessage(content='', tool_calls=[{'name': 'AgentOutput', 'args': {'a': 1}, 'id': '7', 'type': 'tool_call'}]),
+			_state_message('2025-06-30 23:59', 'BBBB'),
+		]
+		assert cache.make_key('gpt-4o', messages_a) == cache.make_key('gpt-4o', messages_b)
+
+	def test_key_depends_on_model_namespace_and_content(self, cache):
+		messages = [HumanMessage(content='hello')]
+		key = cache.make_key('gpt-4o', messages)
+		assert key != cache.make_key('gpt-4o-mini', messages)
+		assert key != cache.make_key('gpt-4o', messages, namespace='other')
+		assert key != cache.make_key('gpt-4o', [HumanMessage(content='hello world')])
+
+	def test_images_in_key_when_enabled(self, tmp_path):
+		cache = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path), include_images_in_key=True))
+		key_a = cache.make_key('m', [_state_message('2024-01-01 10:00', 'AAAA')])
+		key_b = cache.make_key('m', [_state_message('2024-01-01 10:00', 'BBBB')])
+		assert key_a != key_b
+
+	def test_roundtrip_and_persistence(self, cache, tmp_path):
+		key = cache.make_key('m', 'prompt')
+		assert cache.get(key) is None
+		cache.set(key, {'action': [{'done': {'text': 'ok'}}]})
+		assert cache.get(key) == {'action': [{'done': {'text': 'ok'}}]}
+		assert cache.hits == 1 and cache.misses == 1
+
+		# a new instance pointing at the same directory sees the entry
+		reopened = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path)))
+		assert len(reopened) == 1
+		assert reopened.get(key) == {'action': [{'done': {'text': 'ok'}}]}
+
+	def test_lru_eviction(self, tmp_path):
+		cache = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path), max_size_bytes=1000))
+		keys = [cache.make_key('m', f'prompt {i}') for i in range(3)]
+		cache.set(keys[0], 'x' * 300)
+		cache.set(keys[1], 'x' * 300)
+		# touch the first entry so the second one becomes least recently used
+		assert cache.get(keys[0]) is not None
+		cache.set(keys[2], 'x' * 300)
+
+		assert cache.total_size <= 1000
+		assert cache.get(keys[0]) is not None
+		assert cache.get(keys[1]) is None
+		assert cache.get(keys[2]) is not None
+
+	def test_replay_mode_fails_on_miss(self, tmp_path):
+		recorder = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path)))
+		key = recorder.make_key('m', 'prompt')
+		recorder.set(key, 'answer')
+
+		replay = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path), mode='replay'))
+		assert replay.get(key) == 'answer'
+		with pytest.raises(LLMCacheMissError):
+			replay.get(replay.make_key('m', 'another prompt'))
+
+		# replay never writes
+		replay.set(replay.make_key('m', 'another prompt'), 'ignored')
+		assert len(replay) == 1
+
+	def test_record_mode_always_misses(self, tmp_path):
+		cache = LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path), mode='record'))
+		key = cache.make_key('m', 'prompt')
+		cache.set(key, 'first')
+		assert cache.get(key) is None
+		cache.set(key, 'second')
+		assert LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path))).get(key) == 'second'
+
+
+def _agent_with_cache(cache: LLMResponseCache) -> Agent:
+	"""Agent with only the attributes get_next_action uses, the LLM call counts its invocations"""
+	agent = Agent.__new__(Agent)
+	agent.ActionModel = Controller().registry.create_action_model()
+	agent.AgentOutput = AgentOutput.type_with_custom_actions(agent.ActionModel)
+	agent.settings = AgentSettings()
+	agent.state = AgentState()
+	agent.model_name = 'gpt-4o'
+	agent.tool_calling_method = 'function_calling'
+	agent.llm = None
+	agent.llm_router = None
+	agent.llm_cache = cache
+	agent.llm_calls = 0
+
+	async def fake_llm_call(llm, input_messages):
+		agent.llm_calls += 1
+		return agent.AgentOutput(
+			current_state={'evaluation_previous_goal': 'Success', 'memory': 'm', 'next_goal': 'finish'},
+			action=[agent.ActionModel(done={'text': 'ok', 'success': True})],
+		)
+
+	agent._get_next_action_from_llm = fake_llm_call
+	return agent
+
+
+class TestAgentLLMCache:
+	async def test_second_call_is_served_from_cache(self, cache):
+		agent = _agent_with_cache(cache)
+		messages = [SystemMessage(content='system'), HumanMessage(content='task')]
+
+		first = await agent.get_next_action(messages)
+		second = await agent.get_next_action(messages)
+
+		assert agent.llm_calls == 1
+		assert cache.hits == 1 and len(cache) == 1
+		assert second.model_dump() == first.model_dump()
+
+	async def test_replay_mode_miss_fails_the_step(self, tmp_path):
+		agent = _agent_with_cache(LLMResponseCache(LLMCacheConfig(cache_dir=str(tmp_path), mode='replay')))
+
+		with pytest.raises(LLMCacheMissError):
+			await agent.get_next_action([HumanMessage(content='never recorded')])
+		assert agent.llm_calls == 0
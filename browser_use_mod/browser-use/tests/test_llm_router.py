@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+
+import pytest
+
+from browser_use.agent.llm_router.service import LatencyHistogram, LLMRouter
+from browser_use.agent.llm_router.views import LLMRouterConfig
+
+
+class FakeLLM:
+	"""Stand-in for a chat model, the router only needs a class name and a model name"""
+
+	def __init__(self, delay: float = 0.0, error: Exception | None = None):
+		self.model_name = f'fake-{uuid.uuid4().hex[:8]}'
+		self.delay = delay
+		self.error = error
+		self.calls = 0
+		self.cancelled = False
+
+	async def answer(self) -> str:
+		self.calls += 1
+		try:
+			await asyncio.sleep(self.delay)
+		except asyncio.CancelledError:
+			self.cancelled = True
+			raise
+		if self.error:
+			raise self.error
+		return self.model_name
+
+
+async def _call(llm: FakeLLM) -> str:
+	return await llm.answer()
+
+
+def test_latency_histogram_percentile():
+	histogram = LatencyHistogram(size=100)
+	assert histogram.percentile(0.95) is None
+	for i in range(1, 101):
+		histogram.record(float(i))
+	assert histogram.percentile(0.5) == 50.0
+	assert histogram.percentile(0.95) == 95.0
+	assert histogram.percentile(0.99) == 99.0
+
+
+async def test_primary_answers_without_hedging():
+	primary, secondary = FakeLLM(delay=0.01), FakeLLM()
+	router = LLMRouter([primary, secondary], LLMRouterConfig(default_hedge_delay=1.0))
+
+	assert await router.run(_call) == primary.model_name
+	assert secondary.calls == 0
+	assert len(router.histogram(router.labels[0])) == 1
+
+
+async def test_slow_primary_is_hedged_and_cancelled():
+	primary, secondary = FakeLLM(delay=5), FakeLLM(delay=0.01)
+	router = LLMRouter([primary, secondary], LLMRouterConfig(default_hedge_delay=0.05, min_hedge_delay=0))
+
+	assert await router.run(_call) == secondary.model_name
+	assert primary.cancelled
+
+
+async def test_hedge_delay_follows_histogram():
+	primary = FakeLLM()
+	router = LLMRouter([primary], LLMRouterConfig(min_samples=3, default_hedge_delay=30, min_hedge_delay=0))
+	label = router.labels[0]
+	assert router.hedge_delay(label) == 30
+
+	for latency in (0.1, 0.2, 0.3, 0.4):
+		router.histogram(label).record(latency)
+	assert router.hedge_delay(label) == pytest.approx(0.4)
+
+
+async def test_failover_on_error():
+	primary, secondary = FakeLLM(error=ValueError('Could not parse response.')), FakeLLM()
+	router = LLMRouter([primary, secondary], LLMRouterConfig(max_hedges=0))
+
+	assert await router.run(_call) == secondary.model_name
+	assert primary.calls == 1
+
+
+async def test_failover_on_timeout():
+	primary, secondary = FakeLLM(delay=5), FakeLLM()
+	router = LLMRouter([primary, secondary], LLMRouterConfig(max_hedges=0, request_timeout=0.05))
+
+	assert await router.run(_call) == secondary.model_name
+
+
+async def test_all_failed_raises_last_error():
+	router = LLMRouter([FakeLLM(error=RuntimeError('first')), FakeLLM(error=RuntimeError('second'))])
+
+	with pytest.raises(RuntimeError, match='second'):
+		await router.run(_call)
@@ -0,0 +1,46 @@
+import time
+from unittest.mock import AsyncMock, Mock
+
+from browser_use.browser.activity import NetworkActivityTracker
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+
+def _request(resource_type: str, url: str = 'https://example.com/api'):
+	return Mock(resource_type=resource_type, url=url)
+
+
+def test_network_activity_tracker():
+	tracker = NetworkActivityTracker()
+	request = _request('fetch')
+	tracker._on_request(request)
+	tracker._on_request(_request('image', 'https://example.com/logo.png'))
+	tracker._on_request(_request('script', 'https://www.google-analytics.com/analytics.js'))
+	assert list(tracker.pending) == [request]
+	assert tracker.idle_seconds() == 0.0
+
+	tracker._on_request_done(request)
+	assert not tracker.pending
+	assert tracker.idle_seconds() >= 0.0
+
+	# long polls do not keep the page busy forever
+	tracker._on_request(request)
+	tracker.pending[request] = time.monotonic() - 60
+	assert tracker.idle_seconds() > 0.0
+
+
+async def test_wait_between_actions_returns_when_quiet():
+	context = BrowserContext(browser=Mock(), config=BrowserContextConfig(wait_between_actions=2.0, settle_quiet_time=0.05))
+	page = Mock(url='https://example.com')
+	page.evaluate = AsyncMock(return_value=500)  # last DOM mutation 500ms ago
+	context.get_agent_current_page = AsyncMock(return_value=page)
+	context.network_activity.last_activity = time.monotonic() - 1
+
+	assert await context.wait_between_actions() < 0.5
+
+	# a request in flight keeps the waiter busy until the maximum
+	context.config.wait_between_actions = 0.2
+	context.network_activity._on_request(_request('xhr'))
+	assert await context.wait_between_actions() >= 0.2
+
+	context.config.adaptive_wait_between_actions = False
+	assert await context.wait_between_actions() == 0.2
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult
+from browser_use.controller.service import Controller
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.views import DOMElementNode
+
+
+def make_tree(button_index: int) -> DOMElementNode:
+	root = DOMElementNode(is_visible=True, parent=None, tag_name='body', xpath='html/body', attributes={}, children=[])
+	form = DOMElementNode(is_visible=True, parent=root, tag_name='form', xpath='html/body/form', attributes={}, children=[])
+	button = DOMElementNode(
+		is_visible=True,
+		parent=form,
+		tag_name='button',
+		xpath='html/body/form/button',
+		attributes={'type': 'submit'},
+		children=[],
+		highlight_index=button_index,
+	)
+	form.children.append(button)
+	root.children.append(form)
+	link = DOMElementNode(
+		is_visible=True,
+		parent=root,
+		tag_name='a',
+		xpath='html/body/a',
+		attributes={'href': '/next'},
+		children=[],
+		highlight_index=button_index + 1,
+	)
+	root.children.append(link)
+	return root
+
+
+def find_node(tree: DOMElementNode, tag_name: str) -> DOMElementNode | None:
+	for child in tree.children:
+		if isinstance(child, DOMElementNode):
+			if child.tag_name == tag_name:
+				return child
+			found = find_node(child, tag_name)
+			if found is not None:
+				return found
+	return None
+
+
+def test_element_index_matches_linear_search():
+	tree = make_tree(0)
+	index = HistoryTreeProcessor.build_element_index(tree)
+	assert len(index) == 2
+	for tag_name in ('button', 'a'):
+		node = find_node(tree, tag_name)
+		history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(node)
+		assert index[HistoryTreeProcessor._hash_dom_history_element(history_element)] is node
+		assert HistoryTreeProcessor.find_history_element_in_tree(history_element, tree) is node
+		assert node.hash in index
+
+
+def make_agent(states: list[DOMElementNode]) -> Agent:
+	controller = Controller()
+	agent = Agent.__new__(Agent)
+	agent.controller = controller
+	agent.ActionModel = controller.registry.create_action_model()
+	agent.initial_actions = None
+	agent.state = SimpleNamespace(n_steps=1, last_result=None)
+	agent._message_manager = Mock()
+	agent.browser_context = SimpleNamespace(
+		get_state=AsyncMock(side_effect=[SimpleNamespace(element_tree=tree) for tree in states]),
+		wait_between_actions=AsyncMock(return_value=0.2),
+	)
+	agent.multi_act = AsyncMock(return_value=[ActionResult(extracted_content='clicked')])
+	return agent
+
+
+def make_history(agent: Agent, recorded_tree: DOMElementNode):
+	button = find_node(recorded_tree, 'button')
+	item = SimpleNamespace(
+		model_output=SimpleNamespace(
+			current_state=SimpleNamespace(next_goal='submit the form'),
+			action=[agent.ActionModel(click_element_by_index={'index': button.highlight_index})],
+		),
+		state=SimpleNamespace(interacted_element=[HistoryTreeProcessor.convert_dom_element_to_history_element(button)]),
+	)
+	return SimpleNamespace(history=[item])
+
+
+async def test_rerun_history_remaps_index_and_waits_for_settle():
+	agent = make_agent([make_tree(5)])
+	history = make_history(agent, make_tree(0))
+
+	results = await agent.rerun_history(history)
+
+	assert results[0].extracted_content == 'clicked'
+	action = agent.multi_act.await_args.args[0][0]
+	assert action.get_index() == 5
+	# no fixed sleep, the replay waits for the page to settle
+	agent.browser_context.wait_between_actions.assert_awaited_once()
+	timing = agent.replay_timings[0]
+	assert timing.attempts == 1 and not timing.escalated and timing.settle_seconds == 0.2
+
+
+async def test_rerun_history_escalates_to_llm_only_on_mismatch():
+	recorded_tree = make_tree(0)
+	# the recorded button is gone from every state the replay extracts
+	changed = make_tree(0)
+	find_node(changed, 'button').attributes['type'] = 'button'
+	agent = make_agent([changed, changed])
+	history = make_history(agent, recorded_tree)
+
+	async def llm_step():
+		agent.state.last_result = [ActionResult(extracted_content='llm clicked')]
+
+	agent.step = AsyncMock(side_effect=llm_step)
+
+	results = await agent.rerun_history(history, max_retries=2)
+
+	assert [result.extracted_content for result in results] == ['llm clicked']
+	agent.multi_act.assert_not_awaited()
+	agent.step.assert_awaited_once()
+	timing = agent.replay_timings[0]
+	assert timing.escalated and timing.attempts == 3 and timing.error is None
@@ -0,0 +1,93 @@
+from unittest.mock import Mock
+
+import pytest
+
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.resource_blocking import (
+	ESTIMATED_RESOURCE_BYTES,
+	RESOURCE_BLOCKING_PROFILES,
+	ResourceBlocker,
+	is_blocked_host,
+)
+
+
+class FakeRequest:
+	def __init__(self, url: str, resource_type: str):
+		self.url = url
+		self.resource_type = resource_type
+
+
+class FakeRoute:
+	def __init__(self):
+		self.outcome = None
+
+	async def fallback(self):
+		self.outcome = 'fallback'
+
+	async def abort(self, error_code=None):
+		self.outcome = 'abort'
+
+	async def fulfill(self, status=None, body=None, content_type=None):
+		self.outcome = f'fulfill:{content_type}'
+
+
+async def _handle(blocker: ResourceBlocker, url: str, resource_type: str) -> str:
+	route = FakeRoute()
+	await blocker.handle_route(route, FakeRequest(url, resource_type))
+	return route.outcome
+
+
+async def test_text_only_profile():
+	blocker = ResourceBlocker(RESOURCE_BLOCKING_PROFILES['text-only'])
+
+	assert await _handle(blocker, 'https://example.com/', 'document') == 'fallback'
+	assert await _handle(blocker, 'https://example.com/app.js', 'script') == 'fallback'
+	assert await _handle(blocker, 'https://example.com/logo.png', 'image') == 'abort'
+	assert await _handle(blocker, 'https://example.com/font.woff2', 'font') == 'abort'
+	# trackers from the default blocklist are stubbed so pages waiting on them keep working
+	assert await _handle(blocker, 'https://www.google-analytics.com/analytics.js', 'script') == 'fulfill:application/javascript'
+
+	stats = blocker.take_stats()
+	assert stats.blocked_requests == 3
+	assert stats.by_resource_type == {'image': 1, 'font': 1, 'script': 1}
+	assert stats.estimated_bytes_saved == sum(ESTIMATED_RESOURCE_BYTES[t] for t in ('image', 'font', 'script'))
+	# stats are reported per call
+	assert blocker.take_stats().blocked_requests == 0
+
+
+async def test_no_media_keeps_images():
+	blocker = ResourceBlocker(RESOURCE_BLOCKING_PROFILES['no-media'])
+	assert await _handle(blocker, 'https://example.com/logo.png', 'image') == 'fallback'
+	assert await _handle(blocker, 'https://example.com/intro.mp4', 'media') == 'abort'
+
+
+def test_security_audit_profile_blocks_nothing():
+	assert not ResourceBlocker(RESOURCE_BLOCKING_PROFILES['security-audit-full']).blocks_anything
+	assert BrowserContextConfig().resource_blocking_profile is None
+	assert BrowserContextConfig(resource_blocking_profile='no-media').resource_blocking_profile == 'no-media'
+
+
+async def test_first_party_urls_are_never_blocked_by_substring():
+	blocker = ResourceBlocker(RESOURCE_BLOCKING_PROFILES['text-only'])
+
+	assert await _handle(blocker, 'https://shop.example.com/shopping-cart', 'document') == 'fallback'
+	assert await _handle(blocker, 'https://d1234.cloudfront.net/app.bundle.js', 'script') == 'fallback'
+	assert await _handle(blocker, 'https://example.com/api/orders/tracking', 'xhr') == 'fallback'
+	assert await _handle(blocker, 'https://example.com/api/keepalive', 'fetch') == 'fallback'
+	# a page on a tracker host still loads when the agent navigates to it
+	assert await _handle(blocker, 'https://www.doubleclick.net/', 'document') == 'fallback'
+	assert await _handle(blocker, 'https://stats.g.doubleclick.net/collect', 'xhr') == 'abort'
+
+
+def test_blocked_host_matches_subdomains_only():
+	hosts = frozenset({'doubleclick.net'})
+	assert is_blocked_host('doubleclick.net', hosts)
+	assert is_blocked_host('Ad.DoubleClick.net.', hosts)
+	assert not is_blocked_host('notdoubleclick.net', hosts)
+	assert not is_blocked_host('doubleclick.net.example.com', hosts)
+
+
+async def test_unknown_profile_is_rejected():
+	context = BrowserContext(browser=Mock(), config=BrowserContextConfig())
+	with pytest.raises(ValueError, match='Unknown resource blocking profile'):
+		await context.set_resource_blocking_profile('text_only')
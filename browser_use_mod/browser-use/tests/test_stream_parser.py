@@ -0,0 +1,115 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from browser_use.agent.service import Agent
+from browser_use.agent.stream_parser import StreamingActionParser
+from browser_use.agent.views import ActionResult, AgentOutput, AgentSettings, AgentState
+from browser_use.controller.service import Controller
+from browser_use.exceptions import StreamedActionsError
+
+OUTPUT = {
+	'current_state': {'evaluation_previous_goal': 'Unknown', 'memory': 'Start {with} "braces"', 'next_goal': 'Open the site'},
+	'action': [
+		{'go_to_url': {'url': 'https://example.com/?q={"a": [1]}'}},
+		{'scroll_down': {'amount': None}},
+		{'click_element_by_index': {'index': 5}},
+	],
+}
+
+
+def _feed_in_chunks(parser: StreamingActionParser, text: str, size: int) -> list[list[dict]]:
+	return [parser.feed(text[i : i + size]) for i in range(0, len(text), size)]
+
+
+def test_actions_are_yielded_as_soon_as_they_close():
+	text = json.dumps(OUTPUT)
+	parser = StreamingActionParser()
+
+	first_end = text.index('}}', text.index('go_to_url')) + 2
+	assert parser.feed(text[: first_end - 1]) == []
+	assert parser.feed(text[first_end - 1 : first_end]) == [OUTPUT['action'][0]]
+	assert parser.feed(text[first_end:]) == OUTPUT['action'][1:]
+	assert parser.done
+	assert parser.actions == OUTPUT['action']
+
+
+def test_any_chunking_gives_the_same_actions():
+	text = json.dumps(OUTPUT, indent=2)
+	for size in (1, 3, 7, 64):
+		parser = StreamingActionParser()
+		chunks = _feed_in_chunks(parser, text, size)
+		assert [action for chunk in chunks for action in chunk] == OUTPUT['action']
+		assert parser.done
+
+
+def test_prefix_and_code_fences_are_ignored():
+	parser = StreamingActionParser()
+	text = 'Thinking about it...\n```json\n' + json.dumps(OUTPUT) + '\n```'
+	actions = [action for chunk in _feed_in_chunks(parser, text, 5) for action in chunk]
+	assert actions == OUTPUT['action']
+
+
+def test_nested_action_keys_are_not_mistaken_for_the_action_list():
+	output = {'current_state': {'action': [{'fake': {}}]}, 'action': [{'done': {'text': 'ok', 'success': True}}]}
+	parser = StreamingActionParser()
+	assert parser.feed(json.dumps(output)) == output['action']
+
+
+def test_escaped_quotes_inside_strings():
+	output = {'action': [{'input_text': {'index': 1, 'text': 'say \\"hi\\" } ]'}}]}
+	parser = StreamingActionParser()
+	assert parser.feed(json.dumps(output)) == output['action']
+
+
+class FakeStreamingLLM:
+	def __init__(self, text: str, size: int = 7):
+		self.chunks = [text[i : i + size] for i in range(0, len(text), size)]
+
+	async def astream(self, input_messages):
+		for chunk in self.chunks:
+			yield AIMessageChunk(content=chunk)
+
+
+def _streaming_agent(text: str) -> Agent:
+	"""Agent with only the attributes the streaming path uses, actions are recorded instead of executed"""
+	agent = Agent.__new__(Agent)
+	agent.ActionModel = Controller().registry.create_action_model()
+	agent.AgentOutput = AgentOutput.type_with_custom_actions(agent.ActionModel)
+	agent.settings = AgentSettings()
+	agent.state = AgentState()
+	agent.model_name = 'fake'
+	agent.tool_calling_method = 'raw'
+	agent.llm = FakeStreamingLLM(text)
+	agent.register_external_agent_status_raise_error_callback = None
+	agent.browser_context = AsyncMock()
+	agent.sensitive_data = None
+	agent.context = None
+	agent.llm_cache = None
+	agent._action_settle_times = []
+	agent.controller = AsyncMock()
+	agent.controller.act.return_value = ActionResult(extracted_content='🔗  Navigated to https://example.com')
+	return agent
+
+
+async def test_streamed_actions_are_kept_when_the_output_does_not_parse():
+	# the action array is complete, current_state is not a valid AgentBrain
+	text = json.dumps({'action': [{'go_to_url': {'url': 'https://example.com'}}], 'current_state': {'memory': 1}})
+	agent = _streaming_agent(text)
+
+	with pytest.raises(StreamedActionsError) as error:
+		await agent._stream_next_action([HumanMessage(content='task')])
+
+	agent.controller.act.assert_awaited_once()
+	assert [result.extracted_content for result in error.value.results] == ['🔗  Navigated to https://example.com']
+	assert 'Could not parse response' in str(error.value.error)
+
+
+async def test_output_that_fails_before_any_action_raises_the_parse_error():
+	agent = _streaming_agent('{"current_state": {"memory": 1}, "action": [{"click_element_by_index": {"index": 3}}]}')
+
+	with pytest.raises(ValueError, match='Could not parse response'):
+		await agent._stream_next_action([HumanMessage(content='task')])
+	agent.controller.act.assert_not_awaited()
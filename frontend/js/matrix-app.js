@@ -1046,6 +1046,7 @@
       currentTaskId: null,
       reconnectAttempts: 0,
       maxReconnectAttempts: 5,
+      lastSeq: null,
       isCapturing: false,
       lastResult: null,
       lastTaskInfo: null,
@@ -2659,6 +2660,7 @@
 
       const data = await response.json();
       secureState.set("sessionId", data.session_id);
+      secureState.set("lastSeq", null);
 
       await connectWebSockets();
 
@@ -2706,7 +2708,10 @@
         : "ws";
       const urlParts = secureState.get("serverUrl").split("://");
       const baseUrl = urlParts.length > 1 ? urlParts[1] : urlParts[0];
-      const wsUrl = `${wsProtocol}://${baseUrl}/ws/${secureState.get("sessionId")}`;
+      // resume after the last event seen so only missed events are sent again
+      const lastSeq = secureState.get("lastSeq");
+      const resumeQuery = lastSeq !== null ? `?last_seq=${lastSeq}` : "";
+      const wsUrl = `${wsProtocol}://${baseUrl}/ws/${secureState.get("sessionId")}${resumeQuery}`;
 
       const socket = new WebSocket(wsUrl);
       secureState.set("controlSocket", socket);
@@ -2721,6 +2726,12 @@
       socket.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data);
+          if (typeof message.seq === "number") {
+            secureState.set(
+              "lastSeq",
+              Math.max(secureState.get("lastSeq") || 0, message.seq),
+            );
+          }
           handleControlMessage(message);
         } catch (e) {
           // Error parsing WebSocket message
@@ -2995,6 +3006,7 @@
     }
 
     secureState.set("sessionId", null);
+    secureState.set("lastSeq", null);
     secureState.set("currentTaskId", null);
     secureState.set("isCapturing", false);
     secureState.set("lastResult", null);